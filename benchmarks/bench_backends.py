@@ -0,0 +1,224 @@
+"""
+Benchmark of the query backends of the algorithm classes: pandas, DuckDB and
+Polars.
+
+Times, with each backend (`algorithms.query_backends`):
+
+- map: the medal map figure of every season and medal type, computed without
+  the figure caches (`MedalMap.create_olympic_medals_by_country`). This is what
+  a request runs when its figure isn't cached yet.
+- committees: the summer and winter committee charts of `COMMITTEES`
+  committees, one at a time, for each medal type, computed without the figure
+  caches (`MedalsByCountry.create_medals_by_country_seasons`): the backend
+  selects the rows of the season and medal type from the wide committee table.
+- grid build: the creation of the discipline grid
+  (`MedalsByOlympicAndDiscipline`), which counts the medals of each season once,
+  from the medals parquet file (a `ParquetTable`, like in the app): DuckDB
+  queries the file, pandas and Polars query the rows of the season read from
+  its row groups. It only runs when the app starts or reloads its data, never
+  on a request.
+
+on the data of `data` (1x) and on the tables repeated (e.g. 100x). The repeated
+medals are written to a temporary parquet file, with the row group layout of
+the pipeline (each row is repeated in place, so the rows of a season stay
+together).
+
+Then, on the largest tables, runs map and committee requests from several
+concurrent sessions (threads, like the sessions of a worker), and reports the
+mean and 95th percentile latency of the requests: pandas holds the GIL, so its
+queries wait for each other, while DuckDB and Polars release it. The map and
+the committee charts are the charts that query a backend on requests (the
+sunburst looks up hierarchies computed when it is built).
+
+The backends whose package isn't installed are skipped. Run from the `src`
+directory:
+
+    uv run --extra duckdb --extra polars python ../benchmarks/bench_backends.py \
+        [--sizes 1 100] [--sessions 1 4 8]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path.cwd()))
+
+from algorithms import (  # noqa: E402
+    QUERY_BACKENDS,
+    MedalMap,
+    MedalsByCountry,
+    MedalsByOlympicAndDiscipline,
+    get_query_backend,
+)
+from loaders import load_datasets  # noqa: E402
+from loaders.sources import open_parquet_source  # noqa: E402
+from transformation.layout import write_row_groups  # noqa: E402
+
+SEASONS = ["All", "summer", "winter"]
+MEDAL_TYPES = ["All", "Gold", "Silver", "Bronze"]
+COMMITTEES = 20
+REQUESTS_PER_SESSION = 10
+
+
+def _time_ms(function, repeat=5):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _uncached_map(medal_map, season, medal_type):
+    """The map figure, computed like on a cache miss."""
+    create = MedalMap.create_olympic_medals_by_country.__wrapped__
+    return create(medal_map, season, medal_type)
+
+
+def _map_figures(medal_map):
+    def run():
+        for season in SEASONS:
+            for medal_type in MEDAL_TYPES:
+                _uncached_map(medal_map, season, medal_type)
+
+    return run
+
+
+def _uncached_committees(medals_by_country, committee, medal_type):
+    """The committee charts, computed like on a cache miss."""
+    create = MedalsByCountry.create_medals_by_country_seasons.__wrapped__
+    return create(medals_by_country, [committee], medal_type, "Total medals")
+
+
+def _committee_figures(medals_by_country, committees):
+    def run():
+        for committee in committees:
+            for medal_type in MEDAL_TYPES:
+                _uncached_committees(medals_by_country, committee, medal_type)
+
+    return run
+
+
+def _requests(medal_map, medals_by_country, committees):
+    """Requests of a session: map and committee figures of other selections,
+    one after the other."""
+    requests = []
+    for i in range(REQUESTS_PER_SESSION):
+        medal_type = MEDAL_TYPES[i % len(MEDAL_TYPES)]
+        if i % 2:
+            committee = committees[i % len(committees)]
+            requests.append(
+                lambda c=committee, m=medal_type: (
+                    _uncached_committees(medals_by_country, c, m)
+                )
+            )
+        else:
+            season = SEASONS[i % len(SEASONS)]
+            requests.append(
+                lambda s=season, m=medal_type: _uncached_map(medal_map, s, m)
+            )
+    return requests
+
+
+def _concurrent_latencies(sessions, requests):
+    """Latencies (ms) of the requests of `sessions` threads started at once."""
+    latencies = []
+    barrier = threading.Barrier(sessions)
+
+    def session():
+        barrier.wait()
+        for request in requests:
+            start = time.perf_counter()
+            request()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def _write_medals(path, size):
+    """Write the medals file with each row repeated `size` times."""
+    table = pq.read_table("./data/olympic_medals.parquet")
+    repeated = table.take(np.repeat(np.arange(table.num_rows), size))
+    write_row_groups([repeated], path, repeated.schema)
+
+
+def _backends():
+    backends = {}
+    for name in QUERY_BACKENDS:
+        try:
+            backends[name] = get_query_backend(name)
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    datasets = load_datasets("./data")
+    backends = _backends()
+    df_committees = datasets.total_medals_by_olympiad_and_committee
+    committees = list(MedalsByCountry(df_committees).committees[:COMMITTEES])
+    print(
+        f"{'size':<6}{'backend':<9}{'cities':>8}{'medals':>10}{'map (ms)':>10}"
+        f"{'committees (ms)':>17}{'grid build (ms)':>17}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            df_cities = pd.concat([datasets.olympic_cities] * size, ignore_index=True)
+            df_wide = pd.concat([df_committees] * size, ignore_index=True)
+            medals_path = Path(directory) / f"olympic_medals_{size}.parquet"
+            _write_medals(medals_path, size)
+            medals = open_parquet_source(medals_path).parquet_table()
+            n_medals = pq.ParquetFile(medals_path).metadata.num_rows
+            charts = {}
+            for name, backend in backends.items():
+                medal_map = MedalMap(df_cities, backend)
+                medals_by_country = MedalsByCountry(df_wide, backend)
+                charts[name] = (medal_map, medals_by_country)
+                map_ms = _time_ms(_map_figures(medal_map))
+                committees_ms = _time_ms(
+                    _committee_figures(medals_by_country, committees), repeat=2
+                )
+                grid_ms = _time_ms(
+                    lambda b=backend: MedalsByOlympicAndDiscipline(medals, b),
+                    repeat=2,
+                )
+                print(
+                    f"{size:<6}{name:<9}{len(df_cities):>8}{n_medals:>10}"
+                    f"{map_ms:>10.1f}{committees_ms:>17.1f}{grid_ms:>17.1f}"
+                )
+
+    print(
+        f"\nConcurrent map and committee requests, {size}x, "
+        f"{REQUESTS_PER_SESSION} per session"
+    )
+    print(f"{'sessions':<10}{'backend':<9}{'mean (ms)':>11}{'p95 (ms)':>10}")
+    for sessions in args.sessions:
+        for name, (medal_map, medals_by_country) in charts.items():
+            requests = _requests(medal_map, medals_by_country, committees)
+            latencies = _concurrent_latencies(sessions, requests)
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            print(
+                f"{sessions:<10}{name:<9}"
+                f"{statistics.mean(latencies):>11.1f}{p95:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
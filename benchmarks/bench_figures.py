@@ -0,0 +1,174 @@
+"""
+Benchmark of figure construction: prebuilt templates vs plotly.express.
+
+For each chart, times the chart method without the figure cache (data
+preparation and figure construction from the class template), and the
+plotly.express construction the classes used before, from the same data.
+
+Run from the `src` directory:
+
+    uv run python ../benchmarks/bench_figures.py
+"""
+
+import inspect
+import sys
+import time
+from pathlib import Path
+
+import plotly.express as px
+
+sys.path.insert(0, str(Path.cwd()))
+
+from loaders import build_chart_algorithms, load_datasets  # noqa: E402
+
+
+def _time_ms(function, repeat=20):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _uncached(chart, method_name):
+    method = inspect.unwrap(getattr(type(chart), method_name))
+    return lambda *args: method(chart, *args)
+
+
+def _px_season(charts):
+    chart = charts.medals_by_season
+    df = chart._compute_medals_by_season("All")
+    return lambda: px.bar(
+        df,
+        x="Olympiad",
+        y="Medal_count",
+        color="Medal_type",
+        color_discrete_map=chart.medal_colors.as_dict(),
+        title="Medal Count by Olympiad and Medal Type",
+        labels={"Medal_count": "Medal Count", "Olympiad": "Olympiad"},
+        category_orders={"Olympiad": df["Olympiad"].unique()},
+    )
+
+
+def _px_map(charts):
+    df = charts.medal_map._compute_medal_counts("All", "All")
+    return lambda: px.choropleth(
+        df,
+        locations="ISO_code_mapping",
+        color="Number of Medals",
+        hover_name="Country",
+        color_continuous_scale=px.colors.sequential.Plasma,
+        title="All Olympic Medals awarded by Host Country (All)",
+        projection="natural earth",
+    )
+
+
+def _px_olympics(charts):
+    chart = charts.medals_by_olimpics
+    df = chart._compute_data_by_olympics("Paris 2024")
+    return lambda: px.bar(
+        df,
+        x="Committee",
+        y=["Gold", "Silver", "Bronze"],
+        barmode="group",
+        color_discrete_map=chart.medal_colors.as_dict(),
+        labels={"value": "Count", "variable": "Medal Type"},
+        title="Count of Gold, Silver, Bronze Medals by Committee",
+    )
+
+
+def _px_country(charts):
+    committees = ["France", "United States"]
+    df = charts.medals_by_country._compute_medals_by_committee(
+        committees, "summer", "All", "Total"
+    )
+    return lambda: px.line(
+        df,
+        x="Olympic_year",
+        y=committees,
+        labels={"value": "Total - Medals", "variable": "Committee"},
+        title="All Medals for Selected Committees by Olympic Year | summer",
+        hover_data={"Olympiad": True},
+    ).update_traces(mode="markers+lines", marker=dict(size=4))
+
+
+def _px_grid(charts):
+    df = charts.medals_by_olympic_and_discipline._create_medals_grid("summer", "France")
+    olympiads = list(df.index.get_level_values("Olympiad").unique())
+    return lambda: px.imshow(
+        df,
+        labels=dict(x="Discipline", y="Olympiad", color="Total Medals"),
+        x=df.columns,
+        y=olympiads,
+        color_continuous_scale="plasma",
+        title="Medals by Olympiad and discipline for France | summer",
+    )
+
+
+def _px_sunburst(charts):
+    df = load_datasets("./data").read_columns(
+        "olympic_medals", ["Gender", "Discipline", "Event"]
+    )
+    df = df.astype(str)
+    chart = charts.sunburnst_by_gender
+    return lambda: px.sunburst(
+        df,
+        path=["Gender", "Discipline", "Event"],
+        color="Gender",
+        color_discrete_map=chart.gender_colors.as_dict(),
+        title="Total Medals by Gender, Discipline, and Event - All",
+    )
+
+
+def main():
+    charts = build_chart_algorithms(load_datasets("./data"))
+    cases = [
+        (
+            "bar by season",
+            _uncached(charts.medals_by_season, "create_bar_medal_season"),
+            ("All",),
+            _px_season,
+        ),
+        (
+            "medal map",
+            _uncached(charts.medal_map, "create_olympic_medals_by_country"),
+            ("All", "All"),
+            _px_map,
+        ),
+        (
+            "bar by committee",
+            _uncached(charts.medals_by_olimpics, "create_medals_by_olympics"),
+            ("Paris 2024",),
+            _px_olympics,
+        ),
+        (
+            "committees line",
+            _uncached(charts.medals_by_country, "create_medals_by_country_summer"),
+            (["France", "United States"], "All", "Total"),
+            _px_country,
+        ),
+        (
+            "discipline heatmap",
+            _uncached(
+                charts.medals_by_olympic_and_discipline, "plot_medals_grid_summer"
+            ),
+            ("France",),
+            _px_grid,
+        ),
+        (
+            "sunburst All",
+            _uncached(charts.sunburnst_by_gender, "create_sunburst_medals"),
+            ("All",),
+            _px_sunburst,
+        ),
+    ]
+
+    print(f"{'figure':<20}{'express (ms)':>14}{'template (ms)':>15}{'speedup':>9}")
+    for name, method, args, make_px in cases:
+        express = _time_ms(make_px(charts), repeat=5)
+        template = _time_ms(lambda: method(*args))
+        print(f"{name:<20}{express:>14.2f}{template:>15.2f}{express / template:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
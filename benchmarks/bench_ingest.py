@@ -0,0 +1,120 @@
+"""
+Benchmark of the ingest of the medals CSV file: pandas vs streaming.
+
+Builds CSV files 1x, 10x and 100x the size of `olympic_medals.csv` (repeating
+its rows) in a temporary directory, and converts each one to parquet in a new
+process, with:
+
+- pandas: `pd.read_csv` then `change_column_dtypes`, as the notebook did.
+- streaming: `transformation.ingest.stream_csv_to_parquet`.
+
+Reports rows per second and the peak RSS of the process. Run from the `src`
+directory (the 100x file takes 250 MB of disk):
+
+    uv run python ../benchmarks/bench_ingest.py [--sizes 1 10 100]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path.cwd()))
+
+SOURCE = Path("original_data/olympic_medals.csv")
+
+
+def _convert(mode, csv_path, parquet_path):
+    from transformation.ingest import stream_csv_to_parquet
+    from transformation.steps import (
+        MEDALS_CATEGORY_COLUMNS,
+        MERGED_OLYMPIADS,
+        change_column_dtypes,
+    )
+
+    if mode == "pandas":
+        import pandas as pd
+
+        df = pd.read_csv(csv_path)
+        df["Olympiad"] = df["Olympiad"].replace(MERGED_OLYMPIADS)
+        df = change_column_dtypes(df, "category", MEDALS_CATEGORY_COLUMNS)
+        df = change_column_dtypes(df, "str", ["Winner"])
+        df.to_parquet(parquet_path, index=False)
+        return len(df)
+    return stream_csv_to_parquet(
+        csv_path,
+        parquet_path,
+        category_columns=MEDALS_CATEGORY_COLUMNS,
+        string_columns=["Winner"],
+        replacements={"Olympiad": MERGED_OLYMPIADS},
+    )
+
+
+def _child(mode, csv_path, parquet_path):
+    """Convert the file, and print the rows, seconds and peak RSS (MB)."""
+    # Imports are not part of the measure
+    import pandas  # noqa: F401
+    import pyarrow.parquet  # noqa: F401
+
+    start = time.perf_counter()
+    rows = _convert(mode, csv_path, parquet_path)
+    seconds = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"rows": rows, "seconds": seconds, "peak_rss": peak_rss}))
+
+
+def _make_csv(path, copies):
+    lines = SOURCE.read_bytes().splitlines(keepends=True)
+    header, body = lines[0], b"".join(lines[1:])
+    with path.open("wb") as file:
+        file.write(header)
+        for _ in range(copies):
+            file.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'size':<6}{'mode':<11}{'rows':>11}{'rows/s':>12}{'peak RSS (MB)':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            csv_path = Path(directory) / f"medals_{size}x.csv"
+            _make_csv(csv_path, size)
+            for mode in ["pandas", "streaming"]:
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--child",
+                        mode,
+                        str(csv_path),
+                        str(Path(directory) / f"{mode}.parquet"),
+                    ],
+                    capture_output=True,
+                    text=True,
+                )
+                if output.returncode != 0:
+                    # For example, killed when out of memory
+                    print(f"{size:<6}{mode:<11}{'failed':>11}")
+                    continue
+                result = json.loads(output.stdout)
+                rows_per_second = result["rows"] / result["seconds"]
+                print(
+                    f"{size:<6}{mode:<11}{result['rows']:>11}"
+                    f"{rows_per_second:>12.0f}{result['peak_rss']:>15.0f}"
+                )
+            csv_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
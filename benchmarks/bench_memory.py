@@ -0,0 +1,126 @@
+"""
+Benchmark of the memory of the worker processes: parquet vs memory-mapped Arrow.
+
+Starts several worker processes at once, that each load the datasets with
+`loaders.load_datasets`, like the workers of the app, with:
+
+- parquet: the source tables decoded from the parquet files, in each process.
+- arrow: the source tables memory-mapped from Arrow IPC files (`loaders.ipc`).
+
+Once every worker has loaded the data, reports the RSS and PSS of each worker
+(from `/proc/<pid>/smaps_rollup`, Linux only), minus the memory of the process
+before loading the data. PSS splits the shared pages between the processes that
+map them: it is what each worker actually costs to the machine.
+
+Uses the data of `data` (1x) and data directories with the medals table
+repeated (e.g. 100x), built in a temporary directory. Run from the `src`
+directory:
+
+    uv run python ../benchmarks/bench_memory.py [--workers 4] [--sizes 1 100]
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path.cwd()))
+
+DATA_DIR = Path("data")
+
+
+def _memory(pid="self"):
+    """RSS and PSS of a process, in MB."""
+    memory = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in ("Rss", "Pss"):
+            memory[key.lower()] = int(value.split()[0]) / 1024
+    return memory
+
+
+def _child(data_format, data_dir):
+    """Load the datasets, print the memory used before, then wait for stdin."""
+    import loaders
+
+    before = _memory()
+    datasets = loaders.load_datasets(data_dir, data_format)
+    print(json.dumps({"before": before, "rows": len(datasets.olympic_medals)}))
+    sys.stdout.flush()
+    sys.stdin.read()
+
+
+def _make_data_dir(path, copies):
+    import pandas as pd
+
+    path.mkdir()
+    df = pd.read_parquet(DATA_DIR / "olympic_medals.parquet")
+    pd.concat([df] * copies, ignore_index=True).to_parquet(
+        path / "olympic_medals.parquet", index=False
+    )
+    shutil.copyfile(
+        DATA_DIR / "olympic_cities.parquet", path / "olympic_cities.parquet"
+    )
+
+
+def _measure(data_format, data_dir, workers):
+    """Mean RSS and PSS (MB) of the datasets in `workers` processes at once."""
+    processes = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--child", data_format, str(data_dir)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        results = [json.loads(process.stdout.readline()) for process in processes]
+        used = {"rss": 0.0, "pss": 0.0}
+        for process, result in zip(processes, results):
+            after = _memory(process.pid)
+            for key in used:
+                used[key] += (after[key] - result["before"][key]) / workers
+        return results[0]["rows"], used
+    finally:
+        for process in processes:
+            process.communicate("")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{args.workers} workers, memory of the datasets per worker")
+    print(f"{'size':<6}{'format':<9}{'rows':>10}{'RSS (MB)':>10}{'PSS (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            data_dir = Path(directory) / f"data_{size}x"
+            if size == 1:
+                shutil.copytree(
+                    DATA_DIR, data_dir, ignore=shutil.ignore_patterns("arrow")
+                )
+            else:
+                _make_data_dir(data_dir, size)
+            # The IPC files are written once, before the workers start
+            _measure("arrow", data_dir, 1)
+            for data_format in ["parquet", "arrow"]:
+                rows, used = _measure(data_format, data_dir, args.workers)
+                print(
+                    f"{size:<6}{data_format:<9}{rows:>10}"
+                    f"{used['rss']:>10.1f}{used['pss']:>10.1f}"
+                )
+            shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
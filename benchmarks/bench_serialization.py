@@ -0,0 +1,64 @@
+"""
+Benchmark of the figure payloads sent to the browser.
+
+Compares, for a few representative figures, the current path (Taipy calls
+`Figure.to_json` on each update) with the precompiled payloads of cached
+figures (`cache.PayloadFigure`), encoded once and then reused.
+
+Run from the `src` directory:
+
+    uv run python ../benchmarks/bench_serialization.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import plotly.graph_objects as go
+
+sys.path.insert(0, str(Path.cwd()))
+
+from cache import JSON_ENGINE, PayloadFigure, encode_payload  # noqa: E402
+from loaders import build_chart_algorithms, load_datasets  # noqa: E402
+
+
+def _time_ms(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    charts = build_chart_algorithms(load_datasets("./data"))
+    figures = {
+        "sunburst All": charts.sunburnst_by_gender.create_sunburst_medals("All"),
+        "committees line": charts.medals_by_country.create_medals_by_country_summer(
+            ["France", "United States"], "All", "Total"
+        ),
+        "discipline heatmap": (
+            charts.medals_by_olympic_and_discipline.plot_medals_grid_summer("France")
+        ),
+        "medal map": charts.medal_map.create_olympic_medals_by_country("All", "All"),
+    }
+
+    print(f"JSON engine: {JSON_ENGINE}")
+    print(
+        f"{'figure':<20}{'size (B)':>10}{'current (ms)':>14}"
+        f"{'first (ms)':>12}{'cached (ms)':>13}"
+    )
+    for name, figure in figures.items():
+        plain = go.Figure(figure)
+        current = _time_ms(lambda: json.loads(plain.to_json()))
+        first = _time_ms(lambda: encode_payload(figure))
+        payload_figure = PayloadFigure(figure, payload=encode_payload(figure))
+        cached = _time_ms(lambda: json.loads(payload_figure.to_json()))
+        print(
+            f"{name:<20}{len(payload_figure.to_json()):>10}{current:>14.2f}"
+            f"{first:>12.2f}{cached:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
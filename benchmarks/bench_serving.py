@@ -0,0 +1,149 @@
+"""
+Benchmark of the production server (`serve.py`) against the development server.
+
+Starts the app with each server, then sends requests from `--sessions`
+concurrent sessions (threads) for `--duration` seconds, and reports the
+throughput (requests per second) and the mean and 95th percentile latency.
+A session renders the pages of the app (`/taipy-jsx/<page>`, with its client
+id), like a browser that opens the app and navigates between its pages.
+
+With several worker processes, each session sends all its requests to the port
+of one worker, like a reverse proxy with sticky sessions (see `serve.py`).
+
+Servers:
+
+- dev: `taipy run --no-reloader main.py`, the command of the Docker image.
+- production: `serve.py`, with `--workers` processes of `--threads` threads.
+
+Run from the `src` directory (gunicorn must be installed):
+
+    uv run --extra production python ../benchmarks/bench_serving.py \
+        [--workers 1 2 4] [--threads 32] [--sessions 16] [--duration 20]
+"""
+
+import argparse
+import itertools
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+PAGES = ["all_time_medals", "medals_awarded_to_committees"]
+HOST = "127.0.0.1"
+PORT = 5300
+STARTUP_TIMEOUT = 120
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        response.read()
+
+
+def _wait_ready(ports):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    for port in ports:
+        while True:
+            try:
+                _get(f"http://{HOST}:{port}/")
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"The server on port {port} didn't start")
+                time.sleep(0.5)
+
+
+def _start(command):
+    # No data reload during the benchmark
+    env = {**os.environ, "DATA_RELOAD_INTERVAL": "0"}
+    return subprocess.Popen(
+        command,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _stop(server):
+    # `taipy run` runs the app in a child process: stop the process group
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+    # Wait until the other processes of the group are stopped too
+    while True:
+        try:
+            os.killpg(server.pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.2)
+
+
+def _load(ports, sessions, duration):
+    """Send requests from `sessions` threads, return the latencies (ms)."""
+    latencies = []
+    barrier = threading.Barrier(sessions)
+    ports = itertools.cycle(ports)
+
+    def session(client_id, port):
+        pages = itertools.cycle(PAGES)
+        barrier.wait()
+        end = time.perf_counter() + duration
+        while (start := time.perf_counter()) < end:
+            _get(f"http://{HOST}:{port}/taipy-jsx/{next(pages)}?client_id={client_id}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [
+        threading.Thread(target=session, args=(f"bench-{i}", next(ports)))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def _run(name, command, ports, args):
+    server = _start(command)
+    try:
+        _wait_ready(ports)
+        _load(ports, args.sessions, 2)  # warm-up
+        latencies = _load(ports, args.sessions, args.duration)
+    finally:
+        _stop(server)
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(
+        f"{name:<22}{len(latencies) / args.duration:>10.1f}"
+        f"{statistics.mean(latencies):>11.1f}{p95:>10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {os.cpu_count()} CPUs")
+    print(f"{'server':<22}{'req/s':>10}{'mean (ms)':>11}{'p95 (ms)':>10}")
+    dev_command = ["taipy", "run", "--no-reloader", "main.py"]
+    dev_command += ["-H", HOST, "-P", str(PORT)]
+    _run("dev", dev_command, [PORT], args)
+    for workers in args.workers:
+        command = [sys.executable, "serve.py", "--host", HOST, "--port", str(PORT)]
+        command += ["--workers", str(workers), "--threads", str(args.threads)]
+        ports = [PORT + i for i in range(workers)]
+        _run(f"production, {workers} worker(s)", command, ports, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from algorithms.bitmap_index import Bitmap as Bitmap
+from algorithms.bitmap_index import BitmapIndex as BitmapIndex
 from algorithms.create_medal_by_olympic_and_discipline import (
     MedalsByOlympicAndDiscipline as MedalsByOlympicAndDiscipline,
 )
@@ -6,4 +8,11 @@ from algorithms.create_medals_by_olympics import MedalsByOlympics as MedalsByOly
 from algorithms.create_medals_by_season import MedalsBySeason as MedalsBySeason
 from algorithms.create_olympic_map import MedalMap as MedalMap
 from algorithms.create_sunburst import SunburstByGender as SunburstByGender
+from algorithms.figure_template import SeasonFigures as SeasonFigures
+from algorithms.query_backends import QUERY_BACKENDS as QUERY_BACKENDS
+from algorithms.query_backends import DuckDBBackend as DuckDBBackend
+from algorithms.query_backends import PandasBackend as PandasBackend
+from algorithms.query_backends import ParquetTable as ParquetTable
+from algorithms.query_backends import PolarsBackend as PolarsBackend
+from algorithms.query_backends import get_query_backend as get_query_backend
 from algorithms.read_parameters import yaml_to_list as yaml_to_list
@@ -0,0 +1,270 @@
+"""
+Bitmap index over the low-cardinality dimensions of a table.
+
+The medals fact table has a few dimensions with few values (season, medal type,
+gender, committee type, discipline, Olympiad, committee). A `BitmapIndex` holds
+a bitset for each value of each dimension: bit `i` of the bitset of
+`("Gender", "Women")` is set when row `i` is a women's medal. Filters are then
+bitwise operations on the bitsets instead of comparisons on the columns:
+
+    index.where({"Olympic_season": "winter", "Gender": ["Women", "Mixed"]})
+    index.bitmap("Committee", "Norway") | index.bitmap("Committee", "Sweden")
+
+return a `Bitmap`: a set of rows, that can be combined with `&`, `|` and `~`,
+counted (`count`), or turned into row positions (`rows`) or into the rows of
+the table (`BitmapIndex.take`). `value_counts` counts the rows of a selection
+by the values of a dimension.
+
+The bitsets of a dimension are built the first time a filter uses it, from the
+column returned by `read_column`: a dimension of `k` values takes `k` bits per
+row, so dimensions that aren't used cost nothing.
+"""
+
+import threading
+from collections.abc import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def _n_words(n_rows: int) -> int:
+    return (n_rows + 63) // 64
+
+
+class Bitmap:
+    """A set of rows of a table, as a bitset of 64-bit words."""
+
+    __slots__ = ("n_rows", "words")
+
+    def __init__(self, words: np.ndarray, n_rows: int):
+        """
+        Args:
+            words (np.ndarray): The bits (uint64), row `i` is bit `i % 64` of
+                word `i // 64`. The bits after the last row must be 0.
+            n_rows (int): Number of rows of the table.
+        """
+        self.words = words
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "Bitmap":
+        """Bitmap of the rows where the boolean array `mask` is True."""
+        n_rows = len(mask)
+        packed = np.packbits(np.asarray(mask, dtype=bool), bitorder="little")
+        words = np.zeros(_n_words(n_rows), dtype=np.uint64)
+        words.view(np.uint8)[: len(packed)] = packed
+        return cls(words, n_rows)
+
+    @classmethod
+    def empty(cls, n_rows: int) -> "Bitmap":
+        return cls(np.zeros(_n_words(n_rows), dtype=np.uint64), n_rows)
+
+    @classmethod
+    def full(cls, n_rows: int) -> "Bitmap":
+        return ~cls.empty(n_rows)
+
+    def _check(self, other: "Bitmap") -> None:
+        if other.n_rows != self.n_rows:
+            raise ValueError(
+                f"Bitmaps of different tables ({self.n_rows} and {other.n_rows} rows)"
+            )
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        self._check(other)
+        return Bitmap(self.words & other.words, self.n_rows)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        self._check(other)
+        return Bitmap(self.words | other.words, self.n_rows)
+
+    def __invert__(self) -> "Bitmap":
+        words = ~self.words
+        if self.n_rows % 64:
+            # Clear the bits after the last row
+            words[-1] &= np.uint64((1 << (self.n_rows % 64)) - 1)
+        return Bitmap(words, self.n_rows)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self.n_rows == other.n_rows and np.array_equal(self.words, other.words)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Bitmap({self.count()} of {self.n_rows} rows)"
+
+    def count(self) -> int:
+        """Number of rows in the set."""
+        return int(np.bitwise_count(self.words).sum())
+
+    def mask(self) -> np.ndarray:
+        """Boolean array, True for the rows in the set."""
+        return np.unpackbits(
+            self.words.view(np.uint8), count=self.n_rows, bitorder="little"
+        ).view(bool)
+
+    def rows(self) -> np.ndarray:
+        """Positions of the rows in the set, in increasing order."""
+        return np.flatnonzero(self.mask())
+
+
+class _Dimension:
+    """Bitsets of the values of a column: one row of `bits` per value."""
+
+    def __init__(self, column: pd.Series, n_rows: int):
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            values = column.cat.categories
+        else:
+            codes, values = pd.factorize(column)
+        self.categories = pd.Index(values)
+
+        # A word holds distinct powers of two for each value: summing them with
+        # `bincount` sets the bits. Sums of bits 0-31 and of bits 32-63 are
+        # exact in float64.
+        n_words = _n_words(n_rows)
+        positions = np.flatnonzero(codes >= 0)
+        keys = codes[positions].astype(np.int64) * n_words + positions // 64
+        shifts = positions % 64
+        size = len(values) * n_words
+        low = shifts < 32
+        low_bits = np.bincount(keys[low], np.exp2(shifts[low]), minlength=size)
+        high_bits = np.bincount(keys[~low], np.exp2(shifts[~low] - 32), minlength=size)
+        self.bits = (
+            low_bits.astype(np.uint64) | high_bits.astype(np.uint64) << 32
+        ).reshape(len(values), n_words)
+
+    def words(self, value) -> np.ndarray | None:
+        """Bitset of a value (None for values not in the column)."""
+        code = self.categories.get_indexer([value])[0]
+        return None if code < 0 else self.bits[code]
+
+
+class BitmapIndex:
+    """Bitsets of the values of the dimensions of a table, built on first use."""
+
+    def __init__(
+        self,
+        columns: Iterable[str],
+        n_rows: int,
+        read_column: Callable[[str], pd.Series],
+    ):
+        """
+        Args:
+            columns (Iterable[str]): The dimensions that can be filtered.
+            n_rows (int): Number of rows of the table.
+            read_column (Callable): Returns a column of the table, in row order.
+        """
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self._read_column = read_column
+        self._dimensions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, columns: Iterable[str] | None = None
+    ) -> "BitmapIndex":
+        """Index of columns of a DataFrame (all of them by default)."""
+        columns = df.columns if columns is None else columns
+        return cls(columns, len(df), lambda column: df[column])
+
+    def _dimension(self, column: str) -> _Dimension:
+        if column not in self.columns:
+            raise KeyError(f"Column not in the bitmap index: {column!r}")
+        with self._lock:
+            dimension = self._dimensions.get(column)
+            if dimension is None:
+                dimension = _Dimension(self._read_column(column), self.n_rows)
+                self._dimensions[column] = dimension
+        return dimension
+
+    def values(self, column: str) -> pd.Index:
+        """Values of a dimension (in category order, for categorical columns)."""
+        return self._dimension(column).categories
+
+    def bitmap(self, column: str, values) -> Bitmap:
+        """
+        Rows with one of some values in a column.
+
+        Args:
+            column (str): A dimension of the index.
+            values: A value, or a list, tuple or set of values.
+
+        Returns:
+            Bitmap: The rows.
+
+        Raises:
+            KeyError: If the column is not a dimension of the index.
+        """
+        dimension = self._dimension(column)
+        if not isinstance(values, (list, tuple, set, frozenset)):
+            values = [values]
+        words = np.zeros(_n_words(self.n_rows), dtype=np.uint64)
+        for value in values:
+            value_words = dimension.words(value)
+            if value_words is not None:
+                words |= value_words
+        return Bitmap(words, self.n_rows)
+
+    def where(self, filters: dict | None = None) -> Bitmap:
+        """
+        Rows that match all the filters.
+
+        Args:
+            filters (dict | None): Values of columns that the rows must have: a
+                value, or a list of values, one of which the row must have.
+
+        Returns:
+            Bitmap: The rows (all of them, without filters).
+        """
+        selection = Bitmap.full(self.n_rows)
+        for column, values in (filters or {}).items():
+            selection = selection & self.bitmap(column, values)
+        return selection
+
+    def count(self, filters: dict | None = None) -> int:
+        """Number of rows that match the filters (see `where`)."""
+        return self.where(filters).count()
+
+    def value_counts(self, column: str, selection: Bitmap | None = None) -> pd.Series:
+        """
+        Count the rows of a selection by the values of a dimension.
+
+        Args:
+            column (str): A dimension of the index.
+            selection (Bitmap | None): The rows, all of them by default.
+
+        Returns:
+            pd.Series: Number of rows by value (0 for values without rows), in
+            the order of `values`.
+        """
+        dimension = self._dimension(column)
+        bits = dimension.bits
+        if selection is not None:
+            bits = bits & selection.words
+        counts = np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+        return pd.Series(counts, index=dimension.categories, name="count")
+
+    def take(self, df: pd.DataFrame, selection: Bitmap | dict) -> pd.DataFrame:
+        """
+        Rows of the indexed table.
+
+        Args:
+            df (pd.DataFrame): The indexed table, or some of its columns.
+            selection (Bitmap | dict): The rows, or filters (see `where`).
+
+        Returns:
+            pd.DataFrame: The rows, in the order of `df`, with their index.
+
+        Raises:
+            ValueError: If `df` doesn't have the rows of the index.
+        """
+        if len(df) != self.n_rows:
+            raise ValueError(
+                f"The table has {len(df)} rows, the index has {self.n_rows}"
+            )
+        if isinstance(selection, dict):
+            selection = self.where(selection)
+        return df.iloc[selection.rows()]
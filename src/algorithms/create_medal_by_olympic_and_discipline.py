@@ -5,90 +5,241 @@ This module defines the MedalsByOlympicAndDiscipline class, which creates a
 grid with the number of medals a country has obtained for a certain discipline,
 and by Olympic event.
 
+The medal counts are precomputed once per Olympic season as an integer tensor
+(committee x olympiad x discipline), so a heatmap is a single slice.
+`plot_medals_grids` returns the summer and the winter heatmaps of a committee
+together (the committee page shows both).
+
 Used by `all_time_medals.py`.
 """
 
-from functools import partial
+from dataclasses import dataclass
+from typing import Optional
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
+from plotly.colors import sequential
+
+from algorithms.bitmap_index import BitmapIndex
+from algorithms.figure_template import FigureTemplate, SeasonFigures
+from algorithms.query_backends import (
+    PandasBackend,
+    ParquetTable,
+    QueryBackend,
+    Table,
+)
+from cache import memoize_figure
+
+
+@dataclass(frozen=True)
+class SeasonMedalsGrid:
+    """Medal counts for one Olympic season.
+
+    - medals: integer tensor indexed by (committee, olympiad, discipline).
+    - olympiads: (Olympiad, Olympic_year) index, sorted by year.
+    - disciplines: disciplines of the season, in order of first appearance.
+    """
+
+    medals: np.ndarray
+    olympiads: pd.MultiIndex
+    disciplines: pd.Index
 
 
 class MedalsByOlympicAndDiscipline:
     """Handles data aggregation and generates a bar chart by Olympic season."""
 
+    # Columns of the medals table used by the class
+    REQUIRED_COLUMNS = [
+        "Olympiad",
+        "Olympic_year",
+        "Olympic_season",
+        "Committee",
+        "Discipline",
+    ]
+
     def __init__(
         self,
-        df_olympic_medals: pd.DataFrame,
+        df_olympic_medals: Table,
+        query_backend: Optional[QueryBackend] = None,
+        medals_index: Optional[BitmapIndex] = None,
     ):
-        """Initialize MedalsBySeason with medal data and optional color mapping."""
-        self.df_olympic_medals = df_olympic_medals.copy()
-        self.df_summer = self._filter_olympic_season(df_olympic_medals, "summer")
-        self.df_winter = self._filter_olympic_season(df_olympic_medals, "winter")
-        self.summer_disciplines = self.df_summer["Discipline"].unique()
-        self.winter_disciplines = self.df_winter["Discipline"].unique()
-        self._create_summer_grid = partial(
-            self._create_medals_grid, self.df_summer, self.summer_disciplines
+        """Initialize MedalsBySeason with medal data, the query backend that
+        counts the medals (see `algorithms.query_backends`), and optionally a
+        bitmap index of the medal data, to select the rows of each season
+        (an index of the seasons is built by default).
+
+        The medal data can also be a parquet table: the backend then queries
+        the rows of each season from the file (see `loaders.charts`)."""
+        self.query_backend = query_backend or PandasBackend()
+        if medals_index is None and not isinstance(df_olympic_medals, ParquetTable):
+            medals_index = BitmapIndex.from_frame(df_olympic_medals, ["Olympic_season"])
+        self.medals_index = medals_index
+        self.committees = pd.Index(
+            pd.Categorical(
+                self.query_backend.unique(df_olympic_medals, "Committee")
+            ).categories
         )
-        self._create_winter_grid = partial(
-            self._create_medals_grid, self.df_winter, self.winter_disciplines
-        )
-
+        self._grids = {
+            season: self._build_season_grid(
+                *self._season_rows(df_olympic_medals, season)
+            )
+            for season in ("summer", "winter")
+        }
+        self.summer_disciplines = self._grids["summer"].disciplines
+        self.winter_disciplines = self._grids["winter"].disciplines
+        self.template = self._make_template()
+
+    @memoize_figure
     def plot_medals_grid_summer(self, committee):
-        df_grouped = self._create_summer_grid(committee=committee)
+        df_grouped = self._create_medals_grid("summer", committee=committee)
         return self._plot_medals_grid_common(df_grouped, committee, "summer")
 
+    @memoize_figure
     def plot_medals_grid_winter(self, committee):
-        df_grouped = self._create_winter_grid(committee=committee)
+        df_grouped = self._create_medals_grid("winter", committee=committee)
         return self._plot_medals_grid_common(df_grouped, committee, "winter")
 
-    def _create_medals_grid(self, df_medals, all_disciplines, committee):
+    @memoize_figure
+    def plot_medals_grids(self, committee) -> SeasonFigures:
+        """Plot the summer and the winter heatmaps of a committee, in one pass
+        (the committee is looked up once)."""
+        committee_idx = self._get_committee_index(committee)
+        return SeasonFigures(
+            *(
+                self._plot_medals_grid_common(
+                    self._slice_medals_grid(season, committee_idx), committee, season
+                )
+                for season in ("summer", "winter")
+            )
+        )
+
+    def _create_medals_grid(self, season, committee):
         """
-        Plot medals won by a committee across different disciplines and Olympiads.
+        Slice the medals won by a committee across disciplines and Olympiads.
 
         Parameters:
-        - df_medals (DataFrame): DataFrame containing medal data.
-        - all_disciplines (list): All the disciplines for the Olympic season.
+        - season (str): Olympic season, "summer" or "winter".
         - committee (str): Name of the committee.
 
         Returns:
-        - fig: Plotly figure object showing medals by Olympiad and discipline for
-        the committee.
+        - DataFrame: medals by (Olympiad, Olympic_year) and discipline, with only
+        the Olympiads where the committee won medals, sorted by year.
         """
-        df_medals = df_medals[(df_medals["Committee"] == committee)]
-        return self._pivot_olympic_by_discipline(df_medals).reindex(
-            columns=all_disciplines, fill_value=0
+        return self._slice_medals_grid(season, self._get_committee_index(committee))
+
+    def _get_committee_index(self, committee) -> int:
+        """Position of a committee in the grids (-1 for unknown committees)."""
+        return self.committees.get_indexer([committee])[0]
+
+    def _slice_medals_grid(self, season, committee_idx):
+        grid = self._grids[season]
+        if committee_idx < 0:
+            committee_medals = np.zeros(grid.medals.shape[1:], grid.medals.dtype)
+        else:
+            committee_medals = grid.medals[committee_idx]
+
+        has_medals = committee_medals.any(axis=1)
+        return pd.DataFrame(
+            committee_medals[has_medals],
+            index=grid.olympiads[has_medals],
+            columns=grid.disciplines,
         )
 
+    def _make_template(self) -> FigureTemplate:
+        """Build the layout and style of the heatmap (same as `px.imshow`)."""
+        # reduce font size:
+        small_tick_font = dict(tickfont=dict(size=9))
+        template = FigureTemplate(
+            layout=dict(
+                xaxis=dict(
+                    anchor="y",
+                    domain=[0.0, 1.0],
+                    scaleanchor="y",
+                    constrain="domain",
+                    title_text="Discipline",
+                    **small_tick_font,
+                ),
+                yaxis=dict(
+                    anchor="x",
+                    domain=[0.0, 1.0],
+                    autorange="reversed",
+                    constrain="domain",
+                    title_text="Olympiad",
+                    **small_tick_font,
+                ),
+                coloraxis=dict(
+                    colorbar=dict(title_text="Total Medals", **small_tick_font),
+                    colorscale=sequential.Plasma,
+                ),
+            ),
+            trace_type="heatmap",
+        )
+        self.heatmap_style = template.trace_style(
+            coloraxis="coloraxis",
+            name="0",
+            xaxis="x",
+            yaxis="y",
+            hovertemplate="Discipline: %{x}<br>Olympiad: %{y}<br>"
+            "Total Medals: %{z}<extra></extra>",
+        )
+        return template
+
     def _plot_grid_for_country(self, df_grouped, title, ordered_olympiads):
-        fig = px.imshow(
-            df_grouped,
-            labels=dict(x="Discipline", y="Olympiad", color="Total Medals"),
-            x=df_grouped.columns,
+        trace = self.template.trace(
+            self.heatmap_style,
+            x=list(df_grouped.columns),
             y=ordered_olympiads,
-            color_continuous_scale="plasma",
-            title=title,
+            z=df_grouped.to_numpy(),
         )
-        # reduce font size:
-        small_tick_font = dict(tickfont=dict(size=9))
-        fig.update_layout(
-            xaxis=small_tick_font,
-            yaxis=small_tick_font,
-            coloraxis_colorbar=small_tick_font,
+        return self.template.make_figure([trace], title=dict(text=title))
+
+    def _build_season_grid(self, medals, filters=None):
+        """Build the (committee, olympiad, discipline) medal tensor of a season,
+        from the rows of `medals` with the values of `filters`."""
+        disciplines = self.query_backend.unique(medals, "Discipline", filters)
+        df_pivot = self._pivot_olympic_by_discipline(medals, filters)
+        olympiads = pd.MultiIndex.from_frame(
+            df_pivot.index.to_frame(index=False)[["Olympiad", "Olympic_year"]]
+            .drop_duplicates()
+            .sort_values(["Olympic_year", "Olympiad"])
         )
-        return fig
 
-    def _pivot_olympic_by_discipline(self, df):
-        return df.pivot_table(
-            index=["Olympiad", "Olympic_year"],
-            columns="Discipline",
-            aggfunc="size",
-            fill_value=0,
-            observed=True,
-        ).sort_index(level=1)
+        committee_idx = self.committees.get_indexer(
+            df_pivot.index.get_level_values("Committee")
+        )
+        olympiad_idx = olympiads.get_level_values("Olympiad").get_indexer(
+            df_pivot.index.get_level_values("Olympiad")
+        )
+        discipline_idx = disciplines.get_indexer(df_pivot.columns)
+
+        # Same integer type as `pivot_table`, so the heatmaps are unchanged
+        medals = np.zeros(
+            (len(self.committees), len(olympiads), len(disciplines)), dtype=np.int64
+        )
+        medals[committee_idx[:, None], olympiad_idx[:, None], discipline_idx] = (
+            df_pivot.to_numpy()
+        )
+        return SeasonMedalsGrid(medals, olympiads, disciplines)
 
-    def _filter_olympic_season(self, df, season):
-        return df[(df["Olympic_season"] == season)].copy()
+    def _pivot_olympic_by_discipline(self, df, filters=None):
+        return self.query_backend.pivot_size(
+            df,
+            index=["Committee", "Olympiad", "Olympic_year"],
+            columns="Discipline",
+            filters=filters,
+        ).sort_index(level="Olympic_year")
+
+    def _season_rows(self, df, season):
+        """The medals of a season to query, and their filters: the rows of a
+        frame are selected with the bitmap index, while parquet tables are
+        filtered by the queries."""
+        if isinstance(df, ParquetTable):
+            return df, {"Olympic_season": season}
+        return self._select_olympic_season(df, season), None
+
+    def _select_olympic_season(self, df, season):
+        """Rows of a season, selected with the bitmap index."""
+        return self.medals_index.take(df, {"Olympic_season": season})
 
     def _plot_medals_grid_common(self, df_grouped, committee, season):
         ordered_olympiads = list(df_grouped.index.get_level_values("Olympiad").unique())
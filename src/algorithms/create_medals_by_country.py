@@ -5,28 +5,56 @@ This module defines the MedalsByCountry class, which filters, computes,
 and plots total or percentage-based medal counts for different Olympic
 committees using pandas and Plotly.
 
+Each chart selects the rows of a season and a medal type, and the columns of
+the selected committees, from the wide `total_medals_by_olympiad_and_committee`
+table, with a query backend (see `algorithms.query_backends`). The percentages
+are computed for all the committees at once, with NumPy broadcasting.
+
+`create_medals_by_country_seasons` returns the summer and the winter charts of
+a selection together (the committee page shows both), looking the committees
+up once.
+
 Used by `medals_by_committee.py`.
 """
 
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from plotly.graph_objs import Figure
 
+from algorithms.figure_template import FigureTemplate, SeasonFigures
+from algorithms.query_backends import PandasBackend, QueryBackend
+from cache import memoize_figure
+
+SEASONS = ("summer", "winter")
+
+_NON_COMMITTEE_COLUMNS = [
+    "Olympic_year",
+    "Olympiad",
+    "Olympic_season",
+    "Medal_type",
+    "Total_medals",
+]
+
 
 class MedalsByCountry:
     """Handles data aggregation and generates line plots with medals by
     committee, for summer and for winter Olympics."""
 
-    def __init__(self, df_total_medals_by_olympiad_and_committee: pd.DataFrame):
-        self.total_medals = df_total_medals_by_olympiad_and_committee.copy()
-        self.columns_for_plot = [
-            "Olympic_year",
-            "Olympiad",
-            "Total_medals",
-        ]
+    def __init__(
+        self,
+        df_total_medals_by_olympiad_and_committee: pd.DataFrame,
+        query_backend: Optional[QueryBackend] = None,
+    ):
+        """Initialize MedalsByCountry with the wide medal table, and the query
+        backend that selects its rows (see `algorithms.query_backends`)."""
+        self.df_total_medals = df_total_medals_by_olympiad_and_committee
+        self.committees = self.df_total_medals.columns.drop(_NON_COMMITTEE_COLUMNS)
+        self.query_backend = query_backend or PandasBackend()
+        self.template = self._make_template()
 
+    @memoize_figure
     def create_medals_by_country_summer(
         self,
         committee_list: List[str],
@@ -41,6 +69,7 @@ class MedalsByCountry:
             season="summer",
         )
 
+    @memoize_figure
     def create_medals_by_country_winter(
         self,
         committee_list: List[str],
@@ -55,6 +84,25 @@ class MedalsByCountry:
             season="winter",
         )
 
+    @memoize_figure
+    def create_medals_by_country_seasons(
+        self,
+        committee_list: List[str],
+        medal_type: str,
+        percentage: str,
+    ) -> SeasonFigures:
+        """Public method to plot medals by country for the Summer and the Winter
+        Olympics, in one pass (the committees are looked up once)."""
+        df_seasons = self._filter_seasons(committee_list, SEASONS, medal_type)
+        return SeasonFigures(
+            *(
+                self._plot_season(
+                    df_seasons[season], committee_list, medal_type, percentage, season
+                )
+                for season in SEASONS
+            )
+        )
+
     def _create_medals_by_country(
         self,
         committee_list: List[str],
@@ -76,13 +124,27 @@ class MedalsByCountry:
         Returns:
         - fig: Plotly figure object with total medals by year for committees.
         """
+        df_filtered = self._filter_dataset(committee_list, season, medal_type)
+        return self._plot_season(
+            df_filtered, committee_list, medal_type, percentage, season
+        )
+
+    def _plot_season(
+        self,
+        df_filtered: pd.DataFrame,
+        committee_list: List[str],
+        medal_type: str,
+        percentage: str,
+        season: str,
+    ) -> Figure:
+        """Plot the medals of a season, sliced by `_filter_dataset`."""
         chart_title = (
             f"{medal_type} Medals for Selected Committees by Olympic Year | {season}"
         )
         value_label = f"{percentage} - Medals"
 
-        medals_country = self._compute_medals_by_committee(
-            committee_list, season, medal_type, percentage
+        medals_country = self._to_medals_by_committee(
+            df_filtered, committee_list, percentage
         )
         return self._plot_fig_total_medals_by_country(
             medals_country, committee_list, value_label, chart_title
@@ -96,10 +158,37 @@ class MedalsByCountry:
         percentage: str,
     ) -> pd.DataFrame:
         """Compute medals by committee, optionally converting to percentages."""
-        df_to_plot = self._filter_dataset(committee_list, season, medal_type)
+        df_filtered = self._filter_dataset(committee_list, season, medal_type)
+        return self._to_medals_by_committee(df_filtered, committee_list, percentage)
+
+    def _to_medals_by_committee(
+        self, df_filtered: pd.DataFrame, committee_list: List[str], percentage: str
+    ) -> pd.DataFrame:
         if percentage == "Percentage":
-            df_to_plot = self._compute_percentage(df_to_plot, committee_list)
-        return df_to_plot.drop(columns=["Total_medals"])
+            df_filtered = self._compute_percentage(df_filtered, committee_list)
+        return df_filtered.drop(columns=["Total_medals"])
+
+    def _make_template(self) -> FigureTemplate:
+        """Build the layout and line style of the chart (same as `px.line`)."""
+        template = FigureTemplate(
+            layout=dict(
+                xaxis=dict(anchor="y", domain=[0.0, 1.0], title_text="Year"),
+                yaxis=dict(anchor="x", domain=[0.0, 1.0]),
+                legend=dict(title_text="Committee", tracegroupgap=0),
+            ),
+            trace_type="scatter",
+        )
+        self.line_style = template.trace_style(
+            line_dash="solid",
+            marker=dict(symbol="circle", size=4),
+            mode="markers+lines",
+            orientation="v",
+            showlegend=True,
+            xaxis="x",
+            yaxis="y",
+        )
+        self.line_colors = template.layout["template"]["layout"]["colorway"]
+        return template
 
     def _plot_fig_total_medals_by_country(
         self,
@@ -108,41 +197,73 @@ class MedalsByCountry:
         value_label: str,
         title: str,
     ) -> Figure:
-        """Create a Plotly line chart showing total medals by committee over time."""
-        fig = px.line(
-            df_to_plot,
-            x="Olympic_year",
-            y=committee_list,
-            labels={
-                "value": value_label,
-                "variable": "Committee",
-                "Olympic_year": "Year",
-                "Olympiad": "Olympiad",
-            },
-            title=title,
-            hover_data={"Olympiad": True},
-        )
-        fig.update_traces(mode="markers+lines", marker=dict(size=4))
-        return fig
+        """Create a line chart showing total medals by committee over time."""
+        years = df_to_plot["Olympic_year"].to_numpy()
+        olympiads = np.asarray(df_to_plot["Olympiad"], dtype=object)[:, np.newaxis]
+        traces = []
+        for i, committee in enumerate(committee_list):
+            trace = self.template.trace(
+                self.line_style,
+                customdata=olympiads,
+                hovertemplate=f"Committee={committee}<br>Year=%{{x}}"
+                f"<br>{value_label}=%{{y}}<br>Olympiad=%{{customdata[0]}}"
+                "<extra></extra>",
+                legendgroup=committee,
+                name=committee,
+                x=years,
+                y=df_to_plot[committee].to_numpy(),
+            )
+            trace["line"]["color"] = self.line_colors[i % len(self.line_colors)]
+            traces.append(trace)
+
+        yaxis = dict(self.template.layout["yaxis"], title=dict(text=value_label))
+        return self.template.make_figure(traces, yaxis=yaxis, title=dict(text=title))
 
     def _filter_dataset(
         self, committee_list: List[str], season: str, medal_type: str
     ) -> pd.DataFrame:
-        """Filter the medals dataset by Olympic season and medal type."""
-        df_filtered = self.total_medals[
-            (self.total_medals["Olympic_season"] == season)
-            & (self.total_medals["Medal_type"] == medal_type)
-        ]
+        """Select the medals of an Olympic season and a medal type."""
+        return self._filter_seasons(committee_list, [season], medal_type)[season]
 
-        columns_to_plot = self.columns_for_plot + committee_list
-        return df_filtered[columns_to_plot].copy()
+    def _filter_seasons(
+        self, committee_list: List[str], seasons, medal_type: str
+    ) -> dict[str, pd.DataFrame]:
+        """Select the medals of a medal type for several Olympic seasons (the
+        committees are checked once), and return them by season."""
+        self._check_committees(committee_list)
+        columns = ["Olympic_year", "Olympiad", "Total_medals", *committee_list]
+        return {
+            season: self.query_backend.filter(
+                self.df_total_medals,
+                {"Olympic_season": season, "Medal_type": medal_type},
+                columns,
+            )
+            for season in seasons
+        }
 
     def _compute_percentage(
         self, df_to_plot: pd.DataFrame, committee_list: List[str]
     ) -> pd.DataFrame:
-        """Compute percentage of medals per committee based on total medals."""
-        for committee in committee_list:
-            df_to_plot[committee] = (
-                df_to_plot[committee].astype(float) * 100 / df_to_plot["Total_medals"]
-            ).fillna(0)
-        return df_to_plot
+        """Compute percentage of medals per committee based on total medals.
+
+        Committee columns come last in the frames built by `_filter_dataset`, so
+        appending the percentages keeps the original column order.
+        """
+        values = df_to_plot[committee_list].to_numpy(dtype=float)
+        totals = df_to_plot["Total_medals"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = values * 100 / totals[:, np.newaxis]
+        df_percentages = pd.DataFrame(
+            np.where(np.isnan(percentages), 0, percentages),
+            index=df_to_plot.index,
+            columns=committee_list,
+        )
+        return pd.concat(
+            [df_to_plot.drop(columns=committee_list), df_percentages], axis=1
+        )
+
+    def _check_committees(self, committee_list: List[str]) -> None:
+        """Raise a KeyError for the committees that are not in the table."""
+        missing = [c for c in committee_list if c not in self.committees]
+        if missing:
+            raise KeyError(f"{missing} not in index")
@@ -5,17 +5,24 @@ This module defines the MedalsByOlympics class, which filter the dataset by
 Olympiad. The`create_medals_by_olympics` method returns a bar chart with all
 medals awarded for a each Olympic committee.
 
+The dataset is partitioned once into read-only, per-Olympiad blocks, so a
+selector change is a dictionary lookup.
+
 Used by `all_time_medals.py`.
 """
 
 from typing import Optional
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from plotly.graph_objs import Figure
 
+from algorithms.figure_template import FigureTemplate
+from cache import memoize_figure
 from context import MedalColorMap
 
+PLOT_COLUMNS = ["Committee", "Gold", "Silver", "Bronze"]
+
 
 class MedalsByOlympics:
     """Handles data aggregation and generates a bar chart by Olympiad."""
@@ -26,9 +33,11 @@ class MedalsByOlympics:
         medal_colors: Optional[MedalColorMap] = None,
     ):
         """Initialize the MedalsByOlympics class with aggregated medal data."""
-        self.df_grouped_medals_olympiads = df_grouped_medals_olympiads.copy()
         self.medal_colors = medal_colors or MedalColorMap()
+        self._partition_by_olympiad(df_grouped_medals_olympiads)
+        self.template = self._make_template()
 
+    @memoize_figure
     def create_medals_by_olympics(self, olympiad: str) -> Figure:
         """
         Generates a Plotly bar chart displaying the count of Gold, Silver, and
@@ -40,58 +49,109 @@ class MedalsByOlympics:
 
         Returns:
             plotly.graph_objects.Figure: An interactive Plotly bar chart figure object.
-                                         Returns empty fig if data retrieval fails.
+                                         Returns empty fig for unknown Olympiads.
         """
-        df_medals_to_plot = self._generate_data_by_olympics(olympiad)
+        df_medals_to_plot = self._compute_data_by_olympics(olympiad)
         return self._plot_by_committee(df_medals_to_plot)
 
-    def _generate_data_by_olympics(self, olympiad: str) -> pd.DataFrame:
-        """
-        Retrieves medal data for a specific Olympiad.
-
-        Args:
-            olympiad (str): ""All", or name of the Olympiad.
-
-        Returns:
-            pd.DataFrame: The DataFrame to plot, with medals awarded to each Nation
-            by Olympic game. Returns an empty DataFrame on failure.
-        """
-        try:
-            return self._compute_data_by_olympics(olympiad)
-        except Exception as e:
-            print(f"Error filtering data: {e}")
-            print(self.df_grouped_medals_olympiads.head(3))
-            return pd.DataFrame()
+    def _make_template(self) -> FigureTemplate:
+        """Build the layout and trace styles of the chart (same as `px.bar`)."""
+        template = FigureTemplate(
+            layout=dict(
+                xaxis=dict(anchor="y", domain=[0.0, 1.0], title_text="Committee"),
+                yaxis=dict(anchor="x", domain=[0.0, 1.0], title_text="Count"),
+                legend_tracegroupgap=0,
+                title_text="Count of Gold, Silver, Bronze Medals by Committee",
+                barmode="group",
+            ),
+            trace_type="bar",
+        )
+        self.medal_styles = {
+            medal_type: template.trace_style(
+                alignmentgroup="True",
+                hovertemplate=f"Medal Type={medal_type}<br>Committee=%{{x}}"
+                "<br>Count=%{y}<extra></extra>",
+                legendgroup=medal_type,
+                marker=dict(
+                    color=self.medal_colors.as_dict()[medal_type], pattern_shape=""
+                ),
+                name=medal_type,
+                offsetgroup=medal_type,
+                orientation="v",
+                showlegend=True,
+                textposition="auto",
+                xaxis="x",
+                yaxis="y",
+            )
+            for medal_type in PLOT_COLUMNS[1:]
+        }
+        return template
 
     def _plot_by_committee(self, df_aggregated: pd.DataFrame) -> Figure:
         """Generate a grouped bar chart of medal counts by committee."""
-        fig = px.bar(
-            df_aggregated,
-            x="Committee",
-            y=["Gold", "Silver", "Bronze"],
-            barmode="group",
-            orientation="v",
-            color_discrete_map=self.medal_colors.as_dict(),
-            labels={"value": "Count", "variable": "Medal Type"},
-            title="Count of Gold, Silver, Bronze Medals by Committee",
-        )
-        fig.update_layout(xaxis={"title": "Committee"}, yaxis={"title": "Count"})
-        return fig
+        if df_aggregated.empty:
+            return self.template.make_figure([])
+
+        committees = np.asarray(df_aggregated["Committee"], dtype=object)
+        traces = [
+            self.template.trace(
+                style, x=committees, y=df_aggregated[medal_type].to_numpy()
+            )
+            for medal_type, style in self.medal_styles.items()
+        ]
+        legend = dict(self.template.layout["legend"], title=dict(text="Medal Type"))
+        return self.template.make_figure(traces, legend=legend)
 
     def _compute_data_by_olympics(self, olympiad: str) -> pd.DataFrame:
         """
-        Filters the aggregated medals DataFrame for a specific Olympiad and
-        cleans the resulting data for plotting.
+        Looks up the medal block of a specific Olympiad.
 
         Args:
-            olympiad (str): The name of the Olympiad to filter by.
+            olympiad (str): "All", or name of the Olympiad.
 
         Returns:
-            pd.DataFrame: A filtered DataFrame containing medal counts ('Gold',
-                         'Silver', 'Bronze') grouped by 'Committee' for the
-                         specified Olympiad, with the 'Olympiad' column dropped.
+            pd.DataFrame: A read-only DataFrame containing medal counts ('Gold',
+                         'Silver', 'Bronze') by 'Committee' for the specified
+                         Olympiad. Returns an empty DataFrame with the same
+                         columns for unknown Olympiads.
+        """
+        olympiad_code = self.olympiads.get_indexer([olympiad])[0]
+        return self._blocks.get(olympiad_code, self._empty_block)
+
+    def _partition_by_olympiad(self, df_grouped_medals_olympiads: pd.DataFrame):
         """
-        df_medals_to_plot = self.df_grouped_medals_olympiads.copy()
-        df_medals_to_plot = df_medals_to_plot[df_medals_to_plot["Olympiad"] == olympiad]
-        df_medals_to_plot = df_medals_to_plot.drop(columns="Olympiad")
-        return df_medals_to_plot
+        Split the aggregated medals DataFrame into one block per Olympiad, keyed by
+        the Olympiad code, with only the columns used for plotting.
+        """
+        olympiad_codes, olympiads = pd.factorize(
+            df_grouped_medals_olympiads["Olympiad"]
+        )
+        self.olympiads = pd.Index(olympiads)
+        df_to_partition = df_grouped_medals_olympiads[PLOT_COLUMNS]
+
+        positions_by_code = (
+            pd.Series(np.arange(len(df_to_partition))).groupby(olympiad_codes).indices
+        )
+        self._blocks = {
+            code: self._make_read_only_block(df_to_partition, positions)
+            for code, positions in positions_by_code.items()
+        }
+        self._empty_block = self._make_read_only_block(
+            df_to_partition, np.array([], dtype=np.intp)
+        )
+
+    def _make_read_only_block(
+        self, df: pd.DataFrame, positions: np.ndarray
+    ) -> pd.DataFrame:
+        """Take the rows at `positions` into a DataFrame backed by read-only arrays."""
+        columns = {}
+        for name, column in df.items():
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes = column.cat.codes.to_numpy()[positions]
+                codes.flags.writeable = False
+                columns[name] = pd.Categorical.from_codes(codes, dtype=column.dtype)
+            else:
+                values = column.to_numpy()[positions]
+                values.flags.writeable = False
+                columns[name] = values
+        return pd.DataFrame(columns, copy=False)
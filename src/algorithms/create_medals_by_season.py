@@ -11,11 +11,30 @@ Used by `all_time_medals.py`.
 from typing import Optional
 
 import pandas as pd
-import plotly.express as px
 from plotly.graph_objs import Figure
 
+from algorithms.bitmap_index import BitmapIndex
+from algorithms.figure_template import FigureTemplate
+from cache import memoize_figure
 from context import MedalColorMap
 
+STOCKHOLM_ANNOTATION = dict(
+    text="(*) Stockholm 1956: only equestrian games",
+    font=dict(color="black", size=10),
+    showarrow=False,
+    xref="paper",
+    yref="paper",
+    x=0,  # Centered horizontally
+    y=-1,  # Below the chart
+    xanchor="left",
+    yanchor="bottom",
+    bgcolor="#E5F9FC",
+    bordercolor="#c7c7c7",
+    borderwidth=1,
+    borderpad=4,
+    opacity=0.8,
+)
+
 
 class MedalsBySeason:
     """Handles data aggregation and generates a bar chart by Olympic season."""
@@ -25,10 +44,14 @@ class MedalsBySeason:
         df_medals_season: pd.DataFrame,
         medal_colors: Optional[MedalColorMap] = None,
     ):
-        """Initialize MedalsBySeason with medal data and optional color mapping."""
-        self.df_medals_season = df_medals_season.copy()
+        """Initialize MedalsBySeason with medal data and optional color mapping.
+        The rows of a season are selected with a bitmap index of the seasons."""
+        self.df_medals_season = df_medals_season
         self.medal_colors = medal_colors or MedalColorMap()
+        self.season_index = BitmapIndex.from_frame(df_medals_season, ["Olympic_season"])
+        self.template = self._make_template()
 
+    @memoize_figure
     def create_bar_medal_season(self, season: str) -> Figure:
         """
         Generate and plot the total medals for a given Olympic season. The chart
@@ -60,46 +83,66 @@ class MedalsBySeason:
             print(self.df_medals_season.head(3))
             return pd.DataFrame()
 
+    def _make_template(self) -> FigureTemplate:
+        """Build the layout of the chart (same as `px.bar`), and its annotation."""
+        template = FigureTemplate(
+            layout=dict(
+                xaxis=dict(anchor="y", domain=[0.0, 1.0], title_text="Olympiad"),
+                yaxis=dict(anchor="x", domain=[0.0, 1.0], title_text="Medal Count"),
+                legend=dict(title_text="Medal_type", tracegroupgap=0),
+                title_text="Medal Count by Olympiad and Medal Type",
+                barmode="relative",
+            ),
+            trace_type="bar",
+        )
+        self.stockholm_annotation = template.validate_layout(
+            dict(annotations=[STOCKHOLM_ANNOTATION])
+        )["annotations"]
+        self.medal_styles = {
+            medal_type: template.trace_style(
+                name=medal_type,
+                legendgroup=medal_type,
+                marker=dict(color=color, pattern_shape=""),
+                hovertemplate=f"Medal_type={medal_type}<br>Olympiad=%{{x}}"
+                "<br>Medal Count=%{y}<extra></extra>",
+                orientation="v",
+                showlegend=True,
+                textposition="auto",
+                xaxis="x",
+                yaxis="y",
+            )
+            for medal_type, color in self.medal_colors.as_dict().items()
+        }
+        return template
+
     def _plot_bar_medal_season(
         self,
         df_medals_filtered_by_season: pd.DataFrame,
         season: str,
     ) -> Figure:
-        """Create a Plotly bar chart of medal counts by Olympiad and medal type."""
-        fig = px.bar(
-            df_medals_filtered_by_season,
-            x="Olympiad",
-            y="Medal_count",
-            color="Medal_type",
-            color_discrete_map=self.medal_colors.as_dict(),
-            title="Medal Count by Olympiad and Medal Type",
-            labels={"Medal_count": "Medal Count", "Olympiad": "Olympiad"},
-            category_orders={
-                "Olympiad": df_medals_filtered_by_season["Olympiad"].unique()
-            },
-        )
+        """Create a bar chart of medal counts by Olympiad and medal type."""
+        olympiads = df_medals_filtered_by_season["Olympiad"]
+        medal_types = df_medals_filtered_by_season["Medal_type"]
+        traces = []
+        for medal_type in medal_types.unique():
+            rows = (medal_types == medal_type).to_numpy()
+            traces.append(
+                self.template.trace(
+                    self.medal_styles[medal_type],
+                    x=olympiads.to_numpy()[rows],
+                    y=df_medals_filtered_by_season["Medal_count"].to_numpy()[rows],
+                )
+            )
+
+        layout_updates = {}
         if season != "winter":
-            self._add_stockholm_annotation(fig)
-        return fig
-
-    def _add_stockholm_annotation(self, fig: Figure) -> None:
-        """Plotly `fig.add_annotation` adds the annotation"""
-        fig.add_annotation(
-            text="(*) Stockholm 1956: only equestrian games",
-            font=dict(color="black", size=10),
-            showarrow=False,
-            xref="paper",
-            yref="paper",
-            x=0,  # Centered horizontally
-            y=-1,  # Below the chart
-            xanchor="left",
-            yanchor="bottom",
-            bgcolor="#E5F9FC",
-            bordercolor="#c7c7c7",
-            borderwidth=1,
-            borderpad=4,
-            opacity=0.8,
+            layout_updates["annotations"] = self.stockholm_annotation
+        xaxis = dict(
+            self.template.layout["xaxis"],
+            categoryorder="array",
+            categoryarray=list(olympiads.unique()),
         )
+        return self.template.make_figure(traces, xaxis=xaxis, **layout_updates)
 
     def _compute_medals_by_season(self, season: str) -> pd.DataFrame:
         """Creates a plotly bar chart with total olympic medals (broken by medal color).
@@ -120,6 +163,6 @@ class MedalsBySeason:
 
     def _filter_season(self, season: str) -> pd.DataFrame:
         """Filter the medals DataFrame by Olympic season."""
-        return self.df_medals_season[
-            self.df_medals_season["Olympic_season"] == season
-        ].reset_index(drop=True)
+        return self.season_index.take(
+            self.df_medals_season, {"Olympic_season": season}
+        ).reset_index(drop=True)
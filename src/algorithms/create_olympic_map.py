@@ -8,21 +8,35 @@ the awarded medals. It can also display all the gold, silver or bronwe medals.
 Used by `medals_by_committee.py`.
 """
 
+from typing import Optional
+
 import pandas as pd
-import plotly.express as px
+from plotly.colors import sequential
 from plotly.graph_objs import Figure
 
+from algorithms.figure_template import FigureTemplate
+from algorithms.query_backends import PandasBackend, QueryBackend
+from cache import memoize_figure
+
 
 class MedalMap:
     """Handles data aggregation and choropleth map generation for Olympic medals
     by host country."""
 
-    def __init__(self, df_olympic_cities: pd.DataFrame):
+    def __init__(
+        self,
+        df_olympic_cities: pd.DataFrame,
+        query_backend: Optional[QueryBackend] = None,
+    ):
         """Initialize MedalMap with a DataFrame containing Olympic city and
-        medal data.
+        medal data, and the query backend that aggregates it (see
+        `algorithms.query_backends`).
         """
-        self.df_olympic_cities = df_olympic_cities.copy()
+        self.df_olympic_cities = df_olympic_cities
+        self.query_backend = query_backend or PandasBackend()
+        self.template = self._make_template()
 
+    @memoize_figure
     def create_olympic_medals_by_country(self, season: str, medal_type: str) -> Figure:
         """
         Retrieves filtered data and generates a choropleth map.
@@ -56,27 +70,48 @@ class MedalMap:
             print(self.df_olympic_cities.head(3))
             return pd.DataFrame()
 
+    def _make_template(self) -> FigureTemplate:
+        """Build the layout and trace style of the map (same as `px.choropleth`)."""
+        template = FigureTemplate(
+            layout=dict(
+                geo=dict(
+                    domain=dict(x=[0.0, 1.0], y=[0.0, 1.0]),
+                    projection_type="natural earth",
+                    showcountries=True,
+                    showland=True,
+                    landcolor="lightgray",
+                    countrycolor="white",
+                ),
+                coloraxis=dict(
+                    colorbar_title_text="Number of Medals",
+                    colorscale=sequential.Plasma,
+                ),
+                legend_tracegroupgap=0,
+            ),
+            trace_type="choropleth",
+        )
+        self.trace_style = template.trace_style(
+            coloraxis="coloraxis",
+            geo="geo",
+            hovertemplate="<b>%{hovertext}</b><br><br>ISO_code_mapping=%{location}"
+            "<br>Number of Medals=%{z}<extra></extra>",
+            name="",
+        )
+        return template
+
     def _plot_map_medals_by_country(
         self, country_counts: pd.DataFrame, season: str, medal_type: str
     ) -> Figure:
-        """Internal helper: create the Plotly choropleth figure."""
-        fig = px.choropleth(
-            country_counts,
-            locations="ISO_code_mapping",
-            color="Number of Medals",
-            hover_name="Country",
-            color_continuous_scale=px.colors.sequential.Plasma,
-            title=f"{medal_type.capitalize()} Olympic Medals awarded by \
-                Host Country ({season.capitalize()})",
-            projection="natural earth",
-        )
-        fig.update_geos(
-            showcountries=True,
-            showland=True,
-            landcolor="lightgray",
-            countrycolor="white",
+        """Internal helper: create the choropleth figure."""
+        trace = self.template.trace(
+            self.trace_style,
+            hovertext=country_counts["Country"].to_numpy(),
+            locations=country_counts["ISO_code_mapping"].to_numpy(),
+            z=country_counts["Number of Medals"].to_numpy(),
         )
-        return fig
+        title = f"{medal_type.capitalize()} Olympic Medals awarded by \
+                Host Country ({season.capitalize()})"
+        return self.template.make_figure([trace], title=dict(text=title))
 
     def _select_medal_column(self, medal_type: str) -> str:
         """
@@ -105,15 +140,11 @@ class MedalMap:
     def _compute_medal_counts(self, season: str, medal_type: str) -> pd.DataFrame:
         """Filters, groups, and aggregates medal counts from the raw data."""
         medal_column = self._select_medal_column(medal_type)
-        df_filtered = self.df_olympic_cities
-
-        if season != "All":
-            df_filtered = df_filtered[df_filtered["Olympic_season"] == season]
-        country_counts = (
-            df_filtered.groupby(["Country", "ISO_code_mapping"], observed=True)[
-                medal_column
-            ]
-            .sum()
-            .reset_index(name="Number of Medals")
+        filters = None if season == "All" else {"Olympic_season": season}
+        return self.query_backend.sum_by(
+            self.df_olympic_cities,
+            ["Country", "ISO_code_mapping"],
+            medal_column,
+            "Number of Medals",
+            filters,
         )
-        return country_counts
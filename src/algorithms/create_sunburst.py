@@ -5,21 +5,46 @@ gender and discipline.
 This module defines the `SunburstByGender` class, which generates a
 sunburst chart for analyzing medal distributions.
 
+The Gender / Discipline / Event hierarchy is aggregated once per Olympiad (and
+for "All" of them) when the class is created, and stored as compact arrays that
+are fed straight into the sunburst trace of a prebuilt figure template.
+
 Used by `medals_by_committee.py`.
 """
 
+from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from plotly.graph_objs import Figure
 
+from algorithms.figure_template import FigureTemplate
+from cache import memoize_figure
 from context import GenderCategoryColorMap
 
+SUNBURST_PATH = ["Gender", "Discipline", "Event"]
+
+
+@dataclass(frozen=True)
+class SunburstHierarchy:
+    """Sunburst nodes for one Olympiad.
+
+    - node_idx: positions in the node tables of `SunburstByGender`, leaves
+    first, then disciplines, then genders.
+    - counts: number of medals for each node.
+    """
+
+    node_idx: np.ndarray
+    counts: np.ndarray
+
 
 class SunburstByGender:
     """Handles sunburst data preparation and chart generation for medals by gender."""
 
+    # Columns of the medals table used by the class
+    REQUIRED_COLUMNS = ["Olympiad", *SUNBURST_PATH]
+
     def __init__(
         self,
         df_olympic_medals: pd.DataFrame,
@@ -34,8 +59,10 @@ class SunburstByGender:
             for genders. Defaults to a new GenderCategoryColorMap instance.
         """
         self.gender_colors = gender_colors or GenderCategoryColorMap()
-        self.df_sunburst = self._make_initial_sunburst(df_olympic_medals)
+        self.hierarchies = self._make_hierarchies(df_olympic_medals)
+        self.template = self._make_template()
 
+    @memoize_figure
     def create_sunburst_medals(
         self, selected_olympiad_for_sunburst: str = "All"
     ) -> Figure:
@@ -51,67 +78,156 @@ class SunburstByGender:
             plotly.graph_objs.Figure: Sunburst chart showing medal distribution by
             gender, discipline, and event.
         """
-        df_filtered = self._compute_sunburst_data(selected_olympiad_for_sunburst)
-        return self._plot_sunburst_medals(df_filtered, selected_olympiad_for_sunburst)
+        hierarchy = self._compute_sunburst_data(selected_olympiad_for_sunburst)
+        return self._plot_sunburst_medals(hierarchy, selected_olympiad_for_sunburst)
 
     def _compute_sunburst_data(
         self, selected_olympiad_for_sunburst: str = "All"
-    ) -> pd.DataFrame:
+    ) -> SunburstHierarchy:
         """
-        Internal helper: returns the sunburst DataFrame filtered by Olympiad.
+        Internal helper: returns the precomputed sunburst hierarchy of an Olympiad.
 
         Args:
-            selected_olympiad_for_sunburst (str, optional): Olympiad name to filter by.
+            selected_olympiad_for_sunburst (str, optional): Olympiad name.
                 Defaults to "All", which includes all Olympiads.
 
         Returns:
-            pd.DataFrame: Filtered DataFrame ready for sunburst chart generation.
+            SunburstHierarchy: Nodes and medal counts, empty for unknown Olympiads.
         """
-        df_filtered = self.df_sunburst
-
-        if selected_olympiad_for_sunburst != "All":
-            df_filtered = df_filtered[
-                df_filtered["Olympiad"] == selected_olympiad_for_sunburst
-            ]
-        return df_filtered
+        return self.hierarchies.get(
+            selected_olympiad_for_sunburst, self._empty_hierarchy
+        )
 
     def _plot_sunburst_medals(
-        self, df_sunburst: pd.DataFrame, selected_olympiad_for_sunburst: str
+        self, hierarchy: SunburstHierarchy, selected_olympiad_for_sunburst: str
     ) -> Figure:
         """
         Internal helper: create the Plotly sunburst figure.
 
         Args:
-            df_sunburst (pd.DataFrame): The prepared DataFrame to visualize.
+            hierarchy (SunburstHierarchy): The precomputed nodes to visualize.
             selected_olympiad_for_sunburst (str): Olympiad name for title context.
 
         Returns:
             plotly.graph_objs.Figure: Plotly sunburst chart object.
         """
-        fig = px.sunburst(
-            df_sunburst,
-            path=["Gender", "Discipline", "Event"],
-            color="Gender",
-            color_discrete_map=self.gender_colors.as_dict(),
-            title=f"Total Medals by Gender, Discipline, and Event -\
-                  {selected_olympiad_for_sunburst}",
+        node_idx = hierarchy.node_idx
+        trace = self.template.trace(
+            self.sunburst_style,
+            ids=self.node_ids[node_idx],
+            labels=self.node_labels[node_idx],
+            parents=self.node_parents[node_idx],
+            values=hierarchy.counts.astype(np.int64),
+            customdata=self.node_genders[node_idx, np.newaxis],
+            marker={"colors": self.node_colors[node_idx]},
         )
-        return fig
+        title = f"Total Medals by Gender, Discipline, and Event -\
+                  {selected_olympiad_for_sunburst}"
+        return self.template.make_figure([trace], title=dict(text=title))
+
+    def _make_template(self) -> FigureTemplate:
+        """Build the layout and style of the sunburst (same as `px.sunburst`)."""
+        template = FigureTemplate(
+            layout=dict(legend_tracegroupgap=0), trace_type="sunburst"
+        )
+        self.sunburst_style = template.trace_style(
+            branchvalues="total",
+            hovertemplate=(
+                "labels=%{label}<br>count=%{value}<br>parent=%{parent}<br>"
+                "id=%{id}<br>Gender=%{customdata[0]}<extra></extra>"
+            ),
+            domain={"x": [0.0, 1.0], "y": [0.0, 1.0]},
+            name="",
+        )
+        return template
 
-    def _make_initial_sunburst(self, df_olympic_medals: pd.DataFrame) -> pd.DataFrame:
+    def _make_hierarchies(
+        self, df_olympic_medals: pd.DataFrame
+    ) -> dict[str, SunburstHierarchy]:
         """
-        Prepare a DataFrame suitable for sunburst visualization.
+        Aggregate the sunburst hierarchy for every Olympiad and for "All".
+
+        The node tables (`node_ids`, `node_labels`, `node_parents`,
+        `node_genders`, `node_colors`) are shared by all Olympiads; each
+        hierarchy only keeps the positions of its nodes and their medal counts.
 
         Args:
             df_olympic_medals (pd.DataFrame): Raw Olympic medals DataFrame containing
                 at least ['Olympiad', 'Gender', 'Discipline', 'Event'] columns.
 
         Returns:
-            pd.DataFrame: Processed DataFrame containing string representations of
-            the necessary columns for building the sunburst chart.
+            dict[str, SunburstHierarchy]: Hierarchies by Olympiad name and "All".
+        """
+        row_nodes = self._make_node_tables(df_olympic_medals[SUNBURST_PATH])
+        self._empty_hierarchy = SunburstHierarchy(
+            np.array([], dtype=np.int32), np.array([], dtype=np.int32)
+        )
+
+        olympiad_codes, olympiads = pd.factorize(df_olympic_medals["Olympiad"])
+        hierarchies = self._aggregate_nodes(row_nodes, olympiad_codes, olympiads)
+        hierarchies["All"] = self._aggregate_nodes(
+            row_nodes, np.zeros(len(row_nodes), dtype=np.intp), ["All"]
+        )["All"]
+        return hierarchies
+
+    def _make_node_tables(self, df_path: pd.DataFrame) -> np.ndarray:
+        """
+        Build the node tables of the complete hierarchy, leaves first.
+
+        Returns:
+            np.ndarray: For each row, its node position at each depth (leaf,
+            discipline, gender).
+        """
+        ids, labels, parents, genders, row_nodes = [], [], [], [], []
+        n_nodes = 0
+        for depth in range(len(SUNBURST_PATH), 0, -1):
+            path = SUNBURST_PATH[:depth]
+            codes, nodes = pd.factorize(pd.MultiIndex.from_frame(df_path[path]))
+            row_nodes.append(codes + n_nodes)
+
+            nodes = nodes.to_frame(index=False, name=path).astype(str)
+            node_ids = nodes.agg("/".join, axis=1)
+            ids.append(node_ids)
+            labels.append(nodes[path[-1]])
+            parents.append(
+                nodes[path[:-1]].agg("/".join, axis=1)
+                if depth > 1
+                else pd.Series("", index=nodes.index)
+            )
+            genders.append(nodes["Gender"])
+            n_nodes += len(nodes)
+
+        self.node_ids = pd.concat(ids).to_numpy()
+        self.node_labels = pd.concat(labels).to_numpy()
+        self.node_parents = pd.concat(parents).to_numpy()
+        self.node_genders = pd.concat(genders).to_numpy()
+        self.node_colors = (
+            pd.Series(self.node_genders).map(self.gender_colors.as_dict()).to_numpy()
+        )
+        return np.column_stack(row_nodes)
+
+    def _aggregate_nodes(
+        self, row_nodes: np.ndarray, group_codes: np.ndarray, group_names
+    ) -> dict[str, SunburstHierarchy]:
+        """
+        Count medals by (group, node) and keep the nodes of each group in order
+        of first appearance, leaves first.
         """
-        return (
-            df_olympic_medals[["Olympiad", "Gender", "Discipline", "Event"]]
-            .astype(str)
-            .copy()
+        n_nodes = len(self.node_ids)
+        hierarchies = {}
+        keys = group_codes[:, np.newaxis] * n_nodes + row_nodes
+        # Flattened depth by depth, so that leaves come before their parents
+        unique_keys, first_seen, counts = np.unique(
+            keys.T.ravel(), return_index=True, return_counts=True
         )
+        order = np.lexsort((first_seen, unique_keys // n_nodes))
+        groups, nodes = np.divmod(unique_keys[order], n_nodes)
+        counts = counts[order].astype(np.int32)
+
+        bounds = np.searchsorted(groups, np.arange(len(group_names) + 1))
+        for code, name in enumerate(group_names):
+            start, stop = bounds[code], bounds[code + 1]
+            hierarchies[name] = SunburstHierarchy(
+                nodes[start:stop].astype(np.int32), counts[start:stop]
+            )
+        return hierarchies
@@ -0,0 +1,72 @@
+"""
+Prebuilt figure templates for the chart classes.
+
+Creating figures with plotly.express (or with validated graph_objects) checks and
+copies every property and data array on each call, which costs far more than
+the data preparation of most charts. Each chart class instead builds a
+`FigureTemplate` once, at init: its layout and trace styles are validated by
+Plotly then, and each call only adds the data arrays to them.
+
+The templates hold the properties that plotly.express sets, so the figures look
+exactly the same.
+
+Charts with a summer and a winter version can compute both in one call, and
+return them as `SeasonFigures`.
+"""
+
+import copy
+from typing import NamedTuple
+
+import plotly.graph_objects as go
+
+
+class SeasonFigures(NamedTuple):
+    """The summer and the winter figures of a chart."""
+
+    summer: go.Figure
+    winter: go.Figure
+
+
+class FigureTemplate:
+    """Validated layout and trace styles, filled with data for each figure."""
+
+    def __init__(self, layout: dict, trace_type: str):
+        """
+        Args:
+            layout (dict): Layout of the figures (the default Plotly template is
+                added to it).
+            trace_type (str): Type of the traces, for example "bar".
+        """
+        self.layout = go.Figure(layout=layout).to_plotly_json()["layout"]
+        self.trace_type = trace_type
+
+    @staticmethod
+    def validate_layout(layout: dict) -> dict:
+        """Validate layout properties, and return them as plain values."""
+        return go.Layout(layout).to_plotly_json()
+
+    def trace_style(self, **properties) -> dict:
+        """Validate the style properties of a trace, and return them as plain
+        values."""
+        figure = go.Figure({"data": [{"type": self.trace_type, **properties}]})
+        return figure.to_plotly_json()["data"][0]
+
+    @staticmethod
+    def trace(style: dict, **data) -> dict:
+        """Return a trace with the properties of `style` and the `data` arrays."""
+        return {**copy.deepcopy(style), **data}
+
+    def make_figure(self, traces: list[dict], **layout_updates) -> go.Figure:
+        """
+        Build a figure from the template.
+
+        Args:
+            traces (list[dict]): Traces, from `trace`.
+            **layout_updates: Layout properties replacing the template ones.
+
+        Returns:
+            plotly.graph_objects.Figure: The figure, built without validation.
+        """
+        layout = copy.deepcopy(self.layout)
+        layout.update(layout_updates)
+        return go.Figure({"data": traces, "layout": layout}, _validate=False)
@@ -0,0 +1,640 @@
+"""
+Query backends of the algorithm classes.
+
+The algorithm classes run their row selections (`filter`), and their group
+and pivot steps, through a query backend:
+
+- `PandasBackend`: pandas operations on the frames. It is the default backend,
+  and the reference for the others.
+- `DuckDBBackend`: the same queries, run by an in-process DuckDB database, on
+  several threads. It needs the optional `duckdb` package.
+- `PolarsBackend`: the same queries, run by Polars on several threads. Each
+  frame is converted to Polars once, the first time it is queried. It needs the
+  optional `polars` package.
+
+DuckDB and Polars run the queries without holding the GIL, so the queries of
+concurrent sessions don't wait for each other.
+
+The queried tables are frames, or `ParquetTable`s: tables of a data snapshot,
+queried from their parquet file. DuckDB queries the file itself
+(`read_parquet`): it only reads the row groups that can match the filters of
+the query (the medals file has a row group layout by season, see
+`transformation.layout`), streams them instead of loading the table, and only
+keeps the result in memory, so the table can be larger than the memory. Pandas
+and Polars query the rows that match the filters, read from those row groups
+(see `loaders.sources`). The app queries the medals table this way (the
+discipline grid), and the frames of the small tables (the medal map, and the
+committee charts).
+
+The medals sunburst doesn't query a backend: its hierarchies are computed
+once per Olympiad when it is built, and each request only looks one up.
+
+All the backends return the same frames (same rows, order and dtypes), so the
+figures don't depend on the backend. The backend of the app is chosen with the
+`QUERY_BACKEND` environment variable, see `get_query_backend`.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+QUERY_BACKEND = os.environ.get("QUERY_BACKEND", "pandas")
+
+
+def file_signature(path: str | Path) -> tuple | None:
+    """Identity of a file (None if it doesn't exist): it changes when the file
+    is modified, or replaced by another one."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class ParquetTable:
+    """
+    A table of a data snapshot, queried from its parquet file (see
+    `loaders.sources.SourceTable.parquet_table`).
+
+    - path: the parquet file.
+    - data_version: version of the data the table belongs to (see
+      `loaders.datasets.compute_data_version`).
+    - signature: `file_signature` of the file opened by the snapshot.
+    - scan: reads columns of the rows that match equality predicates, from the
+      file opened by the snapshot.
+    - empty: returns columns without rows, with their dtypes.
+    """
+
+    path: str
+    data_version: str | None
+    signature: tuple | None
+    scan: Callable[[list[str], dict | None], pd.DataFrame]
+    empty: Callable[[list[str]], pd.DataFrame]
+
+    def is_current(self) -> bool:
+        """Whether `path` is still the file opened by the snapshot (the pipeline
+        replaces the files by renaming new ones over them)."""
+        return self.signature is not None and file_signature(self.path) == (
+            self.signature
+        )
+
+
+Table = pd.DataFrame | ParquetTable
+
+
+def _filter_rows(df: pd.DataFrame, filters: dict | None) -> pd.DataFrame:
+    """Return the rows of `df` with the values of `filters` (column -> value)."""
+    if not filters:
+        return df
+    mask = True
+    for column, value in filters.items():
+        mask = mask & (df[column] == value)
+    return df[mask]
+
+
+def _filter_mask(df: pd.DataFrame, filters: dict | None) -> np.ndarray:
+    """Whether each row of `df` has the values of `filters` (column -> value)."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in (filters or {}).items():
+        mask &= (df[column] == value).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def _select_rows(
+    df: pd.DataFrame, mask: np.ndarray, columns: list[str] | None
+) -> pd.DataFrame:
+    """The rows of `mask` and the `columns` of a frame (all of them for None)."""
+    return df.loc[mask, slice(None) if columns is None else columns]
+
+
+def _rows(df: Table, columns: list[str] | None, filters: dict | None) -> pd.DataFrame:
+    """The rows of a table with the values of `filters`: selected from the
+    frames, and read from the row groups that can match them for parquet
+    tables (with `columns` only)."""
+    if isinstance(df, ParquetTable):
+        return df.scan(columns, filters)
+    return _filter_rows(df, filters)
+
+
+def _dtypes(df: Table, columns: list[str]) -> pd.DataFrame:
+    """A frame with the dtypes of columns of a table (the frame itself)."""
+    return df.empty(columns) if isinstance(df, ParquetTable) else df
+
+
+def _unique(df: Table, column: str, filters: dict | None) -> pd.Index:
+    return pd.Index(_rows(df, [column], filters)[column].unique(), name=column)
+
+
+def _filter(df: Table, filters: dict | None, columns: list[str] | None):
+    if isinstance(df, ParquetTable):
+        # Scans return the columns in file order
+        rows = _rows(df, columns, filters)
+        return rows if columns is None else rows[columns]
+    return _select_rows(df, _filter_mask(df, filters), columns)
+
+
+class PandasBackend:
+    """Queries run with pandas (the reference backend)."""
+
+    name = "pandas"
+
+    def sum_by(
+        self,
+        df: Table,
+        by: list[str],
+        column: str,
+        name: str,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """
+        Sum a column by groups.
+
+        Args:
+            df (Table): The table, a frame or a parquet table.
+            by (list[str]): Columns of the groups.
+            column (str): Column to sum.
+            name (str): Name of the sum in the result.
+            filters (dict | None): Values of columns that the rows must have.
+
+        Returns:
+            pd.DataFrame: The `by` columns and the sum, with a row by observed
+            group, sorted by group.
+        """
+        return (
+            _rows(df, [*by, column], filters)
+            .groupby(by, observed=True)[column]
+            .sum()
+            .reset_index(name=name)
+        )
+
+    def pivot_size(
+        self,
+        df: Table,
+        index: list[str],
+        columns: str,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """
+        Count the rows by index and column values.
+
+        Args:
+            df (Table): The table, a frame or a parquet table.
+            index (list[str]): Columns of the rows of the result.
+            columns (str): Column whose values are the columns of the result.
+            filters (dict | None): Values of columns that the rows must have.
+
+        Returns:
+            pd.DataFrame: The counts (0 for the missing pairs), with the observed
+            values only, sorted.
+        """
+        return _rows(df, [*index, columns], filters).pivot_table(
+            index=index,
+            columns=columns,
+            aggfunc="size",
+            fill_value=0,
+            observed=True,
+        )
+
+    def unique(self, df: Table, column: str, filters: dict | None = None) -> pd.Index:
+        """
+        Return the values of a column, in order of first appearance.
+
+        Args:
+            df (Table): The table, a frame or a parquet table.
+            column (str): The column.
+            filters (dict | None): Values of columns that the rows must have.
+
+        Returns:
+            pd.Index: The values, with the dtype of the column, named like it.
+        """
+        return _unique(df, column, filters)
+
+    def filter(
+        self,
+        df: Table,
+        filters: dict | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Select rows and columns of a table.
+
+        Args:
+            df (Table): The table, a frame or a parquet table (whose rows are
+                read from the row groups that can match `filters`).
+            filters (dict | None): Values of columns that the rows must have.
+            columns (list[str] | None): The columns, all of them by default.
+
+        Returns:
+            pd.DataFrame: The columns of the rows with the values of `filters`,
+            in the order of the table, with the index labels of the frame.
+        """
+        return _filter(df, filters, columns)
+
+
+def _restore_dtypes(result: pd.DataFrame, df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Cast columns of a query result to their dtypes in the queried frame `df`.
+
+    Categorical columns get the categories of `df`, in the same order (`astype`
+    doesn't reorder the categories of unordered categoricals)."""
+    dtypes = {}
+    for column in columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and isinstance(
+            result[column].dtype, pd.CategoricalDtype
+        ):
+            result[column] = result[column].cat.set_categories(dtype.categories)
+        dtypes[column] = dtype
+    return result.astype(dtypes)
+
+
+def _pivot_counts(counts: pd.DataFrame, index: list[str], columns: str) -> pd.DataFrame:
+    """Pivot counts by group (a row by observed group, in a `size` column) like
+    `PandasBackend.pivot_size`."""
+    return counts.pivot_table(
+        index=index,
+        columns=columns,
+        values="size",
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _conditions(by: list[str], filters: dict) -> str:
+    """`WHERE` conditions of a query: the group values are not missing, and the
+    columns of `filters` have their values (`?` parameters)."""
+    conditions = [f"{_quote(column)} IS NOT NULL" for column in by]
+    conditions += [f"{_quote(column)} = ?" for column in filters]
+    return " AND ".join(conditions) or "TRUE"
+
+
+class DuckDBBackend:
+    """Queries run by an in-process DuckDB database, over the parquet files of
+    the tables, or over the frames."""
+
+    name = "duckdb"
+
+    def __init__(self, threads: int | None = None):
+        """
+        Args:
+            threads (int | None): Threads used by each query (DuckDB uses all the
+                cores by default).
+
+        Raises:
+            ImportError: If the `duckdb` package is not installed.
+        """
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError(
+                "The duckdb query backend needs the duckdb package (pip install duckdb)"
+            ) from e
+        self._duckdb = duckdb
+        self._config = {} if threads is None else {"threads": threads}
+        # DuckDB connections must not be shared by threads: one per thread
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._duckdb.connect(config=self._config)
+            self._local.connection = connection
+        return connection
+
+    def _query_file(
+        self, table: ParquetTable, query: str, parameters: list
+    ) -> pd.DataFrame | None:
+        """
+        Run a query over the parquet file of `table` (the `{source}` of the
+        query, with a `file_row_number` column).
+
+        Returns None if the file isn't the file of the snapshot, before or after
+        the query: the result would not be from the data version of the table.
+        """
+        if not table.is_current():
+            return None
+        source = "read_parquet(?, file_row_number = true)"
+        result = (
+            self._connection()
+            .execute(query.replace("{source}", source), [table.path, *parameters])
+            .df()
+        )
+        if not table.is_current():
+            return None
+        return result
+
+    def _query_frame(self, df: pd.DataFrame, query: str, parameters: list):
+        """Run a query over `df` (the `{source}` of the query). The frame is
+        registered as a view, not copied, so DuckDB reads the same memory as the
+        pandas backend."""
+        connection = self._connection()
+        connection.register("source", df)
+        try:
+            query = query.replace("{source}", "source")
+            return connection.execute(query, parameters).df()
+        finally:
+            connection.unregister("source")
+
+    def _execute(
+        self,
+        df: Table,
+        columns: list[str],
+        filters: dict,
+        query: str,
+        parameters: list,
+    ) -> pd.DataFrame:
+        """
+        Run a query over a table, that reads `columns` and has the `filters` in
+        its `WHERE` clause.
+
+        Parquet tables are queried from their file. When the pipeline replaced
+        the file since the snapshot opened it, the rows are read from the file
+        opened by the snapshot instead (see `ParquetTable.scan`), and queried in
+        memory.
+        """
+        if isinstance(df, ParquetTable):
+            result = self._query_file(df, query, parameters)
+            if result is not None:
+                return result
+            logger.info(
+                "%s was replaced since data version %s was loaded, querying the "
+                "loaded file",
+                df.path,
+                df.data_version,
+            )
+            df = df.scan(columns, filters)
+        return self._query_frame(df, query, parameters)
+
+    def _group(
+        self,
+        df: Table,
+        by: list[str],
+        aggregate: str,
+        filters: dict | None,
+        columns: list[str],
+    ) -> pd.DataFrame:
+        """Run `SELECT by, aggregate ... GROUP BY by` over `df`, without the rows
+        with missing group values (like pandas), and with the dtypes of `df`."""
+        filters = filters or {}
+        keys = ", ".join(_quote(column) for column in by)
+        query = (
+            f"SELECT {keys}, {aggregate} FROM {{source}} "
+            f"WHERE {_conditions(by, filters)} GROUP BY {keys} ORDER BY {keys}"
+        )
+        result = self._execute(df, columns, filters, query, list(filters.values()))
+        # DuckDB returns categorical columns as ordered categoricals, and the
+        # dictionary columns of parquet files as strings
+        return _restore_dtypes(result, _dtypes(df, by), by)
+
+    def sum_by(
+        self,
+        df: Table,
+        by: list[str],
+        column: str,
+        name: str,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """Sum a column by groups, see `PandasBackend.sum_by`."""
+        aggregate = f"SUM({_quote(column)}) AS {_quote(name)}"
+        result = self._group(df, by, aggregate, filters, [*by, column])
+        # DuckDB sums integers to 128-bit integers, returned as floats
+        return result.astype({name: _dtypes(df, [column])[column].dtype})
+
+    def pivot_size(
+        self,
+        df: Table,
+        index: list[str],
+        columns: str,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """Count the rows by index and column values, see
+        `PandasBackend.pivot_size`.
+
+        DuckDB counts the rows of each group, and the counts (a row by observed
+        group) are then pivoted with pandas."""
+        by = [*index, columns]
+        counts = self._group(df, by, "COUNT(*) AS size", filters, by)
+        return _pivot_counts(counts, index, columns)
+
+    def unique(self, df: Table, column: str, filters: dict | None = None) -> pd.Index:
+        """Return the values of a column, in order of first appearance, see
+        `PandasBackend.unique`.
+
+        For parquet tables, DuckDB returns the values with their first row in
+        the file. The frames have no row numbers in DuckDB: their values are
+        deduplicated with pandas."""
+        filters = filters or {}
+        if isinstance(df, ParquetTable):
+            query = (
+                f"SELECT {_quote(column)} FROM {{source}} "
+                f"WHERE {_conditions([], filters)} "
+                f"GROUP BY {_quote(column)} ORDER BY MIN(file_row_number)"
+            )
+            result = self._query_file(df, query, list(filters.values()))
+            if result is not None:
+                result = _restore_dtypes(result, df.empty([column]), [column])
+                return pd.Index(result[column], name=column)
+        return _unique(df, column, filters)
+
+    def filter(
+        self,
+        df: Table,
+        filters: dict | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Select rows and columns of a table, see `PandasBackend.filter`.
+
+        DuckDB evaluates the filters of each row of a frame (in the order of the
+        rows), and the rows are then taken from the frame, with their dtypes and
+        labels. The rows of parquet tables are read from their row groups."""
+        if isinstance(df, ParquetTable) or not filters:
+            return _filter(df, filters, columns)
+        query = (
+            f"SELECT COALESCE({_conditions([], filters)}, FALSE) AS keep "
+            "FROM {source}"
+        )
+        # Only the filtered columns are registered (the scan of a frame costs
+        # more with more columns)
+        keep = self._query_frame(df[list(filters)], query, list(filters.values()))[
+            "keep"
+        ]
+        return _select_rows(df, keep.to_numpy(dtype=bool), columns)
+
+
+class PolarsBackend:
+    """Queries run by Polars, over Polars copies of the frames, or of the rows
+    read from the parquet files."""
+
+    name = "polars"
+
+    def __init__(self):
+        """
+        Raises:
+            ImportError: If the `polars` package is not installed.
+        """
+        try:
+            import polars
+        except ImportError as e:
+            raise ImportError(
+                "The polars query backend needs the polars package (pip install polars)"
+            ) from e
+        self._polars = polars
+        # Polars frames by id of the pandas frame, dropped with the pandas frame
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _frame(self, df: pd.DataFrame):
+        """Return the Polars copy of `df` (the frames are never modified)."""
+        key = id(df)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                frame = self._polars.from_pandas(df)
+                self._frames[key] = frame
+                weakref.finalize(df, self._frames.pop, key, None)
+        return frame
+
+    def _select(self, df: Table, columns: list[str], filters: dict | None):
+        """The rows of a table with the values of `filters`, as a lazy frame.
+        The rows of parquet tables are read from the row groups that can match
+        the filters, and converted for this query only."""
+        pl = self._polars
+        if isinstance(df, ParquetTable):
+            return pl.from_pandas(df.scan(columns, filters)).lazy()
+        frame = self._frame(df).lazy()
+        for column, value in (filters or {}).items():
+            frame = frame.filter(pl.col(column) == value)
+        return frame
+
+    def _group(
+        self,
+        df: Table,
+        by: list[str],
+        aggregate,
+        filters: dict | None,
+        columns: list[str],
+    ) -> pd.DataFrame:
+        """Aggregate the groups of `by` (sorted like pandas), without the rows
+        with missing group values, and with the dtypes of `df`."""
+        pl = self._polars
+        result = (
+            self._select(df, columns, filters)
+            .filter(pl.all_horizontal(pl.col(by).is_not_null()))
+            .group_by(by)
+            .agg(aggregate)
+            .collect()
+            .to_pandas()
+        )
+        result = _restore_dtypes(result, _dtypes(df, by), by)
+        # Sorted with pandas, in the order of the categories of `df`
+        return result.sort_values(by, ignore_index=True)
+
+    def sum_by(
+        self,
+        df: Table,
+        by: list[str],
+        column: str,
+        name: str,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """Sum a column by groups, see `PandasBackend.sum_by`."""
+        aggregate = self._polars.col(column).sum().alias(name)
+        result = self._group(df, by, aggregate, filters, [*by, column])
+        return result.astype({name: _dtypes(df, [column])[column].dtype})
+
+    def pivot_size(
+        self,
+        df: Table,
+        index: list[str],
+        columns: str,
+        filters: dict | None = None,
+    ) -> pd.DataFrame:
+        """Count the rows by index and column values, see
+        `PandasBackend.pivot_size`.
+
+        Polars counts the rows of each group, and the counts (a row by observed
+        group) are then pivoted with pandas."""
+        by = [*index, columns]
+        aggregate = self._polars.len().cast(self._polars.Int64).alias("size")
+        counts = self._group(df, by, aggregate, filters, by)
+        return _pivot_counts(counts, index, columns)
+
+    def unique(self, df: Table, column: str, filters: dict | None = None) -> pd.Index:
+        """Return the values of a column, in order of first appearance, see
+        `PandasBackend.unique`."""
+        result = (
+            self._select(df, [column], filters)
+            .select(self._polars.col(column).unique(maintain_order=True))
+            .collect()
+            .to_pandas()
+        )
+        result = _restore_dtypes(result, _dtypes(df, [column]), [column])
+        return pd.Index(result[column], name=column)
+
+    def filter(
+        self,
+        df: Table,
+        filters: dict | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Select rows and columns of a table, see `PandasBackend.filter`.
+
+        Polars evaluates the filters of each row of a frame, and the rows are
+        then taken from the frame, with their dtypes and labels. The rows of
+        parquet tables are read from their row groups."""
+        if isinstance(df, ParquetTable) or not filters:
+            return _filter(df, filters, columns)
+        pl = self._polars
+        conditions = [pl.col(column) == value for column, value in filters.items()]
+        keep = (
+            self._frame(df)
+            .select(pl.all_horizontal(conditions).fill_null(False))
+            .to_series()
+            .to_numpy()
+        )
+        return _select_rows(df, keep, columns)
+
+
+QueryBackend = PandasBackend | DuckDBBackend | PolarsBackend
+
+QUERY_BACKENDS = {
+    "pandas": PandasBackend,
+    "duckdb": DuckDBBackend,
+    "polars": PolarsBackend,
+}
+
+
+def get_query_backend(name: str | None = None) -> QueryBackend:
+    """
+    Create a query backend.
+
+    Args:
+        name (str | None): "pandas", "duckdb" or "polars" (`QUERY_BACKEND` by
+            default).
+
+    Returns:
+        The query backend.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    name = name or QUERY_BACKEND
+    if name not in QUERY_BACKENDS:
+        raise ValueError(
+            f"Invalid query backend {name!r}. Should be one of {list(QUERY_BACKENDS)}."
+        )
+    return QUERY_BACKENDS[name]()
@@ -0,0 +1,17 @@
+from cache.bundle import FigureBundle as FigureBundle
+from cache.bundle import build_bundle as build_bundle
+from cache.bundle import load_bundle as load_bundle
+from cache.disk import SQLiteFigureStore as SQLiteFigureStore
+from cache.memoize import CacheStats as CacheStats
+from cache.memoize import FigureCache as FigureCache
+from cache.memoize import figure_cache as figure_cache
+from cache.memoize import get_cache_namespace as get_cache_namespace
+from cache.memoize import make_cache_key as make_cache_key
+from cache.memoize import memoize_figure as memoize_figure
+from cache.memoize import set_cache_namespace as set_cache_namespace
+from cache.payload import JSON_ENGINE as JSON_ENGINE
+from cache.payload import PayloadFigure as PayloadFigure
+from cache.payload import as_payload_figure as as_payload_figure
+from cache.payload import encode_payload as encode_payload
+from cache.version import CODE_VERSION as CODE_VERSION
+from cache.version import compute_code_version as compute_code_version
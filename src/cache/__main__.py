@@ -0,0 +1,23 @@
+"""
+Build the ahead-of-time figure bundle of the current data.
+
+Usage (from the `src` directory): `python -m cache [--workers N]`
+"""
+
+import argparse
+
+from cache.bundle import build_bundle
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build the figure bundle.")
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--parameters-dir", default="./parameters")
+    parser.add_argument("--bundle-dir", default="./bundles")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    build_bundle(args.data_dir, args.parameters_dir, args.bundle_dir, args.workers)
+
+
+if __name__ == "__main__":
+    main()
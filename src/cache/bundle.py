@@ -0,0 +1,314 @@
+"""
+Ahead-of-time figure bundle.
+
+`build_bundle` renders the figures of every chart method, for all the options
+the pages offer, with a pool of processes. The figures are written to a bundle
+file named after the data version (a hash of the parquet files) and the code
+version (a hash of the chart code, see `cache.version`), so a bundle is never
+used with data or code it was not built from.
+
+The bundle is a read-only SQLite file, indexed by the cache keys. At startup,
+the app opens the bundle matching its data and adds it as a store of
+`figure_cache`: the first request for a figure is then read from the bundle
+instead of being computed. Figures are read one at a time, when asked for, so
+the bundle is not loaded in the memory of each worker process.
+
+Committee comparisons accept any subset of committees, so they can't all be
+rendered: the bundle has the default comparison of the page, and each committee
+on its own.
+
+Run `python -m cache` from the `src` directory to build the bundle.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from cache.memoize import make_cache_key
+from cache.serialization import dump_value, key_digest, load_value
+from cache.version import CODE_VERSION
+
+SEASONS = ["All", "summer", "winter"]
+MEDAL_TYPES = ["All", "Gold", "Silver", "Bronze"]
+DISPLAY_MODES = ["Total", "Percentage"]
+DEFAULT_COMMITTEES = ["France", "United States"]
+
+_SCHEMA = """
+CREATE TABLE versions (data_version TEXT NOT NULL, code_version TEXT NOT NULL);
+CREATE TABLE figures (key TEXT PRIMARY KEY, value BLOB NOT NULL);
+"""
+
+
+class FigureBundle:
+    """
+    Read-only figure store, backed by a bundle file.
+
+    Figures are read from the file one at a time, when they are first asked
+    for, so worker processes only keep the figures they serve in memory.
+    """
+
+    def __init__(self, path: str | Path, data_version: str):
+        """
+        Args:
+            path (str | Path): Path of the bundle file (see `load_bundle`).
+            data_version (str): Version of the data of the figures.
+        """
+        self.path = Path(path)
+        self.data_version = data_version
+        self._local = threading.local()
+
+    def get(self, key, default=None):
+        row = self._select("SELECT value FROM figures WHERE key = ?", key)
+        if row is None:
+            return default
+        return load_value(row[0])
+
+    def put(self, key, value) -> None:
+        """Bundles are read-only: figures computed at runtime are not added."""
+
+    def __contains__(self, key) -> bool:
+        return self._select("SELECT 1 FROM figures WHERE key = ?", key) is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM figures").fetchone()[0]
+
+    def _select(self, query: str, key):
+        return self._connection().execute(query, (key_digest(key),)).fetchone()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread (and process)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = _connect_read_only(self.path)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+
+def _connect_read_only(path: Path) -> sqlite3.Connection:
+    # Bundle files are replaced by renaming, never changed in place: readers
+    # don't need locks
+    uri = f"{path.resolve().as_uri()}?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def bundle_path(
+    bundle_dir: str | Path, data_version: str, code_version: str = CODE_VERSION
+) -> Path:
+    return Path(bundle_dir) / f"figures-{data_version}-{code_version}.sqlite"
+
+
+def load_bundle(
+    bundle_dir: str | Path, data_version: str, code_version: str = CODE_VERSION
+) -> FigureBundle | None:
+    """
+    Open the bundle built for `data_version` by `code_version`.
+
+    Only the versions of the bundle are read now: figures are read when they
+    are asked for.
+
+    Args:
+        bundle_dir (str | Path): Directory with the bundle files.
+        data_version (str): Version of the data used by the app.
+        code_version (str): Version of the code of the app. Defaults to the
+            version of the running code.
+
+    Returns:
+        FigureBundle | None: The bundle, or None if there's no bundle for these
+        versions of the data and code (a bundle file renamed by hand, or built
+        by other code, is not loaded either).
+    """
+    path = bundle_path(bundle_dir, data_version, code_version)
+    if not path.exists():
+        return None
+    connection = _connect_read_only(path)
+    try:
+        versions = connection.execute(
+            "SELECT data_version, code_version FROM versions"
+        ).fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        connection.close()
+    if versions != (data_version, code_version):
+        return None
+    return FigureBundle(path, data_version)
+
+
+def enumerate_chart_calls(list_olympiads: list[str], list_committees: list[str]):
+    """
+    List the chart method calls the pages can make.
+
+    Args:
+        list_olympiads (list[str]): Olympiads offered by the selectors ("All"
+            included).
+        list_committees (list[str]): Committees offered by the selectors.
+
+    Returns:
+        list[tuple[str, str, dict]]: (chart name, method name, arguments) of
+        every call, chart names being the fields of `ChartAlgorithms`.
+    """
+    calls = []
+    for season in SEASONS:
+        calls.append(
+            ("medals_by_season", "create_bar_medal_season", {"season": season})
+        )
+        for medal_type in MEDAL_TYPES:
+            calls.append(
+                (
+                    "medal_map",
+                    "create_olympic_medals_by_country",
+                    {"season": season, "medal_type": medal_type},
+                )
+            )
+
+    for olympiad in list_olympiads:
+        calls.append(
+            (
+                "sunburnst_by_gender",
+                "create_sunburst_medals",
+                {"selected_olympiad_for_sunburst": olympiad},
+            )
+        )
+        calls.append(
+            ("medals_by_olimpics", "create_medals_by_olympics", {"olympiad": olympiad})
+        )
+
+    # The committee page shows the summer and winter charts together
+    committee_lists = [DEFAULT_COMMITTEES] + [[c] for c in list_committees]
+    for committee_list in committee_lists:
+        for medal_type in MEDAL_TYPES:
+            for percentage in DISPLAY_MODES:
+                calls.append(
+                    (
+                        "medals_by_country",
+                        "create_medals_by_country_seasons",
+                        {
+                            "committee_list": committee_list,
+                            "medal_type": medal_type,
+                            "percentage": percentage,
+                        },
+                    )
+                )
+
+    for committee in list_committees:
+        calls.append(
+            (
+                "medals_by_olympic_and_discipline",
+                "plot_medals_grids",
+                {"committee": committee},
+            )
+        )
+    return calls
+
+
+_worker_charts = None
+
+
+def _init_worker(data_dir: str, data_version: str) -> None:
+    global _worker_charts
+    from loaders import build_chart_algorithms, load_datasets
+
+    _worker_charts = build_chart_algorithms(load_datasets(data_dir), data_version)
+
+
+def _render(calls):
+    rendered = []
+    for chart_name, method_name, arguments in calls:
+        chart = getattr(_worker_charts, chart_name)
+        figure = getattr(chart, method_name)(**arguments)
+        key = make_cache_key(chart, method_name, **arguments)
+        rendered.append((key, dump_value(figure)))
+    return rendered
+
+
+def build_bundle(
+    data_dir: str | Path = "./data",
+    parameters_dir: str | Path = "./parameters",
+    bundle_dir: str | Path = "./bundles",
+    workers: int | None = None,
+    chunk_size: int = 50,
+) -> Path:
+    """
+    Render every figure and write them to the bundle of the current data.
+
+    Args:
+        data_dir (str | Path): Directory with the parquet files.
+        parameters_dir (str | Path): Directory with the selector lists.
+        bundle_dir (str | Path): Directory where the bundle is written.
+        workers (int | None): Number of processes. Defaults to the CPU count.
+        chunk_size (int): Number of figures rendered by each task.
+
+    Returns:
+        Path: Path of the bundle file.
+    """
+    from algorithms import yaml_to_list
+    from loaders import compute_data_version
+
+    data_version = compute_data_version(data_dir)
+    parameters_dir = Path(parameters_dir)
+    calls = enumerate_chart_calls(
+        yaml_to_list(parameters_dir / "list_olympiads.yml"),
+        yaml_to_list(parameters_dir / "list_committees.yml"),
+    )
+    chunks = [calls[i : i + chunk_size] for i in range(0, len(calls), chunk_size)]
+
+    path = bundle_path(bundle_dir, data_version)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(data_dir), data_version),
+    ) as executor:
+        count = _write_atomically(
+            path, data_version, CODE_VERSION, executor.map(_render, chunks)
+        )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Rendered {count} figures in {elapsed:.1f}s "
+        f"({path}, {path.stat().st_size / 1024 / 1024:.1f} MB)"
+    )
+    return path
+
+
+def _write_atomically(path: Path, data_version: str, code_version: str, chunks) -> int:
+    """
+    Write the figures to a temporary file and rename it, so readers never see
+    half a bundle. Return the number of figures.
+
+    Args:
+        path (Path): Path of the bundle file.
+        data_version (str): Version of the data of the figures.
+        code_version (str): Version of the code that built them.
+        chunks (Iterable): Lists of (cache key, serialized figure) pairs.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(file_descriptor)
+    count = 0
+    try:
+        connection = sqlite3.connect(tmp_name)
+        try:
+            with connection:
+                connection.executescript(_SCHEMA)
+                connection.execute(
+                    "INSERT INTO versions VALUES (?, ?)", (data_version, code_version)
+                )
+                for rendered in chunks:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO figures VALUES (?, ?)",
+                        [(key_digest(key), data) for key, data in rendered],
+                    )
+                    count += len(rendered)
+        finally:
+            connection.close()
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return count
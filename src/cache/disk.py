@@ -0,0 +1,140 @@
+"""
+On-disk figure store, shared by the worker processes of a node.
+
+`SQLiteFigureStore` keeps serialized figures in a SQLite database. Every worker
+that opens the same file reads the figures computed by the others, so adding
+workers doesn't multiply the figure computations.
+
+Only figures of the store's data version are read and written: their cache key
+starts with the data version, used as namespace by `build_chart_algorithms`.
+The figures are also stored with the version of the code that built them
+(`cache.version.CODE_VERSION`). When the parquet files or the chart code change,
+the app starts with a new version, and the figures of other versions are
+deleted when the store is opened.
+
+Each write is a single transaction, so readers never see partial figures, and
+the database uses write-ahead logging so readers don't wait for writers.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from cache.serialization import dump_value, key_digest, load_value
+from cache.version import CODE_VERSION
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS figures (
+    data_version TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (data_version, key)
+)
+"""
+
+
+class SQLiteFigureStore:
+    """Figure store backed by a SQLite file, safe across threads and processes."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        data_version: str,
+        timeout: float = 30.0,
+        code_version: str = CODE_VERSION,
+    ):
+        """
+        Args:
+            path (str | Path): Path of the database file, created if needed.
+            data_version (str): Version of the data of the figures (see
+                `loaders.compute_data_version`).
+            timeout (float): Seconds to wait for a lock held by another process.
+            code_version (str): Version of the code that builds the figures.
+                Defaults to the version of the running code.
+        """
+        self.path = Path(path)
+        self.data_version = data_version
+        self.code_version = code_version
+        # Stored in the `data_version` column, so older databases are pruned
+        self._version = f"{data_version}+{code_version}"
+        self.timeout = timeout
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        with connection:
+            connection.execute(_SCHEMA)
+        self.prune()
+
+    def get(self, key, default=None):
+        digest = self._digest(key)
+        if digest is None:
+            return default
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM figures WHERE data_version = ? AND key = ?",
+                (self._version, digest),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return default
+        return load_value(row[0])
+
+    def put(self, key, value) -> None:
+        digest = self._digest(key)
+        if digest is None:
+            return
+        data = dump_value(value)
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO figures (data_version, key, value) "
+                "VALUES (?, ?, ?)",
+                (self._version, digest, data),
+            )
+
+    def prune(self) -> int:
+        """Delete the figures of other data or code versions, and return their
+        number."""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                "DELETE FROM figures WHERE data_version != ?", (self._version,)
+            )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return (
+            self._connection()
+            .execute(
+                "SELECT COUNT(*) FROM figures WHERE data_version = ?",
+                (self._version,),
+            )
+            .fetchone()[0]
+        )
+
+    def _digest(self, key) -> str | None:
+        """
+        Return a stable text version of `key`, or None if the key doesn't belong
+        to the store's data version (figures of objects with their own cache
+        namespace can't be shared with other processes).
+        """
+        if not isinstance(key, tuple) or not key or key[0] != self.data_version:
+            return None
+        return key_digest(key)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread (and process)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
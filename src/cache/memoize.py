@@ -0,0 +1,291 @@
+"""
+Bounded memoization for the chart-producing methods of the algorithm classes.
+
+The possible arguments of the chart methods are few (seasons, Olympiads, medal
+types, committees), so the figures are kept in a shared, thread-safe LRU cache.
+The cache is bounded in bytes: the least recently used figures are evicted when
+the estimated size of the cached values (JSON payloads included) goes over
+`max_bytes`.
+
+Methods are cached with the `memoize_figure` decorator. Arguments are normalized
+to build the key: defaults are applied, and sets are sorted. Lists keep their
+order, since charts use it (the committee charts draw and colour one line per
+committee, in list order): `["France", "Italy"]` and `["Italy", "France"]` have
+their own entries. The method itself is called with the arguments as given.
+Cached figures encode their JSON payload only once (see `cache.payload`).
+
+Figures missing from memory can also be looked up in slower stores shared with
+other processes (see `FigureCache.add_store`), before being computed.
+
+Set the `FIGURE_CACHE_MAX_MB` environment variable to change the default size.
+"""
+
+import inspect
+import itertools
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+from plotly.basedatatypes import BaseFigure
+
+from cache.payload import PayloadFigure, as_payload_figure
+
+DEFAULT_MAX_BYTES = int(os.environ.get("FIGURE_CACHE_MAX_MB", 256)) * 1024 * 1024
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    store_hits: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+
+class FigureCache:
+    """Thread-safe LRU cache, bounded by the estimated size of its values."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size_bytes = 0
+        self._stats = CacheStats()
+        self._stores = []
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """Return the cached value for `key` (marking it as recently used)."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key, value) -> None:
+        """Store `value`, evicting least recently used entries to make room.
+
+        Values larger than the whole cache are not stored.
+        """
+        size = estimate_size(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self._stats.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the value for `key` from memory, then from the stores, and compute
+        it (saving it to the stores) if no one has it.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        stores = self._stores
+        for store in stores:
+            value = store.get(key, _MISSING)
+            if value is not _MISSING:
+                with self._lock:
+                    self._stats.store_hits += 1
+                break
+        else:
+            value = compute()
+            for store in stores:
+                store.put(key, value)
+        self.put(key, value)
+        return value
+
+    def add_store(self, store) -> None:
+        """
+        Add a store, looked up in order when a key is not in memory.
+
+        A store has `get(key, default)` and `put(key, value)` methods, `put`
+        may do nothing for read-only stores.
+        """
+        with self._lock:
+            self._stores = [*self._stores, store]
+
+    def remove_store(self, store) -> None:
+        with self._lock:
+            self._stores = [s for s in self._stores if s is not store]
+
+    def set_stores(self, stores: list) -> None:
+        """Replace all the stores at once (for example for new data)."""
+        with self._lock:
+            self._stores = list(stores)
+
+    def discard_namespace(self, namespace: str) -> int:
+        """
+        Drop the entries whose key is in `namespace` (for example the figures
+        of an older data version), and return their number.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if isinstance(key, tuple) and key and key[0] == namespace
+            ]
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._stats = CacheStats()
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the hit, miss and eviction counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                store_hits=self._stats.store_hits,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _discard(self, key) -> None:
+        entry = self._entries.pop(key, _MISSING)
+        if entry is not _MISSING:
+            self._size_bytes -= entry[1]
+
+
+figure_cache = FigureCache()
+
+_namespaces = weakref.WeakKeyDictionary()
+_namespace_counter = itertools.count()
+_namespace_lock = threading.Lock()
+
+
+def set_cache_namespace(instance, namespace: str) -> None:
+    """
+    Set the namespace used in the cache keys of `instance`.
+
+    By default, every instance gets its own namespace. Instances built from the
+    same data can share a namespace (for example a hash of the data files), so
+    their figures are shared too.
+    """
+    with _namespace_lock:
+        _namespaces[instance] = namespace
+
+
+def get_cache_namespace(instance) -> str:
+    """Return the namespace of `instance`, creating a unique one if needed."""
+    with _namespace_lock:
+        namespace = _namespaces.get(instance)
+        if namespace is None:
+            namespace = f"{type(instance).__qualname__}#{next(_namespace_counter)}"
+            _namespaces[instance] = namespace
+        return namespace
+
+
+def make_cache_key(instance, method_name: str, *args, **kwargs):
+    """Build the cache key of `instance.method_name(*args, **kwargs)`."""
+    method = inspect.unwrap(getattr(type(instance), method_name))
+    _, key = _normalize_call(
+        inspect.signature(method), method.__qualname__, instance, args, kwargs
+    )
+    return key
+
+
+def memoize_figure(method):
+    """Cache the results of a chart method in `figure_cache`."""
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            _, key = _normalize_call(signature, method.__qualname__, self, args, kwargs)
+        except TypeError:  # Unhashable arguments: compute without caching
+            return method(self, *args, **kwargs)
+
+        return figure_cache.get_or_compute(
+            key, lambda: as_payload_figure(method(self, *args, **kwargs))
+        )
+
+    return wrapper
+
+
+def _normalize_call(signature, qualname, instance, args, kwargs):
+    """Bind the arguments of a call, and return them with their cache key."""
+    bound = signature.bind(instance, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = {
+        name: _normalize_argument(value)
+        for name, value in list(bound.arguments.items())[1:]
+    }
+    key = (
+        get_cache_namespace(instance),
+        qualname,
+        tuple((name, _freeze(value)) for name, value in arguments.items()),
+    )
+    hash(key)
+    return arguments, key
+
+
+def _normalize_argument(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return value
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def estimate_size(value) -> int:
+    """
+    Estimate the memory used by a figure, DataFrame, array or container.
+
+    The JSON payload of a `PayloadFigure` is counted too: it is encoded now if
+    it wasn't yet, since it is kept once the figure is first sent.
+    """
+    if isinstance(value, PayloadFigure):
+        return estimate_size(value.to_plotly_json()) + sys.getsizeof(value.to_json())
+    if isinstance(value, BaseFigure):
+        return estimate_size(value.to_plotly_json())
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(estimate_size(v) for v in value.ravel())
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
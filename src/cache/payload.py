@@ -0,0 +1,68 @@
+"""
+Precompiled JSON payloads of the chart figures.
+
+Taipy sends a figure to the browser by calling its `to_json` method on every
+update of the chart. The figures returned by the chart methods are cached and
+never modified, so their JSON payload can be encoded once and reused:
+`PayloadFigure.to_json` returns the payload encoded on its first call.
+
+Payloads use Plotly's base64 typed-array encoding for numeric arrays. They are
+encoded with the standard library engine by default: with Plotly 6, the `orjson`
+engine is slower on these figures, because Plotly cleans the figure in Python
+before handing it to orjson. Set `FIGURE_JSON_ENGINE=orjson` to use it anyway.
+"""
+
+import os
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+JSON_ENGINE = os.environ.get("FIGURE_JSON_ENGINE", "json")
+
+
+class PayloadFigure(go.Figure):
+    """
+    Figure that encodes its JSON payload only once.
+
+    The figure must not be modified after its payload is encoded: the chart
+    methods return shared, cached figures that are never modified.
+    """
+
+    def __init__(self, *args, payload: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._payload = payload
+
+    def to_json(self, *args, **kwargs) -> str:
+        if args or kwargs:
+            return super().to_json(*args, **kwargs)
+        payload = getattr(self, "_payload", None)
+        if payload is None:
+            payload = encode_payload(self)
+            self._payload = payload
+        return payload
+
+    @property
+    def has_payload(self) -> bool:
+        return getattr(self, "_payload", None) is not None
+
+
+def encode_payload(figure: go.Figure) -> str:
+    """Encode a figure to JSON, without validating it again."""
+    return pio.to_json(figure, validate=False, engine=JSON_ENGINE)
+
+
+def as_payload_figure(figure):
+    """
+    Return `figure` as a `PayloadFigure`, in place.
+
+    Only the class of the figure changes (PayloadFigure adds no state that
+    `to_json` needs up front), which is much cheaper than copying large figures.
+    The figures of a tuple (such as the `SeasonFigures` of a chart) are
+    converted too. Other values are returned unchanged.
+    """
+    if type(figure) is go.Figure:
+        figure.__class__ = PayloadFigure
+    elif isinstance(figure, tuple):
+        for item in figure:
+            as_payload_figure(item)
+    return figure
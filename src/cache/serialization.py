@@ -0,0 +1,62 @@
+"""
+Serialization of cached values, for the figure stores shared between processes.
+
+Plotly figures are stored as their plain dictionary representation, and rebuilt
+without validation: they were already validated when they were first created,
+and validating large figures (such as the "All" sunburst) again is slow. Their JSON
+payload is stored too, so it is not encoded again by the processes loading them.
+"""
+
+import hashlib
+import pickle
+
+from plotly.basedatatypes import BaseFigure
+
+from cache.payload import PayloadFigure, encode_payload
+
+
+def dump_value(value) -> bytes:
+    """Serialize a figure, a tuple of figures (such as `SeasonFigures`), or any
+    picklable value to bytes."""
+    if isinstance(value, BaseFigure):
+        return pickle.dumps(("figure", *_dump_figure(value)))
+    if _is_figure_tuple(value):
+        figures = [_dump_figure(figure) for figure in value]
+        return pickle.dumps(("figures", (type(value), figures), None))
+    return pickle.dumps(("object", value, None))
+
+
+def load_value(data: bytes):
+    """Rebuild a value serialized with `dump_value`."""
+    kind, value, *payload = pickle.loads(data)  # Older entries have no payload
+    if kind == "figure":
+        return _load_figure(value, next(iter(payload), None))
+    if kind == "figures":
+        tuple_type, figures = value
+        loaded = [_load_figure(*figure) for figure in figures]
+        return tuple(loaded) if tuple_type is tuple else tuple_type(*loaded)
+    return value
+
+
+def key_digest(key) -> str:
+    """Return a stable text version of a cache key, to index stored figures."""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _is_figure_tuple(value) -> bool:
+    return (
+        isinstance(value, tuple)
+        and len(value) > 0
+        and all(isinstance(item, BaseFigure) for item in value)
+    )
+
+
+def _dump_figure(figure):
+    """Return the plain dictionary and the JSON payload of a figure."""
+    if isinstance(figure, PayloadFigure):
+        return figure.to_plotly_json(), figure.to_json()
+    return figure.to_plotly_json(), encode_payload(figure)
+
+
+def _load_figure(figure_dict, payload):
+    return PayloadFigure(figure_dict, _validate=False, payload=payload)
@@ -0,0 +1,39 @@
+"""
+Version of the code that builds the figures.
+
+Figures saved to disk (`cache.disk`, `cache.bundle`) are only valid for the data
+and for the code they were built from. `CODE_VERSION` is a hash of the sources
+of the packages that build the figures: it changes with any change to the chart
+code, or to the loaders that build the inputs of the charts (such as
+`loaders.aggregates`), so figures built by an older version of the code aren't
+served.
+"""
+
+import hashlib
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent
+# Packages whose code builds the figures, their inputs, or serializes them
+CODE_PACKAGES = ("algorithms", "cache", "context", "loaders")
+
+
+def compute_code_version(src_dir: str | Path = SRC_DIR) -> str:
+    """
+    Return a short hash of the sources of `CODE_PACKAGES`.
+
+    Args:
+        src_dir (str | Path): Directory with the packages.
+
+    Returns:
+        str: 16 hexadecimal characters, that change when any source changes.
+    """
+    src_dir = Path(src_dir)
+    digest = hashlib.sha256()
+    for package in CODE_PACKAGES:
+        for path in sorted((src_dir / package).rglob("*.py")):
+            digest.update(path.relative_to(src_dir).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = compute_code_version()
@@ -1,3 +1,5 @@
+from callbacks.callbacks import apply_data_snapshot as apply_data_snapshot
+from callbacks.callbacks import init_session as init_session
 from callbacks.callbacks import init_total_medals as init_total_medals
 from callbacks.callbacks import (
     on_selector_medals_by_committee as on_selector_medals_by_committee,
@@ -1,4 +1,13 @@
 from context import MedalTotals
+from page_utils.async_charts import refresh_charts
+
+
+def init_session(state):
+    """Compute the medal cards and the charts of a session."""
+    with state as s:
+        init_total_medals(s)
+        refresh_charts(s)
+        s.session_initialized = True
 
 
 def init_total_medals(state):
@@ -7,9 +16,28 @@ def init_total_medals(state):
         on_selector_medals_by_committee(s)
 
 
+def apply_data_snapshot(state, snapshot):
+    """
+    Replace the data of a session with a new snapshot (see `loaders.watcher`).
+
+    The data variables are shared by all the sessions (see
+    `loaders.SHARED_VARIABLES`): the first session that applies the snapshot
+    sets them for every session, the next ones only refresh their own cards
+    and charts. All the variables are updated in a single batch, so the charts
+    of the session are refreshed with the objects of the new snapshot.
+    """
+    with state as s:
+        if s.data_version != snapshot.data_version or any(
+            list(getattr(s, name)) != value for name, value in snapshot.lists().items()
+        ):
+            for name, value in snapshot.state_variables().items():
+                setattr(s, name, value)
+        init_session(s)
+
+
 def on_selector_medals_by_committee(state):
     with state as s:
-        df_grouped_medals_olympics = s.df_grouped_medals_olympics.copy()
+        df_grouped_medals_olympics = s.df_grouped_medals_olympics
         selected_committe = s.committee_detail
 
         s.medal_details = create_medals_detail(
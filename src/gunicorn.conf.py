@@ -0,0 +1,37 @@
+"""
+gunicorn settings of the production server (see serve.py).
+
+Taipy keeps the state of the sessions in the process that serves them, so a
+gunicorn server runs a single worker process: its threads serve the requests
+and the WebSocket connections of the sessions. The app is imported by the
+worker (not preloaded by the master process), so its data watcher thread runs
+in the worker.
+
+The settings are read from environment variables, and the command line
+arguments of gunicorn override them:
+
+- HOST and PORT: address of the server (0.0.0.0:5000 by default).
+- WEB_THREADS: threads of the worker (32 by default).
+- GRACEFUL_TIMEOUT: seconds given to the requests in progress when the server
+  stops (30 by default).
+"""
+
+import os
+import sys
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 32))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+preload_app = False
+wsgi_app = "main:app"
+# serve.py runs several servers: no control socket, they would share its path
+control_socket_disable = True
+
+
+def worker_exit(server, worker):
+    """Stop the data watcher of the app when the worker stops."""
+    main = sys.modules.get("main")
+    if main is not None and main.data_watcher is not None:
+        main.data_watcher.stop()
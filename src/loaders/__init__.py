@@ -0,0 +1,18 @@
+from loaders.aggregates import AGGREGATES as AGGREGATES
+from loaders.aggregates import MedalCounts as MedalCounts
+from loaders.aggregates import count_medals as count_medals
+from loaders.aggregates import derive_aggregates as derive_aggregates
+from loaders.charts import ChartAlgorithms as ChartAlgorithms
+from loaders.charts import build_chart_algorithms as build_chart_algorithms
+from loaders.datasets import DATA_FILES as DATA_FILES
+from loaders.datasets import LOADED_COLUMNS as LOADED_COLUMNS
+from loaders.datasets import Datasets as Datasets
+from loaders.datasets import compute_data_version as compute_data_version
+from loaders.datasets import load_datasets as load_datasets
+from loaders.ipc import read_parquet_mapped as read_parquet_mapped
+from loaders.snapshot import SHARED_VARIABLES as SHARED_VARIABLES
+from loaders.snapshot import DataSnapshot as DataSnapshot
+from loaders.snapshot import load_lists as load_lists
+from loaders.snapshot import load_snapshot as load_snapshot
+from loaders.sources import SourceTable as SourceTable
+from loaders.watcher import DataWatcher as DataWatcher
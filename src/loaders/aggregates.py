@@ -0,0 +1,278 @@
+"""
+In-process derivation of the aggregate datasets from the medals fact table.
+
+The aggregates used by the charts (medals by Olympiad, by committee, totals by
+Olympiad and committee) used to be computed offline by a notebook, and read
+from their own parquet files. They are now derived from `olympic_medals` when
+the data is loaded, so they can't drift apart from it.
+
+`count_medals` makes a single vectorized pass over the categorical codes of the
+fact table, and counts the medals by (Olympiad, committee, medal type) with
+`np.bincount`. Every aggregate is then a cheap reduction of that tensor: add a
+function to `AGGREGATES` to derive a new view.
+
+The derived frames are identical to the parquet files built by the
+`transformation` pipeline, which uses the same functions.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+MEDAL_TYPES = ["Gold", "Silver", "Bronze"]
+
+# `Medal_type_code` column of `medals_by_olympiad`
+MEDAL_ORDER = {"Bronze": 0, "Silver": 1, "Gold": 2}
+
+# Columns of the medals table used by `count_medals`
+MEDALS_COLUMNS = [
+    "Olympiad",
+    "Olympic_year",
+    "Olympic_season",
+    "Committee",
+    "Medal_type",
+]
+
+CITIES_SIMPLIFIED_COLUMNS = [
+    "Olympiad",
+    "Olympic_year",
+    "Olympic_season",
+    "total_medals",
+    "total_medals_gold",
+    "total_medals_silver",
+    "total_medals_bronze",
+    "number_committees",
+    "number_disciplines",
+    "number_events",
+    "Country",
+    "Continent",
+]
+
+
+@dataclass(frozen=True)
+class MedalCounts:
+    """Medal counts of the fact table, indexed by categorical codes.
+
+    - counts: medals by (Olympiad, committee, medal type) codes.
+    - olympiad_dtype, committee_dtype, medal_dtype, season_dtype: categorical
+    dtypes of the fact table, to decode the codes.
+    - olympiad_years, olympiad_seasons: year and season code of each Olympiad.
+    - olympiad_order: Olympiad codes, in order of first appearance.
+    """
+
+    counts: np.ndarray
+    olympiad_dtype: pd.CategoricalDtype
+    committee_dtype: pd.CategoricalDtype
+    medal_dtype: pd.CategoricalDtype
+    season_dtype: pd.CategoricalDtype
+    olympiad_years: np.ndarray
+    olympiad_seasons: np.ndarray
+    olympiad_order: np.ndarray
+
+    def medal_code(self, medal_type: str) -> int:
+        return self.medal_dtype.categories.get_loc(medal_type)
+
+
+def count_medals(df_olympic_medals: pd.DataFrame) -> MedalCounts:
+    """
+    Count the medals by (Olympiad, committee, medal type), in one pass.
+
+    Args:
+        df_olympic_medals (pd.DataFrame): Medals fact table, with categorical
+            Olympiad, Committee, Medal_type and Olympic_season columns.
+
+    Returns:
+        MedalCounts: The counts tensor and its lookup tables.
+    """
+    olympiads = df_olympic_medals["Olympiad"].cat
+    committees = df_olympic_medals["Committee"].cat
+    medals = df_olympic_medals["Medal_type"].cat
+    seasons = df_olympic_medals["Olympic_season"].cat
+
+    shape = (
+        len(olympiads.categories),
+        len(committees.categories),
+        len(medals.categories),
+    )
+    olympiad_codes = olympiads.codes.to_numpy().astype(np.intp)
+    flat_index = np.ravel_multi_index(
+        (olympiad_codes, committees.codes.to_numpy(), medals.codes.to_numpy()),
+        shape,
+    )
+    counts = np.bincount(flat_index, minlength=np.prod(shape)).reshape(shape)
+
+    # Year and season of each Olympiad, from its first row
+    order, first_rows = np.unique(olympiad_codes, return_index=True)
+    olympiad_years = np.zeros(shape[0], dtype=np.int64)
+    olympiad_years[order] = df_olympic_medals["Olympic_year"].to_numpy()[first_rows]
+    olympiad_seasons = np.zeros(shape[0], dtype=seasons.codes.dtype)
+    olympiad_seasons[order] = seasons.codes.to_numpy()[first_rows]
+
+    return MedalCounts(
+        counts=counts.astype(np.int64),
+        olympiad_dtype=df_olympic_medals["Olympiad"].dtype,
+        committee_dtype=df_olympic_medals["Committee"].dtype,
+        medal_dtype=df_olympic_medals["Medal_type"].dtype,
+        season_dtype=df_olympic_medals["Olympic_season"].dtype,
+        olympiad_years=olympiad_years,
+        olympiad_seasons=olympiad_seasons,
+        olympiad_order=order[np.argsort(first_rows)],
+    )
+
+
+def medals_by_olympiad(medal_counts: MedalCounts) -> pd.DataFrame:
+    """
+    Medal count by Olympiad and medal type, sorted by year and medal type.
+
+    Rows are sorted by medal type name (like the published parquet file, whose
+    order sets the order of the bars), not by `Medal_type_code`.
+    """
+    by_olympiad = medal_counts.counts.sum(axis=1)
+    olympiad_codes, medal_codes = np.nonzero(by_olympiad)
+    medal_type_codes = np.array(
+        [MEDAL_ORDER[m] for m in medal_counts.medal_dtype.categories]
+    )[medal_codes]
+    years = medal_counts.olympiad_years[olympiad_codes]
+    order = np.lexsort((olympiad_codes, medal_codes, years))
+
+    olympiad_codes, medal_codes = olympiad_codes[order], medal_codes[order]
+    return pd.DataFrame(
+        {
+            "Olympiad": _decode(olympiad_codes, medal_counts.olympiad_dtype),
+            "Olympic_year": years[order],
+            "Medal_type": _decode(medal_codes, medal_counts.medal_dtype),
+            "Olympic_season": _decode(
+                medal_counts.olympiad_seasons[olympiad_codes],
+                medal_counts.season_dtype,
+            ),
+            "Medal_count": by_olympiad[olympiad_codes, medal_codes],
+            "Medal_type_code": medal_type_codes[order],
+        }
+    )
+
+
+def total_medals_by_olympiad_and_committee(medal_counts: MedalCounts) -> pd.DataFrame:
+    """
+    Medals of every committee by Olympiad, for all medals and for each medal type.
+
+    One row per (medal type, Olympiad where medals of that type were awarded),
+    one column per committee, and the total of the row in `Total_medals`.
+    """
+    committees = sorted(
+        medal_counts.committee_dtype.categories[
+            medal_counts.counts.sum(axis=(0, 2)) > 0
+        ]
+    )
+    committee_codes = medal_counts.committee_dtype.categories.get_indexer(committees)
+
+    blocks = []
+    for medal_type in ["All", *MEDAL_TYPES]:
+        if medal_type == "All":
+            counts = medal_counts.counts.sum(axis=2)
+        else:
+            counts = medal_counts.counts[:, :, medal_counts.medal_code(medal_type)]
+        counts = counts[:, committee_codes].astype(np.float64)
+
+        olympiad_codes = np.flatnonzero(counts.sum(axis=1))
+        years = medal_counts.olympiad_years[olympiad_codes]
+        olympiad_codes = olympiad_codes[np.lexsort((olympiad_codes, years))]
+
+        block = pd.DataFrame(counts[olympiad_codes], columns=committees)
+        block.insert(0, "Olympic_year", medal_counts.olympiad_years[olympiad_codes])
+        block.insert(
+            1, "Olympiad", _decode(olympiad_codes, medal_counts.olympiad_dtype)
+        )
+        block.insert(
+            2,
+            "Olympic_season",
+            _decode(
+                medal_counts.olympiad_seasons[olympiad_codes],
+                medal_counts.season_dtype,
+            ),
+        )
+        block["Total_medals"] = counts[olympiad_codes].sum(axis=1)
+        block["Medal_type"] = medal_type
+        blocks.append(block)
+    return pd.concat(blocks, ignore_index=True)
+
+
+def grouped_medals_olympiads(medal_counts: MedalCounts) -> pd.DataFrame:
+    """
+    Gold, silver and bronze medals of each committee, by Olympiad and for "All"
+    of them, sorted by gold then silver medals.
+    """
+    blocks = [
+        _medals_by_committee(medal_counts.counts.sum(axis=0), "All", medal_counts)
+    ]
+    for olympiad_code in medal_counts.olympiad_order:
+        blocks.append(
+            _medals_by_committee(
+                medal_counts.counts[olympiad_code],
+                medal_counts.olympiad_dtype.categories[olympiad_code],
+                medal_counts,
+            )
+        )
+    df_grouped = pd.concat(blocks, ignore_index=True)
+    df_grouped["Total"] = (
+        df_grouped["Gold"] + df_grouped["Silver"] + df_grouped["Bronze"]
+    )
+    return df_grouped
+
+
+def _medals_by_committee(
+    counts: np.ndarray, olympiad: str, medal_counts: MedalCounts
+) -> pd.DataFrame:
+    """Medals by committee and medal type (counts by committee x medal codes)."""
+    committee_codes = np.flatnonzero(counts.sum(axis=1))
+    counts = counts[committee_codes]
+    columns = {
+        medal_type: counts[:, code]
+        for code, medal_type in enumerate(medal_counts.medal_dtype.categories)
+    }
+    order = np.lexsort((-columns["Silver"], -columns["Gold"]))
+
+    df_block = pd.DataFrame(
+        {"Committee": _decode(committee_codes[order], medal_counts.committee_dtype)}
+    )
+    for medal_type, values in columns.items():
+        df_block[medal_type] = values[order]
+    df_block["Olympiad"] = olympiad
+    return df_block
+
+
+def olympic_cities_simplified(df_olympic_cities: pd.DataFrame) -> pd.DataFrame:
+    """Small summary table of the host cities."""
+    return df_olympic_cities[CITIES_SIMPLIFIED_COLUMNS]
+
+
+def _decode(codes: np.ndarray, dtype: pd.CategoricalDtype) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, dtype=dtype)
+
+
+AGGREGATES = {
+    "grouped_medals_olympiads": grouped_medals_olympiads,
+    "medals_by_olympiad": medals_by_olympiad,
+    "total_medals_by_olympiad_and_committee": total_medals_by_olympiad_and_committee,
+}
+
+
+def derive_aggregates(
+    df_olympic_medals: pd.DataFrame, df_olympic_cities: pd.DataFrame
+) -> dict[str, pd.DataFrame]:
+    """
+    Derive every aggregate dataset from the source tables.
+
+    Args:
+        df_olympic_medals (pd.DataFrame): Medals fact table.
+        df_olympic_cities (pd.DataFrame): Host cities, with their attributes.
+
+    Returns:
+        dict[str, pd.DataFrame]: Aggregates, by dataset name.
+    """
+    medal_counts = count_medals(df_olympic_medals)
+    aggregates = {name: derive(medal_counts) for name, derive in AGGREGATES.items()}
+    aggregates["olympic_cities_simplified"] = olympic_cities_simplified(
+        df_olympic_cities
+    )
+    return aggregates
@@ -0,0 +1,73 @@
+"""
+Creation of the chart objects used by the pages.
+
+`build_chart_algorithms` creates every algorithm object from the datasets. When
+a data version is given, it is used as the cache namespace of the objects, so
+figures computed by other processes for the same data (for example an
+ahead-of-time figure bundle) can be reused. The objects share a query backend
+(see `algorithms.query_backends`).
+
+The sunburst and the discipline grid prepare their data once, from columns of
+the medals table that the app doesn't keep: the sunburst scans them from the
+file, and the query backend counts the medals of the grid from the parquet file
+of the snapshot (see `Datasets.parquet_table`), reading the row groups of each
+season only.
+"""
+
+from dataclasses import dataclass, fields
+
+from algorithms import (
+    MedalMap,
+    MedalsByCountry,
+    MedalsByOlympicAndDiscipline,
+    MedalsByOlympics,
+    MedalsBySeason,
+    SunburstByGender,
+    get_query_backend,
+)
+from cache import set_cache_namespace
+from loaders.datasets import Datasets
+
+
+@dataclass(frozen=True)
+class ChartAlgorithms:
+    """Algorithm objects, named like the state variables used by the pages."""
+
+    medal_map: MedalMap
+    sunburnst_by_gender: SunburstByGender
+    medals_by_olimpics: MedalsByOlympics
+    medals_by_season: MedalsBySeason
+    medals_by_country: MedalsByCountry
+    medals_by_olympic_and_discipline: MedalsByOlympicAndDiscipline
+
+    def items(self):
+        """Return (state variable name, algorithm object) pairs."""
+        return [(field.name, getattr(self, field.name)) for field in fields(self)]
+
+
+def build_chart_algorithms(
+    datasets: Datasets,
+    data_version: str | None = None,
+    query_backend: str | None = None,
+) -> ChartAlgorithms:
+    """Create all the algorithm objects from the datasets, with the query backend
+    named `query_backend` (`QUERY_BACKEND` by default)."""
+    backend = get_query_backend(query_backend)
+    charts = ChartAlgorithms(
+        medal_map=MedalMap(datasets.olympic_cities, backend),
+        sunburnst_by_gender=SunburstByGender(
+            datasets.scan("olympic_medals", SunburstByGender.REQUIRED_COLUMNS)
+        ),
+        medals_by_olimpics=MedalsByOlympics(datasets.grouped_medals_olympiads),
+        medals_by_season=MedalsBySeason(datasets.medals_by_olympiad),
+        medals_by_country=MedalsByCountry(
+            datasets.total_medals_by_olympiad_and_committee, backend
+        ),
+        medals_by_olympic_and_discipline=MedalsByOlympicAndDiscipline(
+            datasets.parquet_table("olympic_medals", data_version), backend
+        ),
+    )
+    if data_version is not None:
+        for _, chart in charts.items():
+            set_cache_namespace(chart, data_version)
+    return charts
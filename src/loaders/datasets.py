@@ -0,0 +1,175 @@
+"""
+Loading of the parquet datasets used by the app.
+
+`load_datasets` reads the source tables of `DATA_FILES` from the data directory,
+and derives the aggregates from them (see `loaders.aggregates`). The source tables
+are read from the parquet files, or from memory-mapped Arrow IPC copies of them
+that the worker processes share (`DATA_FORMAT=arrow`, see `loaders.ipc`).
+Only the columns listed in `LOADED_COLUMNS` are read at first: the other columns
+are read the first time they are asked for, with `Datasets.read_columns`, or
+read without being kept with `Datasets.scan`, from the row groups that can
+match a season or an Olympiad (see `loaders.sources`). `Datasets.parquet_table`
+returns a source table for the query backends, that query it from its file.
+`Datasets.medals_index` is a bitmap index of the dimensions of the medals table
+(`MEDALS_DIMENSIONS`, see `algorithms.bitmap_index`), to filter and count its
+rows.
+`compute_data_version` returns a short hash of the source files. The data
+version identifies the figures computed from a given set of files, in the
+figure caches.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from algorithms import BitmapIndex, ParquetTable
+from loaders.aggregates import MEDALS_COLUMNS, derive_aggregates
+from loaders.sources import SOURCE_FORMATS, SourceTable
+
+DATA_FILES = {
+    "olympic_medals": "olympic_medals.parquet",
+    "olympic_cities": "olympic_cities.parquet",
+}
+
+# Columns read and kept when the data is loaded, by source table (all of them
+# when the table isn't listed): the columns used by the aggregates. The algorithm
+# classes that take the medals table scan the columns they use once, when they
+# are created (see `loaders.charts`).
+LOADED_COLUMNS = {"olympic_medals": sorted(MEDALS_COLUMNS)}
+
+# Dimensions of the medals table in its bitmap index (`Datasets.medals_index`)
+MEDALS_DIMENSIONS = [
+    "Olympic_season",
+    "Medal_type",
+    "Gender",
+    "Committee_type",
+    "Discipline",
+    "Olympiad",
+    "Committee",
+]
+
+DATA_FORMAT = os.environ.get("DATA_FORMAT", "parquet")
+
+
+@dataclass(frozen=True)
+class Datasets:
+    olympic_medals: pd.DataFrame
+    grouped_medals_olympiads: pd.DataFrame
+    olympic_cities: pd.DataFrame
+    olympic_cities_simplified: pd.DataFrame
+    medals_by_olympiad: pd.DataFrame
+    total_medals_by_olympiad_and_committee: pd.DataFrame
+    sources: dict[str, SourceTable] = field(default_factory=dict, repr=False)
+    medals_index: BitmapIndex | None = field(default=None, repr=False)
+
+    def read_columns(self, name: str, columns: list[str]) -> pd.DataFrame:
+        """
+        Return columns of a source table, reading the ones not read yet (such
+        as the `Winner` column of `olympic_medals`) from the loaded file.
+
+        Args:
+            name (str): The source table, a key of `DATA_FILES`.
+            columns (list[str]): The columns.
+
+        Returns:
+            pd.DataFrame: The columns, in file order.
+        """
+        return self.sources[name].read(columns)
+
+    def scan(
+        self, name: str, columns: list[str], filters: dict | None = None
+    ) -> pd.DataFrame:
+        """
+        Read columns of a source table from its file, without keeping them.
+
+        Args:
+            name (str): The source table, a key of `DATA_FILES`.
+            columns (list[str]): The columns.
+            filters (dict | None): Values of columns that the rows must have,
+                pushed down to the row groups of the file (see
+                `loaders.sources`).
+
+        Returns:
+            pd.DataFrame: The columns of the matching rows, in file order.
+        """
+        return self.sources[name].scan(columns, filters)
+
+    def parquet_table(self, name: str, data_version: str | None = None) -> ParquetTable:
+        """
+        Return a source table, to query it from its parquet file (see
+        `algorithms.query_backends`).
+
+        Args:
+            name (str): The source table, a key of `DATA_FILES`.
+            data_version (str | None): Version of the data of the files.
+
+        Returns:
+            ParquetTable: The table, bound to the file opened when the data was
+            loaded.
+        """
+        return self.sources[name].parquet_table(data_version)
+
+
+def load_datasets(
+    data_dir: str | Path = "./data", data_format: str | None = None
+) -> Datasets:
+    """
+    Read the source tables from `data_dir`, and derive the other datasets.
+
+    Args:
+        data_dir (str | Path): Directory with the parquet files.
+        data_format (str | None): "parquet" or "arrow" (memory-mapped, read-only
+            source tables). Defaults to the `DATA_FORMAT` environment variable.
+            The source files stay open, to read the other columns later.
+
+    Returns:
+        Datasets: The source tables and the aggregates.
+    """
+    data_dir = Path(data_dir)
+    data_format = data_format or DATA_FORMAT
+    if data_format not in SOURCE_FORMATS:
+        raise ValueError(
+            f"Invalid data format {data_format!r}. "
+            f"Should be one of {list(SOURCE_FORMATS)}."
+        )
+    open_source = SOURCE_FORMATS[data_format]
+    sources = {
+        name: open_source(data_dir / file_name)
+        for name, file_name in DATA_FILES.items()
+    }
+    tables = {
+        name: source.read(LOADED_COLUMNS.get(name)) for name, source in sources.items()
+    }
+    medals_source = sources["olympic_medals"]
+    medals_index = BitmapIndex(
+        MEDALS_DIMENSIONS,
+        len(tables["olympic_medals"]),
+        lambda column: medals_source.read([column])[column],
+    )
+    return Datasets(
+        **tables,
+        **derive_aggregates(tables["olympic_medals"], tables["olympic_cities"]),
+        sources=sources,
+        medals_index=medals_index,
+    )
+
+
+def compute_data_version(data_dir: str | Path = "./data") -> str:
+    """
+    Return a short hash of the contents of the source tables.
+
+    Args:
+        data_dir (str | Path): Directory with the parquet files.
+
+    Returns:
+        str: 16 hexadecimal characters, that change when any file changes.
+    """
+    data_dir = Path(data_dir)
+    digest = hashlib.sha256()
+    for file_name in sorted(DATA_FILES.values()):
+        digest.update(file_name.encode())
+        digest.update((data_dir / file_name).read_bytes())
+    return digest.hexdigest()[:16]
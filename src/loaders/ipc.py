@@ -0,0 +1,131 @@
+"""
+Memory-mapped Arrow IPC copies of the source tables.
+
+Reading a parquet file decodes it into the memory of the process: every worker
+process of the app holds its own copy of the source tables. With the "arrow"
+data format (`DATA_FORMAT=arrow`), the source tables are instead read from
+uncompressed Arrow IPC (Feather v2) files, memory-mapped: the columns of the
+DataFrames point into the mapped files, and the pages of the files are shared
+by every process of the machine, through the page cache.
+
+The IPC files are written next to the parquet files (in `data/arrow/`) the first
+time they are needed, and written again when their parquet file changes: each
+file records the hash of its parquet file in its schema metadata. They are
+written to a temporary file first, then renamed, so a process never maps a
+half-written file, and a process that maps a file replaced by a newer one keeps
+reading the old one.
+
+The DataFrames are read-only: their arrays can't be modified (numpy raises a
+`ValueError`), and the string columns (the `Winner` names) are kept as Arrow
+strings (`string[pyarrow]`), instead of one Python object per row.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+ARROW_DIR = "arrow"
+SOURCE_HASH_KEY = b"source_hash"
+
+
+def open_ipc(path: str | Path) -> pa.Table:
+    """Open an Arrow IPC file, memory-mapped: no column is read yet."""
+    with pa.memory_map(str(path)) as source:
+        # The table keeps the mapping open, after the file is closed
+        return pa.ipc.open_file(source).read_all()
+
+
+def ipc_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Convert a memory-mapped table to pandas, without copying its columns."""
+    return table.to_pandas(
+        split_blocks=True,
+        self_destruct=False,
+        types_mapper={pa.string(): pd.ArrowDtype(pa.string())}.get,
+    )
+
+
+def read_ipc(path: str | Path) -> pd.DataFrame:
+    """
+    Read an Arrow IPC file, memory-mapped, without copying its columns.
+
+    Args:
+        path (str | Path): The IPC file.
+
+    Returns:
+        pd.DataFrame: A read-only DataFrame backed by the mapped file.
+    """
+    return ipc_to_pandas(open_ipc(path))
+
+
+def write_ipc(df: pd.DataFrame, path: str | Path, source_hash: str = "") -> None:
+    """
+    Write `df` to an uncompressed Arrow IPC file, atomically.
+
+    Args:
+        df (pd.DataFrame): The DataFrame. Categorical columns are written as
+            dictionaries, with the smallest integer type for their codes.
+        path (str | Path): The IPC file.
+        source_hash (str): Hash of the parquet file, saved in the metadata.
+    """
+    path = Path(path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), SOURCE_HASH_KEY: source_hash.encode()}
+    table = table.replace_schema_metadata(metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with pa.OSFile(str(temporary_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        temporary_path.replace(path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+def ipc_source_hash(path: str | Path) -> str | None:
+    """Return the hash of the parquet file saved in an IPC file, if any."""
+    try:
+        with pa.memory_map(str(path)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    value = metadata.get(SOURCE_HASH_KEY)
+    return value.decode() if value is not None else None
+
+
+def open_parquet_mapped(parquet_path: str | Path) -> pa.Table:
+    """
+    Open the memory-mapped IPC copy of a parquet file, in the `arrow` directory
+    next to it. The copy is written first if it is missing, or if it was written
+    from another version of the parquet file.
+
+    Args:
+        parquet_path (str | Path): The parquet file.
+
+    Returns:
+        pa.Table: The table, backed by the mapped IPC file.
+    """
+    parquet_path = Path(parquet_path)
+    ipc_path = parquet_path.parent / ARROW_DIR / parquet_path.with_suffix(".arrow").name
+    source_hash = hashlib.sha256(parquet_path.read_bytes()).hexdigest()
+    if ipc_source_hash(ipc_path) != source_hash:
+        write_ipc(pd.read_parquet(parquet_path), ipc_path, source_hash)
+    return open_ipc(ipc_path)
+
+
+def read_parquet_mapped(parquet_path: str | Path) -> pd.DataFrame:
+    """
+    Read a parquet file from its memory-mapped IPC copy (see
+    `open_parquet_mapped`).
+
+    Args:
+        parquet_path (str | Path): The parquet file.
+
+    Returns:
+        pd.DataFrame: A read-only DataFrame backed by the mapped IPC file.
+    """
+    return ipc_to_pandas(open_parquet_mapped(parquet_path))
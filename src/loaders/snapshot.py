@@ -0,0 +1,118 @@
+"""
+Immutable snapshot of the data used by the app.
+
+A `DataSnapshot` holds the datasets, the algorithm objects built from them, and
+the selector lists, for one data version. Snapshots are never modified: new
+data gives a new snapshot, that replaces the previous one as a whole (see
+`loaders.watcher`). A chart rendered with the objects of a snapshot only ever
+sees the data of that snapshot. When only the selector lists change, the new
+snapshot keeps the datasets and the algorithm objects of the previous one
+(`with_lists`).
+
+The state variables of a snapshot are shared by all the sessions
+(`SHARED_VARIABLES`, see `Gui.add_shared_variables`): every session binds the
+same objects, and setting them in one session sets them in all the sessions.
+The sessions then hold only their selector values, and a data reload replaces
+the data of every session at once, so the objects of the previous snapshot are
+freed instead of staying alive in the sessions that weren't refreshed yet.
+"""
+
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+
+from algorithms import yaml_to_list
+from loaders.charts import ChartAlgorithms, build_chart_algorithms
+from loaders.datasets import Datasets, compute_data_version, load_datasets
+
+# State variables set from a snapshot, shared by all the sessions (the names of
+# `DataSnapshot.state_variables`)
+SHARED_VARIABLES = (
+    "data_version",
+    "df_olympic_medals",
+    "df_grouped_medals_olympics",
+    "df_olympic_cities_simplified",
+    "latest_olympiad",
+    "list_olympiads",
+    "list_committees",
+    *(field.name for field in fields(ChartAlgorithms)),
+)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    data_version: str
+    datasets: Datasets
+    charts: ChartAlgorithms
+    list_olympiads: list[str]
+    list_committees: list[str]
+
+    @property
+    def latest_olympiad(self) -> str:
+        df_olympic_medals = self.datasets.olympic_medals
+        return df_olympic_medals.loc[
+            df_olympic_medals["Olympic_year"].idxmax(), "Olympiad"
+        ]
+
+    def lists(self) -> dict[str, list[str]]:
+        """Return the selector lists, by state variable name."""
+        return {
+            "list_olympiads": self.list_olympiads,
+            "list_committees": self.list_committees,
+        }
+
+    def with_lists(self, lists: dict[str, list[str]]) -> "DataSnapshot":
+        """Return a snapshot of the same data, with other selector lists."""
+        return replace(self, **lists)
+
+    def state_variables(self) -> dict:
+        """Return the state variables of the pages that depend on the data."""
+        return {
+            "data_version": self.data_version,
+            "df_olympic_medals": self.datasets.olympic_medals,
+            "df_grouped_medals_olympics": self.datasets.grouped_medals_olympiads,
+            "df_olympic_cities_simplified": self.datasets.olympic_cities_simplified,
+            "latest_olympiad": self.latest_olympiad,
+            "list_olympiads": self.list_olympiads,
+            "list_committees": self.list_committees,
+            **dict(self.charts.items()),
+        }
+
+
+def load_snapshot(
+    data_dir: str | Path = "./data", parameters_dir: str | Path = "./parameters"
+) -> DataSnapshot:
+    """
+    Load the datasets and the lists, and build the algorithm objects.
+
+    Args:
+        data_dir (str | Path): Directory with the parquet files.
+        parameters_dir (str | Path): Directory with the selector lists.
+
+    Returns:
+        DataSnapshot: The snapshot of the current files.
+    """
+    data_version = compute_data_version(data_dir)
+    datasets = load_datasets(data_dir)
+    return DataSnapshot(
+        data_version=data_version,
+        datasets=datasets,
+        charts=build_chart_algorithms(datasets, data_version),
+        **load_lists(parameters_dir),
+    )
+
+
+def load_lists(parameters_dir: str | Path = "./parameters") -> dict[str, list[str]]:
+    """
+    Read the selector lists.
+
+    Args:
+        parameters_dir (str | Path): Directory with the selector lists.
+
+    Returns:
+        dict[str, list[str]]: The lists, by field name of `DataSnapshot`.
+    """
+    parameters_dir = Path(parameters_dir)
+    return {
+        "list_olympiads": yaml_to_list(parameters_dir / "list_olympiads.yml"),
+        "list_committees": yaml_to_list(parameters_dir / "list_committees.yml"),
+    }
@@ -0,0 +1,240 @@
+"""
+Source tables whose columns are read when first needed.
+
+A `SourceTable` is an open source file (a parquet file, or its memory-mapped
+Arrow IPC copy, see `loaders.ipc`). `read` returns some of its columns, reading
+from the file only the ones that weren't read before: the app reads the columns
+used by the charts when it starts, and other columns, such as the `Winner`
+names, only if a feature asks for them.
+
+The file stays open, so columns read later come from the same version of the
+file, even if it was replaced since (the pipeline replaces files by renaming
+new ones over them).
+
+`scan` reads columns from the file without keeping them, and takes equality
+predicates (`filters`), such as a season or an Olympiad: only the row groups
+whose min/max statistics can match the predicates are read (the medals file has
+a row group layout made for it, see `transformation.layout`).
+
+`parquet_table` returns the table as a `ParquetTable`, that the query backends
+query from its parquet file (see `algorithms.query_backends`): the app builds
+the discipline grid of each season this way.
+"""
+
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from algorithms import ParquetTable
+from algorithms.query_backends import file_signature
+from loaders.ipc import ipc_to_pandas, open_parquet_mapped
+
+
+class SourceTable:
+    """Columns of a source file, read on demand and kept once read."""
+
+    def __init__(
+        self,
+        columns: list[str],
+        read_columns: Callable[[list[str], dict | None], pd.DataFrame],
+        read_empty: Callable[[list[str]], pd.DataFrame] | None = None,
+        path: str | Path | None = None,
+        signature: tuple | None = None,
+    ):
+        """
+        Args:
+            columns (list[str]): All the columns of the file, in file order.
+            read_columns (Callable): Reads some columns from the file, from the
+                rows that match equality predicates (a dict, or None).
+            read_empty (Callable | None): Reads some columns without rows, with
+                their dtypes (from all the rows by default).
+            path (str | Path | None): The parquet file.
+            signature (tuple | None): `file_signature` of the parquet file, when
+                it was opened.
+        """
+        self.columns = columns
+        self.path = path
+        self.signature = signature
+        self._read_columns = read_columns
+        self._read_empty = read_empty or (
+            lambda columns: read_columns(columns, None).iloc[:0]
+        )
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded_columns(self) -> list[str]:
+        return [column for column in self.columns if column in self._loaded]
+
+    def read(self, columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """
+        Return some columns of the table, reading the ones not read yet.
+
+        Args:
+            columns (Iterable[str] | None): The columns, all of them by default.
+
+        Returns:
+            pd.DataFrame: The columns, in file order. The frames returned share
+            their columns, and must not be modified.
+
+        Raises:
+            KeyError: If a column is not in the file.
+        """
+        columns = self._file_order(columns)
+        with self._lock:
+            missing = [column for column in columns if column not in self._loaded]
+            if missing:
+                df = self._read_columns(missing, None)
+                self._loaded.update({column: df[column] for column in missing})
+            return pd.DataFrame(
+                {column: self._loaded[column] for column in columns}, copy=False
+            )
+
+    def scan(
+        self, columns: Iterable[str] | None = None, filters: dict | None = None
+    ) -> pd.DataFrame:
+        """
+        Read some columns from the file, without keeping them.
+
+        Args:
+            columns (Iterable[str] | None): The columns, all of them by default.
+            filters (dict | None): Values of columns that the rows must have,
+                such as `{"Olympic_season": "winter"}`. Only the row groups
+                whose statistics can match them are read.
+
+        Returns:
+            pd.DataFrame: The columns of the matching rows, in file order.
+
+        Raises:
+            KeyError: If a column is not in the file.
+        """
+        filters = filters or {}
+        self._file_order(filters)
+        with self._lock:
+            return self._read_columns(self._file_order(columns), filters)
+
+    def empty(self, columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """Return some columns without rows, with their dtypes (and categories)."""
+        return self._read_empty(self._file_order(columns))
+
+    def parquet_table(self, data_version: str | None = None) -> ParquetTable:
+        """
+        Return the table, to query it from its parquet file.
+
+        Args:
+            data_version (str | None): Version of the data the file belongs to.
+
+        Returns:
+            ParquetTable: The table, bound to the file opened here.
+
+        Raises:
+            ValueError: If the source has no parquet file.
+        """
+        if self.path is None:
+            raise ValueError("The source table has no parquet file")
+        return ParquetTable(
+            str(self.path), data_version, self.signature, self.scan, self.empty
+        )
+
+    def _file_order(self, columns: Iterable[str] | None) -> list[str]:
+        wanted = set(self.columns if columns is None else columns)
+        unknown = wanted.difference(self.columns)
+        if unknown:
+            raise KeyError(f"Columns not in the source table: {sorted(unknown)}")
+        return [column for column in self.columns if column in wanted]
+
+
+def matching_row_groups(metadata: pq.FileMetaData, filters: dict) -> list[int]:
+    """
+    Return the row groups of a parquet file whose min/max statistics can match
+    equality predicates (all of them, for columns without statistics).
+
+    Args:
+        metadata (pq.FileMetaData): Metadata of the parquet file.
+        filters (dict): Values of columns that the rows must have.
+
+    Returns:
+        list[int]: Indices of the row groups.
+    """
+    names = metadata.schema.names
+    row_groups = []
+    for index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(index)
+        for column, value in filters.items():
+            statistics = row_group.column(names.index(column)).statistics
+            if (
+                statistics is not None
+                and statistics.has_min_max
+                and not statistics.min <= value <= statistics.max
+            ):
+                break
+        else:
+            row_groups.append(index)
+    return row_groups
+
+
+def _filter_table(table: pa.Table, filters: dict) -> pa.Table:
+    mask = None
+    for column, value in filters.items():
+        equal = pc.equal(table[column], value)
+        mask = equal if mask is None else pc.and_(mask, equal)
+    filtered = table.filter(mask)
+    # Without rows, the filtered columns lose their dictionaries (categories)
+    return filtered if filtered.num_rows else table.slice(0, 0)
+
+
+def _empty_parquet(parquet_file: pq.ParquetFile, columns: list[str]) -> pa.Table:
+    # Every row group has the complete dictionaries (categories) of the file
+    return parquet_file.read_row_group(0, columns=columns).slice(0, 0)
+
+
+def _read_parquet(parquet_file: pq.ParquetFile, columns: list[str], filters):
+    if not filters:
+        return parquet_file.read(columns=columns).to_pandas()
+    read_columns = [*columns, *(c for c in filters if c not in columns)]
+    row_groups = matching_row_groups(parquet_file.metadata, filters)
+    if row_groups:
+        table = parquet_file.read_row_groups(row_groups, columns=read_columns)
+    else:
+        table = _empty_parquet(parquet_file, read_columns)
+    return _filter_table(table, filters).select(columns).to_pandas()
+
+
+def _read_mapped(table: pa.Table, columns: list[str], filters):
+    if filters:
+        table = _filter_table(table, filters)
+    return ipc_to_pandas(table.select(columns))
+
+
+def open_parquet_source(path: str | Path) -> SourceTable:
+    """Open a parquet file: columns are decoded when they are read."""
+    signature = file_signature(path)
+    parquet_file = pq.ParquetFile(path)
+    return SourceTable(
+        parquet_file.schema_arrow.names,
+        lambda columns, filters: _read_parquet(parquet_file, columns, filters),
+        lambda columns: _empty_parquet(parquet_file, columns).to_pandas(),
+        path,
+        signature,
+    )
+
+
+def open_mapped_source(path: str | Path) -> SourceTable:
+    """Open the memory-mapped IPC copy of a parquet file (see `loaders.ipc`)."""
+    signature = file_signature(path)
+    table = open_parquet_mapped(path)
+    return SourceTable(
+        table.column_names,
+        lambda columns, filters: _read_mapped(table, columns, filters),
+        lambda columns: ipc_to_pandas(table.select(columns).slice(0, 0)),
+        path,
+        signature,
+    )
+
+
+SOURCE_FORMATS = {"parquet": open_parquet_source, "arrow": open_mapped_source}
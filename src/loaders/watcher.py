@@ -0,0 +1,125 @@
+"""
+Hot reload of the data while the app runs.
+
+`DataWatcher` polls the source files of the datasets (`DATA_FILES`) and the
+selector lists. When they change, and once they stop changing (so files being
+written by the pipeline are not read half-way), it loads a new `DataSnapshot`
+in its background thread. The current snapshot keeps serving every session
+while the new one loads: `on_reload` is only called with a complete snapshot,
+and the swap is a single reference assignment.
+
+A snapshot is only loaded when the data version (the hash of the contents of
+the files) changes: files written again with the same contents are ignored.
+When only the selector lists change, the new lists are read, and the new
+snapshot keeps the data of the current one.
+If the new files can't be loaded, the current snapshot is kept and the watcher
+tries again at the next change.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from loaders.datasets import DATA_FILES, compute_data_version
+from loaders.snapshot import DataSnapshot, load_lists, load_snapshot
+
+logger = logging.getLogger(__name__)
+
+PARAMETER_FILES = ["list_olympiads.yml", "list_committees.yml"]
+
+
+class DataWatcher:
+    """Background thread that reloads the data when the files change."""
+
+    def __init__(
+        self,
+        snapshot: DataSnapshot,
+        on_reload: Callable[[DataSnapshot, DataSnapshot], None],
+        data_dir: str | Path = "./data",
+        parameters_dir: str | Path = "./parameters",
+        interval: float = 2.0,
+    ):
+        """
+        Args:
+            snapshot (DataSnapshot): The snapshot of the current files.
+            on_reload (Callable): Called with the new and the previous
+                snapshots, from the watcher thread, after each reload.
+            data_dir (str | Path): Directory with the parquet files.
+            parameters_dir (str | Path): Directory with the selector lists.
+            interval (float): Seconds between two checks of the files.
+        """
+        self.snapshot = snapshot
+        self.on_reload = on_reload
+        self.data_dir = Path(data_dir)
+        self.parameters_dir = Path(parameters_dir)
+        self.interval = interval
+        self._signature = self._file_signature()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="data-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def check(self) -> bool:
+        """
+        Check the files once, and reload the data if they changed and are
+        stable since the previous check. Return whether the data was reloaded.
+        """
+        signature = self._file_signature()
+        if signature == self._signature:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # Changed since the last check: wait until the files are stable
+            self._pending = signature
+            return False
+        self._pending = None
+        self._signature = signature
+
+        try:
+            if compute_data_version(self.data_dir) != self.snapshot.data_version:
+                snapshot = load_snapshot(self.data_dir, self.parameters_dir)
+            else:
+                lists = load_lists(self.parameters_dir)
+                if lists == self.snapshot.lists():
+                    return False
+                snapshot = self.snapshot.with_lists(lists)
+        except Exception:
+            logger.exception("Could not load the new data, keeping the current one")
+            return False
+
+        previous, self.snapshot = self.snapshot, snapshot
+        logger.info("Reloaded the data, version %s", snapshot.data_version)
+        self.on_reload(snapshot, previous)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Data reload failed")
+
+    def _file_signature(self) -> tuple:
+        """Modification times and sizes of the watched files."""
+        paths = [self.data_dir / name for name in sorted(DATA_FILES.values())]
+        paths += [self.parameters_dir / name for name in PARAMETER_FILES]
+        signature = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
@@ -1,18 +1,18 @@
-import pandas as pd
+import os
+
 import taipy.gui.builder as tgb
 from taipy.gui import Gui
 
-from algorithms import (
-    MedalMap,
-    MedalsByCountry,
-    MedalsByOlympicAndDiscipline,
-    MedalsByOlympics,
-    MedalsBySeason,
-    SunburstByGender,
-    yaml_to_list,
+from cache import SQLiteFigureStore, figure_cache, load_bundle
+from callbacks import (
+    apply_data_snapshot,
+    init_session,
+    on_selector_medals_by_committee,
 )
-from callbacks import init_total_medals
 from context import MedalTotals
+from loaders import SHARED_VARIABLES, DataWatcher, load_snapshot
+from page_utils.async_charts import PLACEHOLDER_FIGURE, refresh_charts
+from page_utils.view_state import restore_view, state_variable_name
 from pages.all_time_medals import all_time_medals
 from pages.medals_by_committee import committee_medals
 
@@ -24,76 +24,149 @@ with tgb.Page() as root_page:
     tgb.navbar()
 
 
-def on_init(state):
-    with state as s:
-        init_total_medals(s)
-
-
-if __name__ == "__main__":
-    # Variables for both pages
-
-    df_olympic_medals = pd.read_parquet("./data/olympic_medals.parquet")
-    df_grouped_medals_olympics = pd.read_parquet(
-        "./data/grouped_medals_olympiads.parquet"
-    )
-
-    list_seasons = ["All", "summer", "winter"]
-    list_medal_types = ["All", "Gold", "Silver", "Bronze"]
-
-    # Variables for all_time_medals
-    df_olympic_cities = pd.read_parquet("./data/olympic_cities.parquet")
-    df_olympic_cities_simplified = pd.read_parquet(
-        "./data/olympic_cities_simplified.parquet"
-    )
-    df_medals_by_olympiad = pd.read_parquet("./data/medals_by_olympiad.parquet")
-
-    medal_map = MedalMap(df_olympic_cities)
-    sunburnst_by_gender = SunburstByGender(df_olympic_medals)
-    medals_by_olimpics = MedalsByOlympics(df_grouped_medals_olympics)
-    medals_by_season = MedalsBySeason(df_medals_by_olympiad)
+data_watcher = None
 
-    latest_olympiad = df_olympic_medals.loc[
-        df_olympic_medals["Olympic_year"].idxmax(), "Olympiad"
-    ]
 
-    medal_totals = MedalTotals()
-
-    list_olympiads = yaml_to_list("./parameters/list_olympiads.yml")
+def on_init(state):
+    with state as s:
+        if data_watcher is not None:
+            # Sessions opened after a data reload start with the new data
+            apply_data_snapshot(s, data_watcher.snapshot)
+        else:
+            init_session(s)
 
-    list_seasons_map = ["All", "summer", "winter"]
-    season = "All"
-    selected_olympiad = "All"
-    selected_season_map = "All"
-    selected_medal_color = "All"
-    selected_olympiad_for_sunburst = "All"
 
-    # Variables for medals_by_committe
-    df_total_medals_by_olympiad_and_committee = pd.read_parquet(
-        "./data/total_medals_by_olympiad_and_committee.parquet"
-    )
-    medals_by_country = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
-    medals_by_olympic_and_discipline = MedalsByOlympicAndDiscipline(df_olympic_medals)
-
-    list_committees = yaml_to_list("./parameters/list_committees.yml")
-    committees = ["France", "United States"]
-    committee_detail = "France"
-    medal_type = "All"
-    display_percent = "Total"
-
-    medal_details = MedalTotals()
-
-    pages = {
-        "/": root_page,
-        "all_time_medals": all_time_medals,
-        "medals_awarded_to_committees": committee_medals,
-    }
-    gui_multi_pages = Gui(pages=pages)
-    gui_multi_pages.run(
-        title="Olympic medals 🥇",
-        dark_mode=False,
-        favicon="./img/favicon.ico",
-        use_reloader=True,
+def on_navigate(state, page_name, params):
+    with state as s:
+        # The view of the page from its URL (see page_utils.view_state)
+        restored = restore_view(s, page_name, params)
+        if not s.session_initialized:
+            # Session opened again in this process (after a restart or a
+            # failover): on_init ran in the previous process only
+            init_session(s)
+        else:
+            if "committee_detail" in restored:
+                on_selector_medals_by_committee(s)
+            refresh_charts(s, restored)
+    return page_name
+
+
+def on_change(state, var_name, value):
+    var_name = state_variable_name(var_name)
+    if var_name == "committee_detail":
+        on_selector_medals_by_committee(state)
+    refresh_charts(state, {var_name})
+
+
+def figure_stores(data_version):
+    """Return the figure stores of a data version, to add to `figure_cache`."""
+    stores = []
+    # Figures rendered ahead of time (see cache.bundle), if built for this data
+    figure_bundle = load_bundle("./bundles", data_version)
+    if figure_bundle is not None:
+        stores.append(figure_bundle)
+
+    # Figures computed by the other worker processes of this node (set
+    # FIGURE_CACHE_DB to an empty string to disable it)
+    figure_cache_db = os.environ.get("FIGURE_CACHE_DB", "./figure_cache/figures.db")
+    if figure_cache_db:
+        stores.append(SQLiteFigureStore(figure_cache_db, data_version))
+    return stores
+
+
+def on_data_reload(snapshot, previous):
+    """Swap the new data in, for every session (called by `data_watcher`)."""
+    # The figures stay valid when only the selector lists changed
+    if snapshot.data_version != previous.data_version:
+        figure_cache.set_stores(figure_stores(snapshot.data_version))
+        figure_cache.discard_namespace(previous.data_version)
+    gui_multi_pages.broadcast_callback(apply_data_snapshot, [snapshot])
+
+
+snapshot = load_snapshot("./data", "./parameters")
+figure_cache.set_stores(figure_stores(snapshot.data_version))
+
+# Reload the data when the files change (set DATA_RELOAD_INTERVAL to 0 to
+# disable it)
+reload_interval = float(os.environ.get("DATA_RELOAD_INTERVAL", 2))
+if reload_interval > 0:
+    data_watcher = DataWatcher(
+        snapshot, on_data_reload, "./data", "./parameters", reload_interval
     )
 
-# gui_multi_pages.run(run_server=False, title="Olympic medals 🥇")
-# flask_app = gui_multi_pages.get_flask_app()
+# Variables for both pages
+data_version = snapshot.data_version
+datasets = snapshot.datasets
+charts = snapshot.charts
+
+df_olympic_medals = datasets.olympic_medals
+df_grouped_medals_olympics = datasets.grouped_medals_olympiads
+
+list_seasons = ["All", "summer", "winter"]
+list_medal_types = ["All", "Gold", "Silver", "Bronze"]
+
+# Variables for all_time_medals
+df_olympic_cities_simplified = datasets.olympic_cities_simplified
+
+medal_map = charts.medal_map
+sunburnst_by_gender = charts.sunburnst_by_gender
+medals_by_olimpics = charts.medals_by_olimpics
+medals_by_season = charts.medals_by_season
+
+latest_olympiad = snapshot.latest_olympiad
+
+# Set by init_session: the cards and charts of the session are computed
+session_initialized = False
+medal_totals = MedalTotals()
+
+list_olympiads = snapshot.list_olympiads
+
+list_seasons_map = ["All", "summer", "winter"]
+season = "All"
+selected_olympiad = "All"
+selected_season_map = "All"
+selected_medal_color = "All"
+selected_olympiad_for_sunburst = "All"
+sunburst_medals = PLACEHOLDER_FIGURE
+
+# Variables for medals_by_committe
+medals_by_country = charts.medals_by_country
+medals_by_olympic_and_discipline = charts.medals_by_olympic_and_discipline
+
+list_committees = snapshot.list_committees
+committees = ["France", "United States"]
+committee_detail = "France"
+medal_type = "All"
+list_display_percent = ["Total", "Percentage"]
+display_percent = "Total"
+medals_by_country_summer = PLACEHOLDER_FIGURE
+medals_by_country_winter = PLACEHOLDER_FIGURE
+
+medal_details = MedalTotals()
+medals_grid_summer = PLACEHOLDER_FIGURE
+medals_grid_winter = PLACEHOLDER_FIGURE
+
+pages = {
+    "/": root_page,
+    "all_time_medals": all_time_medals,
+    "medals_awarded_to_committees": committee_medals,
+}
+# The data and the chart objects are read-only: a single copy, shared by
+# all the sessions (the sessions hold only their selector values)
+Gui.add_shared_variables(*SHARED_VARIABLES)
+gui_multi_pages = Gui(pages=pages)
+if data_watcher is not None:
+    data_watcher.start()
+
+run_options = {
+    "title": "Olympic medals 🥇",
+    "dark_mode": False,
+    "favicon": "./img/favicon.ico",
+}
+if __name__ == "__main__":
+    # Development server
+    gui_multi_pages.run(use_reloader=True, **run_options)
+else:
+    # Flask app of the production server, run by gunicorn in threads (see
+    # serve.py)
+    app = gui_multi_pages.run(run_server=False, async_mode="threading", **run_options)
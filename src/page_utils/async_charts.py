@@ -0,0 +1,183 @@
+"""
+Charts of the pages whose figure can take long to compute, rendered in the
+background.
+
+The figures of `STATE_CHARTS` are state variables of the sessions, bound to
+their chart (`figure="{medals_grid_summer}"`), and set by `refresh_charts` when
+the selectors they depend on change. The summer and winter charts of the
+committee page are set together, from a single computation of both figures
+(`SeasonFigures`).
+
+A heavy figure (for example the "All" sunburst, or the line charts of many
+committees) that isn't in the memory of `figure_cache` yet is computed by a
+long-running callback of Taipy, in its own thread: the chart shows
+`PLACEHOLDER_FIGURE` right away, and the session keeps handling its events
+while the figure is computed. The figure is shown when it is ready, unless the
+selection of the session (or the data) changed since: the figure of the new
+selection is on its way. If its computation fails, the error is logged and the
+chart shows `ERROR_FIGURE` instead of the placeholder.
+
+Other figures are computed in the callback, like the charts bound to a lambda.
+Set the `ASYNC_CHARTS` environment variable to 0 to compute all of them there.
+"""
+
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import plotly.graph_objects as go
+from taipy.gui import invoke_long_callback
+
+from cache import as_payload_figure, figure_cache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+ASYNC_CHARTS = os.environ.get("ASYNC_CHARTS", "1") != "0"
+# Line charts with more committees than this are computed in the background
+MANY_COMMITTEES = 4
+
+
+def _message_figure(text: str):
+    """Empty figure with a message in its center."""
+    return as_payload_figure(
+        go.Figure(
+            layout=dict(
+                xaxis=dict(visible=False),
+                yaxis=dict(visible=False),
+                annotations=[
+                    dict(
+                        text=text,
+                        xref="paper",
+                        yref="paper",
+                        showarrow=False,
+                        font=dict(size=16),
+                    )
+                ],
+            )
+        )
+    )
+
+
+PLACEHOLDER_FIGURE = _message_figure("Loading…")
+ERROR_FIGURE = _message_figure("This chart could not be computed")
+
+
+def _always(*arguments) -> bool:
+    return True
+
+
+def _all_olympiads(olympiad) -> bool:
+    return olympiad == "All"
+
+
+def _many_committees(committees, *arguments) -> bool:
+    return len(committees) > MANY_COMMITTEES
+
+
+@dataclass(frozen=True)
+class StateChart:
+    """Figure state variables, computed by a method of a chart object."""
+
+    # State variables bound to the charts: one per figure returned by the
+    # method (a single figure, or a tuple such as `SeasonFigures`)
+    figures: tuple[str, ...]
+    chart: str  # State variable with the chart object
+    method: str
+    arguments: tuple[str, ...]  # State variables passed to the method
+    is_heavy: Callable[..., bool] = _always  # Called with the arguments
+
+
+STATE_CHARTS = (
+    StateChart(
+        ("medals_grid_summer", "medals_grid_winter"),
+        "medals_by_olympic_and_discipline",
+        "plot_medals_grids",
+        ("committee_detail",),
+    ),
+    StateChart(
+        ("sunburst_medals",),
+        "sunburnst_by_gender",
+        "create_sunburst_medals",
+        ("selected_olympiad_for_sunburst",),
+        is_heavy=_all_olympiads,
+    ),
+    StateChart(
+        ("medals_by_country_summer", "medals_by_country_winter"),
+        "medals_by_country",
+        "create_medals_by_country_seasons",
+        ("committees", "medal_type", "display_percent"),
+        is_heavy=_many_committees,
+    ),
+)
+
+
+def refresh_charts(state, changed: set[str] | None = None) -> None:
+    """
+    Compute the figures of the charts that depend on changed state variables.
+
+    Args:
+        state (State): The state of the session.
+        changed (set[str], optional): Names of the changed state variables.
+            Defaults to None, to compute all the figures (for a new session or
+            new data).
+    """
+    with state as s:
+        for chart in STATE_CHARTS:
+            if changed is None or not changed.isdisjoint(chart.arguments):
+                _refresh_chart(s, chart)
+
+
+def _refresh_chart(state, chart: StateChart) -> None:
+    chart_object = getattr(state, chart.chart)
+    arguments = [getattr(state, name) for name in chart.arguments]
+    if (
+        not ASYNC_CHARTS
+        or not chart.is_heavy(*arguments)
+        or make_cache_key(chart_object, chart.method, *arguments) in figure_cache
+    ):
+        _set_figures(state, chart, getattr(chart_object, chart.method)(*arguments))
+        return
+
+    for name in chart.figures:
+        setattr(state, name, PLACEHOLDER_FIGURE)
+    invoke_long_callback(
+        state,
+        _compute_figure,
+        [chart_object, chart.method, arguments],
+        _on_figure_ready,
+        [chart, arguments, state.data_version],
+    )
+
+
+def _compute_figure(chart_object, method: str, arguments: list):
+    # Runs in its own thread: no access to the state
+    try:
+        return getattr(chart_object, method)(*arguments)
+    except Exception:
+        # Taipy only tells the status callback that the computation failed
+        logger.exception("Could not compute %s%s", method, tuple(arguments))
+        raise
+
+
+def _on_figure_ready(state, status, chart, arguments, data_version, figure) -> None:
+    """Show a figure computed in the background, if it is still the figure of
+    the selection of the session, or `ERROR_FIGURE` if its computation failed
+    (the error is logged by `_compute_figure`)."""
+    with state as s:
+        if (
+            s.data_version == data_version
+            and [getattr(s, name) for name in chart.arguments] == arguments
+        ):
+            if status is True:
+                _set_figures(s, chart, figure)
+            else:
+                for name in chart.figures:
+                    setattr(s, name, ERROR_FIGURE)
+
+
+def _set_figures(state, chart: StateChart, figures) -> None:
+    if not isinstance(figures, tuple):
+        figures = (figures,)
+    for name, figure in zip(chart.figures, figures, strict=True):
+        setattr(state, name, figure)
@@ -0,0 +1,147 @@
+"""
+View state of the pages, in the query string of their URL.
+
+The values of the selectors of each page (`VIEW_STATE`) can be given in the
+query string of the URL of the page, for example
+`/medals_awarded_to_committees?committees=France|Norway&medal_type=Gold&...`
+(see `encode_view`). `restore_view` sets the selectors from the URL when the
+page is rendered (from the `on_navigate` callback of the app, that receives the
+query parameters of the page).
+
+The URL isn't updated when a selector changes: Taipy can only change the URL
+by navigating (`navigate` has no option to replace the current entry of the
+browser history), which would render the page again and add an entry to the
+history on every selection.
+
+This gives failover recovery: a page reload, a shared link, or a session
+opened again on another process of the app (after a restart or a failover)
+shows the view of its URL. It doesn't remove the need for sticky sessions: a
+live session belongs to the process that opened it, and its requests and
+WebSocket connection must keep reaching that process (see `serve.py`).
+
+The values of selectors with several values are joined with `|`. Values that
+aren't in the list of values of their selector are ignored.
+"""
+
+import re
+from dataclasses import dataclass
+
+LIST_SEPARATOR = "|"
+# Name of a state variable bound in a page of another module than the Gui
+_BOUND_NAME = re.compile(r"tpec_TpExPr_(?P<name>\w+?)_TPMDL_\d+")
+
+
+@dataclass(frozen=True)
+class ViewVariable:
+    """A state variable set by a selector, in the URL of its page."""
+
+    name: str
+    lov: str  # State variable with the values of the selector
+    multiple: bool = False
+
+
+VIEW_STATE = {
+    "all_time_medals": (
+        ViewVariable("season", "list_seasons"),
+        ViewVariable("selected_olympiad", "list_olympiads"),
+        ViewVariable("selected_season_map", "list_seasons_map"),
+        ViewVariable("selected_medal_color", "list_medal_types"),
+        ViewVariable("selected_olympiad_for_sunburst", "list_olympiads"),
+    ),
+    "medals_awarded_to_committees": (
+        ViewVariable("committees", "list_committees", multiple=True),
+        ViewVariable("medal_type", "list_medal_types"),
+        ViewVariable("display_percent", "list_display_percent"),
+        ViewVariable("committee_detail", "list_committees"),
+    ),
+}
+
+
+def encode_view(page_name: str, values: dict) -> dict[str, str]:
+    """
+    Query parameters of the view of a page (for a link to the view).
+
+    Args:
+        page_name (str): A page of `VIEW_STATE`.
+        values (dict): Values of the view variables of the page, by name.
+
+    Returns:
+        dict[str, str]: The query parameters.
+    """
+    params = {}
+    for variable in VIEW_STATE[page_name]:
+        value = values[variable.name]
+        params[variable.name] = (
+            LIST_SEPARATOR.join(value) if variable.multiple else str(value)
+        )
+    return params
+
+
+def decode_view(page_name: str, params: dict, lovs: dict) -> dict:
+    """
+    View of a page, from the query parameters of its URL.
+
+    Args:
+        page_name (str): A page (pages without view variables have no view).
+        params (dict): The query parameters.
+        lovs (dict): Values of the selectors, by name of their state variable.
+
+    Returns:
+        dict: Values of the view variables in the parameters, by name, without
+        the values that aren't in the values of their selector.
+    """
+    view = {}
+    for variable in VIEW_STATE.get(page_name, ()):
+        param = params.get(variable.name)
+        if param is None:
+            continue
+        lov = set(lovs[variable.lov])
+        if variable.multiple:
+            values = param.split(LIST_SEPARATOR) if param else []
+            view[variable.name] = [value for value in values if value in lov]
+        elif param in lov:
+            view[variable.name] = param
+    return view
+
+
+def state_variable_name(var_name: str) -> str:
+    """
+    Name of the state variable changed by a control.
+
+    The `on_change` callback of the app receives the name bound by Taipy
+    (`tpec_TpExPr_<name>_TPMDL_<module>`) when the page of the control is
+    defined in another module than the Gui, like the pages of `pages`.
+
+    Args:
+        var_name (str): The name received by `on_change`.
+
+    Returns:
+        str: The name of the state variable.
+    """
+    match = _BOUND_NAME.fullmatch(var_name)
+    return match["name"] if match else var_name
+
+
+def restore_view(state, page_name: str, params: dict) -> set[str]:
+    """
+    Set the view variables of a page from the query parameters of its URL.
+
+    Args:
+        state (State): The state of the session.
+        page_name (str): The rendered page.
+        params (dict): The query parameters of the page.
+
+    Returns:
+        set[str]: Names of the variables whose value changed.
+    """
+    variables = VIEW_STATE.get(page_name)
+    if not variables or not params:
+        return set()
+    lovs = {variable.lov: getattr(state, variable.lov) for variable in variables}
+    changed = set()
+    with state as s:
+        for name, value in decode_view(page_name, params, lovs).items():
+            if getattr(s, name) != value:
+                setattr(s, name, value)
+                changed.add(name)
+    return changed
@@ -65,13 +65,8 @@ with tgb.Page() as all_time_medals:
                 lov="{list_olympiads}",
                 label="Select Olympiad",
             )
-            tgb.chart(
-                figure=lambda sunburnst_by_gender, selected_olympiad_for_sunburst: (
-                    sunburnst_by_gender.create_sunburst_medals(
-                        selected_olympiad_for_sunburst
-                    )
-                )
-            )
+            # Computed in the background (see page_utils.async_charts)
+            tgb.chart(figure="{sunburst_medals}")
 
     with tgb.expandable(expanded=False, title="Total Medals by Event"):
         tgb.table("{df_olympic_cities_simplified}", filter=True, page_size=20)
@@ -1,6 +1,5 @@
 import taipy.gui.builder as tgb
 
-from callbacks import on_selector_medals_by_committee
 from page_utils import builder_extension as tgb_ext
 
 with tgb.Page() as committee_medals:
@@ -22,33 +21,17 @@ with tgb.Page() as committee_medals:
         with tgb.part():
             tgb.toggle(
                 value="{display_percent}",
-                lov=["Total", "Percentage"],
+                lov="{list_display_percent}",
                 label="Medal Display: ",
             )
 
+    # The summer and winter figures are computed together, in the background
+    # (see page_utils.async_charts)
     with tgb.layout("1 1"):
         with tgb.part():
-            tgb.chart(
-                figure=lambda medals_by_country,
-                committees,
-                medal_type,
-                display_percent: (
-                    medals_by_country.create_medals_by_country_summer(
-                        committees, medal_type, display_percent
-                    )
-                )
-            )
+            tgb.chart(figure="{medals_by_country_summer}")
         with tgb.part():
-            tgb.chart(
-                figure=lambda medals_by_country,
-                committees,
-                medal_type,
-                display_percent: (
-                    medals_by_country.create_medals_by_country_winter(
-                        committees, medal_type, display_percent
-                    )
-                )
-            )
+            tgb.chart(figure="{medals_by_country_winter}")
 
     tgb.text("## Detailed information by committee", mode="md")
     tgb.text(
@@ -60,24 +43,12 @@ with tgb.Page() as committee_medals:
             value="{committee_detail}",
             lov="{list_committees}",
             label="Select committee for detail",
-            on_change=on_selector_medals_by_committee,
         )
         tgb_ext.medal_cards("medal_details")
 
+    # Computed together, like the line charts
     with tgb.layout("1 1"):
         with tgb.part():
-            tgb.chart(
-                figure=lambda medals_by_olympic_and_discipline, committee_detail: (
-                    medals_by_olympic_and_discipline.plot_medals_grid_summer(
-                        committee_detail
-                    )
-                )
-            )
+            tgb.chart(figure="{medals_grid_summer}")
         with tgb.part():
-            tgb.chart(
-                figure=lambda medals_by_olympic_and_discipline, committee_detail: (
-                    medals_by_olympic_and_discipline.plot_medals_grid_winter(
-                        committee_detail
-                    )
-                )
-            )
+            tgb.chart(figure="{medals_grid_winter}")
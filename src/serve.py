@@ -0,0 +1,135 @@
+"""
+Production server of the app.
+
+`python main.py` runs the development server of Taipy. This runs the app with
+gunicorn (install it with `uv sync --extra production`), in `--workers`
+processes of `--threads` threads each.
+
+Taipy keeps the state of a session in the process that opened it, and the
+WebSocket of a session (Socket.IO) starts with HTTP long-polling requests: all
+the requests of a session must reach the same process. gunicorn spreads the
+connections over its workers, without sticky sessions, so each process is a
+gunicorn server with a single worker (see `gunicorn.conf.py`), on its own port:
+`--port`, `--port` + 1, ... A reverse proxy in front of them sends all the
+requests of a client to the same port (for example nginx with `ip_hash`, see
+the README). With a single worker, the server listens on `--port` directly.
+
+SIGTERM and SIGINT stop the servers gracefully: they stop accepting
+connections, and give the requests in progress `--graceful-timeout` seconds to
+finish. If a server stops on its own, the others are stopped too.
+
+Usage (from the `src` directory):
+
+    python serve.py [--workers 4] [--threads 32] [--host 0.0.0.0] [--port 5000]
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).parent
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Options of the server, with defaults from the environment variables."""
+    parser = argparse.ArgumentParser(description="Run the production server.")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_WORKERS", 1)),
+        help="worker processes, each on its own port (WEB_WORKERS)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.environ.get("WEB_THREADS", 32)),
+        help="threads of each worker process (WEB_THREADS)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.environ.get("GRACEFUL_TIMEOUT", 30)),
+        help="seconds given to the requests in progress on shutdown",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.threads < 1:
+        parser.error("--workers and --threads must be at least 1")
+    return args
+
+
+def server_ports(port: int, workers: int) -> list[int]:
+    """Ports of the worker processes."""
+    return [port + i for i in range(workers)]
+
+
+def gunicorn_command(
+    host: str, port: int, threads: int, graceful_timeout: int
+) -> list[str]:
+    """Command of a gunicorn server with a single worker process."""
+    return [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--config",
+        str(APP_DIR / "gunicorn.conf.py"),
+        "--chdir",
+        str(APP_DIR),
+        "--bind",
+        f"{host}:{port}",
+        "--threads",
+        str(threads),
+        "--graceful-timeout",
+        str(graceful_timeout),
+    ]
+
+
+def serve(args: argparse.Namespace) -> int:
+    """
+    Run the servers until they stop.
+
+    Args:
+        args (argparse.Namespace): Options of the server (see `parse_args`).
+
+    Returns:
+        int: Exit code, 0 after a shutdown requested by a signal, or the exit
+        code of the first server that stopped on its own.
+    """
+    # The servers get the signals from `stop` only: gunicorn stops at once
+    # on SIGINT (Ctrl+C in a terminal), and gracefully on SIGTERM
+    servers = [
+        subprocess.Popen(
+            gunicorn_command(args.host, port, args.threads, args.graceful_timeout),
+            start_new_session=True,
+        )
+        for port in server_ports(args.port, args.workers)
+    ]
+    stopping = False
+
+    def stop(signum=None, frame=None):
+        nonlocal stopping
+        stopping = True
+        for server in servers:
+            if server.poll() is None:
+                server.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    exit_code = 0
+    while any(server.poll() is None for server in servers):
+        stopped = [server for server in servers if server.poll() is not None]
+        if stopped and not stopping:
+            exit_code = stopped[0].returncode or 1
+            stop()
+        time.sleep(0.5)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(serve(parse_args()))
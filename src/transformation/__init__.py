@@ -0,0 +1,4 @@
+from transformation.pipeline import Step as Step
+from transformation.pipeline import StepResult as StepResult
+from transformation.pipeline import run_pipeline as run_pipeline
+from transformation.steps import STEPS as STEPS
@@ -0,0 +1,46 @@
+"""
+Build the datasets and parameter files of the app from the original CSV files.
+
+Only the steps whose code or input files changed since the last build run again.
+
+Usage (from the `src` directory): `python -m transformation [--force]`
+"""
+
+import argparse
+import time
+
+from transformation.pipeline import StepResult, run_pipeline
+from transformation.steps import MANIFEST, STEPS
+
+
+def _print_result(result: StepResult) -> None:
+    status = "built" if result.built else "up to date"
+    print(f"{result.name:<28}{status:>12}{result.seconds:>9.3f}s", flush=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build the datasets of the app.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="run every step, even if up to date"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_pipeline(
+        STEPS,
+        root=args.root,
+        manifest_path=MANIFEST,
+        workers=args.workers,
+        force=args.force,
+        on_result=_print_result,
+    )
+    built = sum(result.built for result in results)
+    print(
+        f"{built} of {len(results)} steps built in {time.perf_counter() - start:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
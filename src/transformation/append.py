@@ -0,0 +1,412 @@
+"""
+Delta append of the medals of new Olympiads.
+
+`append_medals` adds new medal rows (a CSV file with the columns of
+`original_data/olympic_medals.csv`, for Olympiads that are not in the data yet)
+without rebuilding the aggregates: it counts the medals of the new rows only,
+and merges them into the existing files:
+
+- medals_by_olympiad: rows of the new Olympiads, inserted in year order.
+- total_medals_by_olympiad_and_committee: rows of the new Olympiads, and a
+  column of zeros for every new committee.
+- grouped_medals_olympiads: "All" totals updated, blocks of the new Olympiads.
+- list_olympiads.yml and list_committees.yml: new Olympiads and committees.
+
+The medals table is rewritten one row group at a time, with the new rows at the
+end (see `transformation.layout`): it is never loaded in memory as a whole.
+
+The new rows are also appended to the source CSV file, and the manifest of the
+pipeline is updated, so `python -m transformation` finds everything up to date.
+If the append stops midway, the source CSV file no longer matches the manifest,
+and the next pipeline run rebuilds everything. New rows whose Olympiads are
+already in the source CSV file are rejected, so an append retried after a
+failure never adds them twice.
+
+`verify_against_rebuild` rebuilds every output from the source files in a
+temporary directory, and compares them to the appended ones.
+
+Usage (from the `src` directory):
+`python -m transformation.append new_medals.csv [--verify]`
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import yaml
+
+from loaders import aggregates
+from transformation.layout import write_row_groups
+from transformation.pipeline import record_steps, run_pipeline
+from transformation.steps import (
+    MANIFEST,
+    MEDALS,
+    MEDALS_CATEGORY_COLUMNS,
+    MEDALS_CSV,
+    MEDALS_INTEGER_TYPES,
+    MERGED_OLYMPIADS,
+    STEPS,
+    atomic_path,
+    change_column_dtypes,
+    write_parquet,
+)
+
+MEDALS_BY_OLYMPIAD = "data/medals_by_olympiad.parquet"
+TOTAL_MEDALS = "data/total_medals_by_olympiad_and_committee.parquet"
+GROUPED_MEDALS = "data/grouped_medals_olympiads.parquet"
+LIST_OLYMPIADS = "parameters/list_olympiads.yml"
+LIST_COMMITTEES = "parameters/list_committees.yml"
+
+# Steps whose outputs `append_medals` updates
+APPENDED_STEPS = [
+    "convert_medals",
+    "medals_by_olympiad",
+    "create_pivot_total",
+    "grouped_medals_olympiads",
+    "create_lists",
+]
+
+INDEX_COLUMNS = ["Olympic_year", "Olympiad", "Olympic_season"]
+
+
+def append_medals(new_medals_csv: str | Path, root: str | Path = ".") -> list[str]:
+    """
+    Append the medals of new Olympiads, and update the derived files.
+
+    Args:
+        new_medals_csv (str | Path): CSV file with the new medal rows.
+        root (str | Path): Directory of the pipeline (the `src` directory).
+
+    Returns:
+        list[str]: The new Olympiads.
+
+    Raises:
+        ValueError: If the columns of the new rows differ from the source file,
+            or if they have medals of Olympiads already in the data or in the
+            source file.
+    """
+    root = Path(root)
+    source_csv = root / MEDALS_CSV
+    header = pd.read_csv(source_csv, nrows=0).columns
+    df_new = pd.read_csv(new_medals_csv)
+    if set(df_new.columns) != set(header):
+        raise ValueError(
+            f"Columns of the new medals {list(df_new.columns)} "
+            f"differ from the source file: {list(header)}"
+        )
+    df_raw = df_new[header]
+
+    df_new = _clean_medals(df_raw)
+    olympiads = set(df_new["Olympiad"].unique())
+    categories = _medals_categories(root / MEDALS)
+    overlap = sorted(olympiads & set(categories["Olympiad"]))
+    if overlap:
+        raise ValueError(f"Olympiads already in the data: {overlap}")
+    # Left by an append that stopped midway
+    overlap = sorted(olympiads & _csv_olympiads(source_csv))
+    if overlap:
+        raise ValueError(
+            f"Olympiads already in the source file: {overlap} "
+            "(run `python -m transformation` to rebuild the data)"
+        )
+
+    for column, values in categories.items():
+        values.update(df_new[column].dropna().unique())
+    dtypes = df_new.dtypes.copy()
+    for column, values in categories.items():
+        dtypes[column] = pd.CategoricalDtype(sorted(values))
+    df_new = df_new.astype(dtypes)
+    new_counts = aggregates.count_medals(df_new)
+
+    # Source file first: if the append stops midway, the pipeline rebuilds
+    _append_csv(source_csv, df_raw)
+    _append_medals_table(root / MEDALS, df_new)
+    _append_medals_by_olympiad(root / MEDALS_BY_OLYMPIAD, new_counts, dtypes)
+    _append_total_medals(root / TOTAL_MEDALS, new_counts, dtypes)
+    _append_grouped_medals(root / GROUPED_MEDALS, new_counts, dtypes)
+    new_olympiads = list(df_new["Olympiad"].unique())
+    _append_lists(root, new_olympiads, list(df_new["Committee"].unique()))
+
+    record_steps([s for s in STEPS if s.name in APPENDED_STEPS], root, MANIFEST)
+    return new_olympiads
+
+
+def verify_against_rebuild(root: str | Path = ".") -> list[str]:
+    """
+    Rebuild every output from the source files, and compare them.
+
+    Args:
+        root (str | Path): Directory of the pipeline (the `src` directory).
+
+    Returns:
+        list[str]: The outputs that differ from the rebuilt ones.
+    """
+    root = Path(root)
+    different = []
+    with tempfile.TemporaryDirectory() as directory:
+        rebuild_root = Path(directory)
+        for step in STEPS:
+            for path in step.inputs:
+                if not (root / path).exists():
+                    continue
+                (rebuild_root / path).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(root / path, rebuild_root / path)
+        # Without a manifest, every step runs
+        run_pipeline(STEPS, root=rebuild_root)
+
+        for step in STEPS:
+            for path in step.outputs:
+                if not _same_output(root / path, rebuild_root / path):
+                    different.append(path)
+    return different
+
+
+def _append_csv(path: Path, df: pd.DataFrame) -> None:
+    """Append rows to a CSV file, or leave it unchanged if writing them fails."""
+    size = path.stat().st_size
+    with path.open("rb") as file:
+        file.seek(-1, 2)
+        ends_with_newline = file.read(1) == b"\n"
+    try:
+        with path.open("a", encoding="utf-8", newline="") as file:
+            if not ends_with_newline:
+                file.write("\n")
+            df.to_csv(file, header=False, index=False)
+    except BaseException:
+        with path.open("r+b") as file:
+            file.truncate(size)
+        raise
+
+
+def _csv_olympiads(path: Path) -> set[str]:
+    """Olympiads of the source CSV file (merged like the `convert_medals` step),
+    read in batches."""
+    olympiads = set()
+    reader = pa_csv.open_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=["Olympiad"], column_types={"Olympiad": pa.string()}
+        ),
+    )
+    for batch in reader:
+        olympiads.update(pc.unique(batch["Olympiad"]).drop_null().to_pylist())
+    return {MERGED_OLYMPIADS.get(olympiad, olympiad) for olympiad in olympiads}
+
+
+def _medals_categories(path: Path) -> dict[str, set[str]]:
+    """Values of the categorical columns of the medals table, read one row
+    group at a time."""
+    parquet_file = pq.ParquetFile(path)
+    columns = [
+        field.name
+        for field in parquet_file.schema_arrow
+        if pa.types.is_dictionary(field.type)
+    ]
+    categories = {column: set() for column in columns}
+    for index in range(parquet_file.num_row_groups):
+        row_group = parquet_file.read_row_group(index, columns=columns)
+        for column in columns:
+            for chunk in row_group[column].chunks:
+                values = pc.unique(chunk).dictionary_decode().drop_null()
+                categories[column].update(values.to_pylist())
+    return categories
+
+
+def _append_medals_table(path: Path, df_new: pd.DataFrame) -> None:
+    """
+    Rewrite the medals table with the new rows at the end, one row group at a
+    time, with the categories of `df_new` (a superset of the existing ones).
+    """
+    parquet_file = pq.ParquetFile(path)
+    categories = {
+        column: pa.array(df_new[column].cat.categories, type=pa.string())
+        for column in df_new.columns
+        if isinstance(df_new[column].dtype, pd.CategoricalDtype)
+    }
+    schema = pa.schema(
+        [
+            pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+            if field.name in categories
+            else field
+            for field in parquet_file.schema_arrow
+        ]
+    )
+
+    def tables():
+        for index in range(parquet_file.num_row_groups):
+            row_group = parquet_file.read_row_group(index)
+            yield _with_categories(row_group, schema, categories)
+        new_table = pa.Table.from_pandas(df_new, preserve_index=False)
+        yield _with_categories(new_table, schema, categories)
+
+    with atomic_path(path) as temporary_path:
+        write_row_groups(tables(), temporary_path, schema)
+
+
+def _with_categories(
+    table: pa.Table, schema: pa.Schema, categories: dict[str, pa.Array]
+) -> pa.Table:
+    """Cast a table to `schema`, with its categorical columns encoded as
+    `categories`."""
+    columns = []
+    for field in schema:
+        column = table[field.name].combine_chunks()
+        if field.name in categories:
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            indices = pc.index_in(column, value_set=categories[field.name])
+            column = pa.DictionaryArray.from_arrays(
+                indices.cast(pa.int32()), categories[field.name]
+            )
+        columns.append(column.cast(field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _clean_medals(df_medals: pd.DataFrame) -> pd.DataFrame:
+    """Same cleaning as the `convert_medals` step."""
+    df_medals = df_medals.copy()
+    df_medals["Olympiad"] = df_medals["Olympiad"].replace(MERGED_OLYMPIADS)
+    df_medals = change_column_dtypes(df_medals, "category", MEDALS_CATEGORY_COLUMNS)
+    df_medals = df_medals.astype(MEDALS_INTEGER_TYPES)
+    return change_column_dtypes(df_medals, "str", ["Winner"])
+
+
+def _with_dtypes(df: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """Set the categorical columns of `df` to the dtypes of the medals table."""
+    return df.astype(
+        {
+            column: dtypes[column]
+            for column in df.columns
+            if column in dtypes.index
+            and isinstance(df[column].dtype, pd.CategoricalDtype)
+        }
+    )
+
+
+def _sort_by_year(df: pd.DataFrame, *columns: str) -> pd.DataFrame:
+    """Sort by year, then by the codes of categorical `columns`, like the
+    aggregates of `loaders.aggregates`."""
+    keys = [df[column].cat.codes.to_numpy() for column in reversed(columns)]
+    order = np.lexsort((*keys, df["Olympic_year"].to_numpy()))
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _append_medals_by_olympiad(
+    path: Path, new_counts: aggregates.MedalCounts, dtypes: pd.Series
+) -> None:
+    df_old = _with_dtypes(pd.read_parquet(path), dtypes)
+    df_new = aggregates.medals_by_olympiad(new_counts)
+    df = pd.concat([df_old, df_new], ignore_index=True)
+    write_parquet(_sort_by_year(df, "Medal_type", "Olympiad"), path)
+
+
+def _append_total_medals(
+    path: Path, new_counts: aggregates.MedalCounts, dtypes: pd.Series
+) -> None:
+    df_old = _with_dtypes(pd.read_parquet(path), dtypes)
+    df_new = aggregates.total_medals_by_olympiad_and_committee(new_counts)
+    committees = sorted(
+        {*df_old.columns, *df_new.columns}
+        - {*INDEX_COLUMNS, "Total_medals", "Medal_type"}
+    )
+    columns = [*INDEX_COLUMNS, *committees, "Total_medals", "Medal_type"]
+
+    blocks = []
+    for medal_type in df_old["Medal_type"].unique():
+        block = pd.concat(
+            [
+                df_old[df_old["Medal_type"] == medal_type],
+                df_new[df_new["Medal_type"] == medal_type],
+            ],
+            ignore_index=True,
+        )
+        block = block.reindex(columns=columns)
+        block[committees] = block[committees].fillna(0.0)
+        blocks.append(_sort_by_year(block, "Olympiad"))
+    write_parquet(pd.concat(blocks, ignore_index=True), path)
+
+
+def _append_grouped_medals(
+    path: Path, new_counts: aggregates.MedalCounts, dtypes: pd.Series
+) -> None:
+    df_old = _with_dtypes(pd.read_parquet(path), dtypes)
+    df_new = aggregates.grouped_medals_olympiads(new_counts)
+    medal_types = list(dtypes["Medal_type"].categories)
+
+    # "All" totals: medals by committee (in committee order), sorted by gold
+    # then silver medals
+    is_all = df_old["Olympiad"] == "All"
+    df_all = (
+        pd.concat([df_old[is_all], df_new[df_new["Olympiad"] == "All"]])
+        .groupby("Committee", observed=True)[medal_types]
+        .sum()
+        .reset_index()
+    )
+    order = np.lexsort((-df_all["Silver"].to_numpy(), -df_all["Gold"].to_numpy()))
+    df_all = df_all.iloc[order]
+    df_all["Olympiad"] = "All"
+    df_all["Total"] = df_all["Gold"] + df_all["Silver"] + df_all["Bronze"]
+
+    df = pd.concat(
+        [df_all, df_old[~is_all], df_new[df_new["Olympiad"] != "All"]],
+        ignore_index=True,
+    )
+    write_parquet(df, path)
+
+
+def _append_lists(root: Path, olympiads: list[str], committees: list[str]) -> None:
+    olympiads_path = root / LIST_OLYMPIADS
+    list_olympiads = yaml.safe_load(olympiads_path.read_text()) + olympiads
+    with atomic_path(olympiads_path) as path:
+        path.write_text(yaml.dump(list_olympiads, default_flow_style=False))
+
+    committees_path = root / LIST_COMMITTEES
+    list_committees = sorted(
+        {*yaml.safe_load(committees_path.read_text()), *committees}
+    )
+    with atomic_path(committees_path) as path:
+        path.write_text(yaml.dump(list_committees, default_flow_style=False))
+
+
+def _same_output(path: Path, rebuilt_path: Path) -> bool:
+    if path.suffix != ".parquet":
+        return path.read_bytes() == rebuilt_path.read_bytes()
+    try:
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(path), pd.read_parquet(rebuilt_path)
+        )
+    except AssertionError:
+        return False
+    return True
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Append the medals of new Olympiads.")
+    parser.add_argument("new_medals_csv", nargs="?")
+    parser.add_argument("--root", default=".")
+    parser.add_argument(
+        "--verify", action="store_true", help="compare the outputs to a full rebuild"
+    )
+    args = parser.parse_args(argv)
+
+    if args.new_medals_csv:
+        new_olympiads = append_medals(args.new_medals_csv, args.root)
+        print(f"Appended {', '.join(new_olympiads)}")
+    if args.verify:
+        different = verify_against_rebuild(args.root)
+        if different:
+            print(f"Different from a full rebuild: {', '.join(different)}")
+            sys.exit(1)
+        print("Identical to a full rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Streaming ingest of large CSV files to parquet, with bounded memory.
+
+`pd.read_csv` followed by `change_column_dtypes` holds the whole file as Python
+strings before converting the columns to categoricals, so its memory grows with
+the size of the file. `stream_csv_to_parquet` instead reads the CSV file in
+chunks of `chunk_size` bytes, each parsed by the multi-threaded pyarrow parser,
+and writes each chunk as a parquet row group:
+
+1. Categorical columns are dictionary-encoded chunk by chunk, and their codes
+   are translated to global codes, in dictionaries that grow with each chunk.
+   A temporary file stores the global codes.
+2. When the whole file is read, the dictionaries are sorted (as by
+   `astype("category")`), and the row groups of the temporary file are copied
+   to the output file one at a time, with codes remapped to the sorted
+   dictionaries. With a `partition_column`, the rows are written in the row
+   groups of `transformation.layout` instead.
+
+Peak memory depends on the chunk size and on the number of distinct
+categories, not on the number of rows. The output reads back (with
+`pd.read_parquet`) exactly like the frame `read_csv` and `change_column_dtypes`
+produce, except that missing values of string columns stay missing instead of
+becoming the string "nan".
+"""
+
+import io
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from transformation.layout import write_row_groups
+
+CHUNK_SIZE = 16 << 20
+
+
+class CategoryDictionary:
+    """Categories of a column, with codes in order of first appearance."""
+
+    def __init__(self, replacements: dict[str, str] | None = None):
+        """
+        Args:
+            replacements (dict[str, str] | None): Values replaced by other
+                values, before they are encoded.
+        """
+        self.replacements = replacements or {}
+        self.codes: dict[str, int] = {}
+
+    def encode(self, column: pa.ChunkedArray) -> np.ndarray:
+        """Return the global codes of a column of a chunk (-1 for nulls)."""
+        encoded = pc.dictionary_encode(column).combine_chunks()
+        local_codes = np.array(
+            [
+                self.codes.setdefault(
+                    self.replacements.get(value, value), len(self.codes)
+                )
+                for value in encoded.dictionary.to_pylist()
+            ],
+            dtype=np.int32,
+        )
+        indices = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+        return np.where(indices < 0, -1, local_codes[np.maximum(indices, 0)])
+
+    def sorted(self) -> tuple[pa.Array, np.ndarray]:
+        """
+        Return the sorted categories, and the remapping of the codes to them.
+        """
+        values = np.array(list(self.codes), dtype=object)
+        order = np.argsort(values, kind="stable")
+        remap = np.empty(len(values), dtype=np.int32)
+        remap[order] = np.arange(len(values), dtype=np.int32)
+        return pa.array(values[order].tolist(), type=pa.string()), remap
+
+
+def iter_csv_chunks(csv_path: str | Path, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the CSV file in chunks of about `chunk_size` bytes, each starting
+    with the header line and ending at the end of a record.
+
+    Records end at newlines outside of quoted fields: a newline is inside a
+    quoted field when an odd number of quotes precedes it in the chunk (escaped
+    quotes come in pairs).
+    """
+    with Path(csv_path).open("rb") as file:
+        header = file.readline()
+        rest = b""
+        while True:
+            block = file.read(chunk_size)
+            data = rest + block
+            if not block:
+                if data.strip():
+                    yield header + data
+                return
+            cut = data.rfind(b"\n")
+            while cut >= 0 and data.count(b'"', 0, cut) % 2 == 1:
+                cut = data.rfind(b"\n", 0, cut)
+            if cut < 0:
+                rest = data
+                continue
+            rest = data[cut + 1 :]
+            yield header + data[: cut + 1]
+
+
+def stream_csv_to_parquet(
+    csv_path: str | Path,
+    parquet_path: str | Path,
+    category_columns: list[str],
+    string_columns: list[str] | None = None,
+    replacements: dict[str, dict[str, str]] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    column_types: dict[str, pa.DataType] | None = None,
+    partition_column: str | None = None,
+    group_column: str | None = None,
+) -> int:
+    """
+    Convert a CSV file to parquet, chunk by chunk.
+
+    Args:
+        csv_path (str | Path): CSV file, with a header line.
+        parquet_path (str | Path): Parquet file to write.
+        category_columns (list[str]): Columns stored as categoricals.
+        string_columns (list[str] | None): Columns kept as strings, whatever
+            their values look like.
+        replacements (dict[str, dict[str, str]] | None): Values to replace in
+            categorical columns, by column.
+        chunk_size (int): Bytes of CSV parsed at once.
+        column_types (dict[str, pa.DataType] | None): Types of other columns,
+            such as narrow integer types.
+        partition_column (str | None): Column whose changes end row groups
+            (see `transformation.layout.iter_row_groups`).
+        group_column (str | None): Column whose runs of equal values are kept
+            in the same row group.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ValueError: If a categorical or string column is missing.
+    """
+    parquet_path = Path(parquet_path)
+    replacements = replacements or {}
+    dictionaries = {
+        column: CategoryDictionary(replacements.get(column))
+        for column in category_columns
+    }
+    column_types = {
+        **(column_types or {}),
+        **{
+            column: pa.string()
+            for column in [*category_columns, *(string_columns or [])]
+        },
+    }
+
+    codes_path = parquet_path.with_name(f".{parquet_path.name}.codes")
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_csv_chunks(csv_path, chunk_size):
+            table = _read_csv_chunk(chunk, column_types)
+            if writer is None:
+                missing_columns = [
+                    c for c in column_types if c not in table.schema.names
+                ]
+                if missing_columns:
+                    raise ValueError(f"Columns not found in CSV: {missing_columns}")
+                # Other chunks must have the types inferred from the first one
+                column_types.update(zip(table.schema.names, table.schema.types))
+                codes_schema = _codes_schema(table.schema, dictionaries)
+                writer = pq.ParquetWriter(codes_path, codes_schema)
+            writer.write_table(_encode_chunk(table, dictionaries, codes_schema))
+            rows += table.num_rows
+        if writer is None:
+            raise ValueError(f"No rows in {csv_path}")
+        writer.close()
+        writer = None
+        _write_with_sorted_dictionaries(
+            codes_path, parquet_path, dictionaries, partition_column, group_column
+        )
+    finally:
+        if writer is not None:
+            writer.close()
+        codes_path.unlink(missing_ok=True)
+    return rows
+
+
+def _read_csv_chunk(chunk: bytes, column_types: dict) -> pa.Table:
+    return pa_csv.read_csv(
+        io.BytesIO(chunk),
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+
+
+def _codes_schema(schema: pa.Schema, dictionaries: dict) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field(field.name, pa.int32()) if field.name in dictionaries else field
+            for field in schema
+        ]
+    )
+
+
+def _encode_chunk(table: pa.Table, dictionaries: dict, schema: pa.Schema) -> pa.Table:
+    columns = []
+    for name in schema.names:
+        if name in dictionaries:
+            codes = dictionaries[name].encode(table[name])
+            columns.append(pa.array(codes, mask=codes < 0))
+        else:
+            columns.append(table[name])
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _write_with_sorted_dictionaries(
+    codes_path: Path,
+    parquet_path: Path,
+    dictionaries: dict,
+    partition_column: str | None = None,
+    group_column: str | None = None,
+) -> None:
+    """Copy the row groups of the codes file, as sorted dictionary columns."""
+    categories = {name: d.sorted() for name, d in dictionaries.items()}
+    codes_file = pq.ParquetFile(codes_path)
+    schema = pa.schema(
+        [
+            pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+            if field.name in categories
+            else field
+            for field in codes_file.schema_arrow
+        ]
+    )
+
+    def tables():
+        for index in range(codes_file.num_row_groups):
+            row_group = codes_file.read_row_group(index)
+            columns = []
+            for name in schema.names:
+                column = row_group[name].combine_chunks()
+                if name in categories:
+                    column = _to_dictionary(column, *categories[name])
+                columns.append(column)
+            yield pa.Table.from_arrays(columns, schema=schema)
+
+    temporary_path = parquet_path.with_name(f".{parquet_path.name}.tmp")
+    try:
+        write_row_groups(
+            tables(), temporary_path, schema, partition_column, group_column
+        )
+        temporary_path.replace(parquet_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+def _to_dictionary(
+    codes: pa.Array, values: pa.Array, remap: np.ndarray
+) -> pa.DictionaryArray:
+    """Dictionary column of the global `codes`, remapped to sorted `values`."""
+    indices = remap[codes.fill_null(0).to_numpy()]
+    mask = codes.is_null().to_numpy(zero_copy_only=False)
+    return pa.DictionaryArray.from_arrays(pa.array(indices, mask=mask), values)
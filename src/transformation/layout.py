@@ -0,0 +1,138 @@
+"""
+Row group layout of the medals parquet file.
+
+The medals table is written in row groups that each hold the rows of a single
+Olympic season, and of whole Olympiads: a row group ends where the season
+changes, and at the first change of Olympiad once it holds `ROW_GROUP_ROWS`
+rows (or at `MAX_ROW_GROUP_ROWS` rows, for very large Olympiads). The min/max
+statistics of the row groups then tell which ones hold the rows of a season,
+an Olympiad or a range of years, so parquet readers that prune row groups
+(pyarrow, DuckDB) can skip the others.
+
+The rows keep the order of the source file, where the medals are grouped by
+season and sorted by year (Olympiads appended later come after them): the
+aggregates and the selector lists follow the order in which Olympiads and
+events first appear, so reordering the rows would change the charts.
+
+The row groups only depend on the rows, not on how they are split into tables:
+the streamed build and the delta append write the same row groups.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+PARTITION_COLUMN = "Olympic_season"
+GROUP_COLUMN = "Olympiad"
+ROW_GROUP_ROWS = 8192
+MAX_ROW_GROUP_ROWS = 1 << 17
+
+
+def iter_row_groups(
+    tables: Iterable[pa.Table],
+    partition_column: str = PARTITION_COLUMN,
+    group_column: str | None = GROUP_COLUMN,
+    row_group_rows: int = ROW_GROUP_ROWS,
+    max_row_group_rows: int = MAX_ROW_GROUP_ROWS,
+) -> Iterator[pa.Table]:
+    """
+    Split consecutive tables into row groups.
+
+    At most `max_row_group_rows` rows are held at a time, so memory stays
+    bounded even for a single run of `group_column` longer than that.
+
+    Args:
+        tables (Iterable[pa.Table]): Consecutive parts of the table.
+        partition_column (str): A row group never holds two values of it.
+        group_column (str | None): Runs of equal values of this column are
+            kept in the same row group, up to `row_group_rows` rows.
+        row_group_rows (int): Target number of rows of the row groups.
+        max_row_group_rows (int): Longer runs are split in row groups of
+            this number of rows.
+
+    Yields:
+        pa.Table: The row groups.
+    """
+    pending = []
+    pending_rows = 0
+    last_values = None
+    for table in tables:
+        if table.num_rows == 0:
+            continue
+        columns = [partition_column] + ([group_column] if group_column else [])
+        changes = [
+            _change_positions(table[column], last)
+            for column, last in zip(columns, last_values or [None] * len(columns))
+        ]
+        last_values = [table[column][-1].as_py() for column in columns]
+
+        start = 0
+        boundaries = np.union1d(*changes) if group_column else changes[0]
+        for position in [*boundaries, table.num_rows]:
+            # Full row groups, within a run
+            while pending_rows + position - start > max_row_group_rows:
+                end = start + max_row_group_rows - pending_rows
+                pending.append(table.slice(start, end - start))
+                yield pa.concat_tables(pending)
+                pending, pending_rows, start = [], 0, end
+            if position == table.num_rows:
+                break
+            rows = pending_rows + position - start
+            if position in changes[0] or rows >= row_group_rows:
+                pending.append(table.slice(start, position - start))
+                if rows:
+                    yield pa.concat_tables(pending)
+                pending, pending_rows, start = [], 0, position
+        pending.append(table.slice(start))
+        pending_rows += table.num_rows - start
+    if pending_rows:
+        yield pa.concat_tables(pending)
+
+
+def _change_positions(column: pa.ChunkedArray, previous_value) -> np.ndarray:
+    """Positions of the rows whose value differs from the previous row."""
+    values = column.combine_chunks()
+    if pa.types.is_dictionary(values.type):
+        values = values.dictionary_decode()
+    changed = pc.not_equal(values[1:], values[:-1]).fill_null(True)
+    positions = np.flatnonzero(changed.to_numpy(zero_copy_only=False)) + 1
+    if previous_value is not None and values[0].as_py() != previous_value:
+        positions = np.concatenate([[0], positions])
+    return positions
+
+
+def write_row_groups(
+    tables: Iterable[pa.Table],
+    path: str | Path,
+    schema: pa.Schema,
+    partition_column: str | None = PARTITION_COLUMN,
+    group_column: str | None = GROUP_COLUMN,
+) -> None:
+    """
+    Write consecutive tables to a parquet file, in the row groups of
+    `iter_row_groups`, with min/max statistics.
+
+    Args:
+        tables (Iterable[pa.Table]): Consecutive parts of the table.
+        path (str | Path): The parquet file.
+        schema (pa.Schema): Schema of the tables.
+        partition_column (str | None): See `iter_row_groups`. Without it, each
+            table is written as a row group.
+        group_column (str | None): See `iter_row_groups`.
+    """
+    if partition_column is not None:
+        tables = iter_row_groups(tables, partition_column, group_column)
+    with pq.ParquetWriter(path, schema, write_statistics=True) as writer:
+        for table in tables:
+            writer.write_table(table, row_group_size=MAX_ROW_GROUP_ROWS)
+
+
+def write_medals_parquet(df_medals: pd.DataFrame, path: str | Path) -> None:
+    """Write the medals table with the row group layout (not atomically)."""
+    table = pa.Table.from_pandas(df_medals, preserve_index=False)
+    write_row_groups([table], path, table.schema)
@@ -0,0 +1,235 @@
+"""
+Incremental runner of the data build steps.
+
+Each `Step` declares the files it reads and the files it writes, relative to
+the root directory of the pipeline. `run_pipeline` runs the steps in the order
+of their dependencies, running independent steps in parallel threads.
+
+The manifest records, for every step, a hash of its code and the content hashes
+of its inputs and outputs. A step runs again only when one of them changed (or
+an output is missing): when an input file is written again with the same
+contents, the steps that read it are skipped.
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    Named build step.
+
+    - name: name of the step, in the manifest and in the timings.
+    - function: called with the paths of the inputs then of the outputs.
+    - inputs, outputs: paths of the files, relative to the pipeline root.
+    - modules: other modules whose code changes the outputs of the step.
+    """
+
+    name: str
+    function: Callable[..., None]
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    modules: tuple[ModuleType, ...] = field(default=())
+
+    def code_hash(self) -> str:
+        """Hash of the source of the step's module and of its other modules."""
+        digest = hashlib.sha256(self.function.__qualname__.encode())
+        for module in (inspect.getmodule(self.function), *self.modules):
+            digest.update(inspect.getsource(module).encode())
+        return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class StepResult:
+    name: str
+    built: bool
+    seconds: float
+
+
+def hash_file(path: Path) -> str:
+    """Return the sha256 hash of the contents of a file."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    temporary_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    temporary_path.replace(path)
+
+
+def order_steps(steps: list[Step]) -> dict[str, set[str]]:
+    """
+    Return the names of the steps each step depends on.
+
+    Raises:
+        ValueError: If two steps have the same name or write the same file, or
+            if the dependencies have a cycle.
+    """
+    producers = {}
+    for step in steps:
+        for output in step.outputs:
+            if output in producers:
+                raise ValueError(
+                    f"'{output}' is written by '{producers[output]}' and '{step.name}'"
+                )
+            producers[output] = step.name
+    names = [step.name for step in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Step names must be unique: {names}")
+
+    dependencies = {
+        step.name: {producers[i] for i in step.inputs if i in producers}
+        for step in steps
+    }
+    # Detect cycles, removing the steps whose dependencies are all removed
+    remaining = dict(dependencies)
+    while remaining:
+        ready = [
+            name for name, deps in remaining.items() if not deps & remaining.keys()
+        ]
+        if not ready:
+            raise ValueError(f"Steps have cyclic dependencies: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+    return dependencies
+
+
+def run_pipeline(
+    steps: list[Step],
+    root: str | Path = ".",
+    manifest_path: str | Path | None = None,
+    workers: int | None = None,
+    force: bool = False,
+    on_result: Callable[[StepResult], None] | None = None,
+) -> list[StepResult]:
+    """
+    Run the steps whose code, inputs or outputs changed since their last run.
+
+    Args:
+        steps (list[Step]): Steps of the pipeline.
+        root (str | Path): Directory the paths of the steps are relative to.
+        manifest_path (str | Path | None): Path of the manifest, relative to
+            `root`. None keeps no manifest, and runs every step.
+        workers (int | None): Number of threads running independent steps.
+        force (bool): Run every step, even if it is up to date.
+        on_result (Callable | None): Called with the result of each step, as
+            soon as it ends.
+
+    Returns:
+        list[StepResult]: Results of the steps, in order of completion.
+    """
+    root = Path(root)
+    dependencies = order_steps(steps)
+    steps_by_name = {step.name: step for step in steps}
+    if manifest_path is not None:
+        manifest_path = root / manifest_path
+        manifest = load_manifest(manifest_path)
+    else:
+        manifest = {}
+        force = True
+
+    results = []
+    done = set()
+    running = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while len(done) < len(steps):
+                for name, deps in dependencies.items():
+                    if name not in done and name not in running and deps <= done:
+                        running[name] = executor.submit(
+                            _run_step,
+                            steps_by_name[name],
+                            root,
+                            manifest.get(name),
+                            force,
+                        )
+                finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                for name, future in list(running.items()):
+                    if future not in finished:
+                        continue
+                    result, record = future.result()
+                    manifest[name] = record
+                    del running[name]
+                    done.add(name)
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+    finally:
+        # Keep the records of the steps that ran, even if another one failed,
+        # and forget the steps removed from the pipeline
+        if manifest_path is not None:
+            save_manifest(
+                manifest_path,
+                {name: manifest[name] for name in dependencies if name in manifest},
+            )
+    return results
+
+
+def record_steps(
+    steps: list[Step], root: str | Path, manifest_path: str | Path
+) -> None:
+    """
+    Record the current inputs and outputs of steps as up to date.
+
+    For outputs updated outside of the pipeline, with the contents the steps
+    would write (see `transformation.append`).
+    """
+    root = Path(root)
+    manifest_path = root / manifest_path
+    manifest = load_manifest(manifest_path)
+    for step in steps:
+        manifest[step.name] = {
+            "code": step.code_hash(),
+            "inputs": {path: hash_file(root / path) for path in step.inputs},
+            "outputs": {path: hash_file(root / path) for path in step.outputs},
+        }
+    save_manifest(manifest_path, manifest)
+
+
+def _run_step(
+    step: Step, root: Path, record: dict | None, force: bool
+) -> tuple[StepResult, dict]:
+    """Run a step if it is out of date, and return its result and new record."""
+    start = time.perf_counter()
+    code = step.code_hash()
+    inputs = {path: hash_file(root / path) for path in step.inputs}
+    built = force or not _is_up_to_date(step, root, record, code, inputs)
+    if built:
+        output_paths = [root / path for path in step.outputs]
+        for path in output_paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        step.function(*(root / path for path in step.inputs), *output_paths)
+        outputs = {path: hash_file(root / path) for path in step.outputs}
+        record = {"code": code, "inputs": inputs, "outputs": outputs}
+    return StepResult(step.name, built, time.perf_counter() - start), record
+
+
+def _is_up_to_date(
+    step: Step, root: Path, record: dict | None, code: str, inputs: dict
+) -> bool:
+    if record is None or record.get("code") != code or record.get("inputs") != inputs:
+        return False
+    outputs = record.get("outputs", {})
+    return set(outputs) == set(step.outputs) and all(
+        (root / path).exists() and hash_file(root / path) == digest
+        for path, digest in outputs.items()
+    )
@@ -0,0 +1,231 @@
+"""
+Steps that build the datasets and parameter files of the app.
+
+They replace the cells of the former `transform_data.ipynb` notebook: the
+original CSV files (in `original_data`) are cleaned and converted to parquet
+files (in `data`), from which the aggregates and the selector lists (in
+`parameters`) are built. Paths are relative to the `src` directory.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import yaml
+
+from loaders import aggregates
+from transformation import ingest, layout
+from transformation.ingest import stream_csv_to_parquet
+from transformation.pipeline import Step
+
+MEDALS_CATEGORY_COLUMNS = [
+    "Olympiad",
+    "Discipline",
+    "Event",
+    "Olympic_city",
+    "Olympic_season",
+    "Gender",
+    "Code",
+    "Committee",
+    "Committee_type",
+    "Medal_type",
+]
+
+# Narrow integer types: years fit in 16 bits. The medals table has no counts;
+# the counts of the cities table are narrowed to 32 bits below, and the
+# aggregate files keep the 64-bit counts of `loaders.aggregates`, as the app
+# derives them at load time.
+MEDALS_INTEGER_TYPES = {"Olympic_year": "int16"}
+
+CITIES_CATEGORY_COLUMNS = [
+    "Olympiad",
+    "Olympic_city",
+    "Olympic_season",
+    "Country",
+    "Continent",
+    "ISO_code_mapping",
+]
+
+CITIES_INTEGER_TYPES = {
+    "Olympic_year": "int16",
+    "total_medals": "int32",
+    "total_medals_gold": "int32",
+    "total_medals_silver": "int32",
+    "total_medals_bronze": "int32",
+    "number_committees": "int32",
+    "number_disciplines": "int32",
+    "number_events": "int32",
+}
+
+# Stockholm 1956 was only equestrian: its medals are merged with Melbourne 1956
+MERGED_OLYMPIADS = {
+    "Stockholm 1956": "Melbourne 1956 (*)",
+    "Melbourne 1956": "Melbourne 1956 (*)",
+}
+
+
+def change_column_dtypes(df: pd.DataFrame, dtype, columns: list[str]) -> pd.DataFrame:
+    """
+    Convert specified columns in a DataFrame to a given dtype.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        dtype (str or type): The target data type (e.g., 'int', 'category').
+        columns (list): List of column names to convert.
+
+    Returns:
+        pd.DataFrame: A new DataFrame with updated column types.
+
+    Raises:
+        ValueError: If any column is missing.
+    """
+    missing_columns = [column for column in columns if column not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Columns not found in DataFrame: {missing_columns}")
+    return df.astype(dict.fromkeys(columns, dtype))
+
+
+def convert_medals(csv_path: Path, parquet_path: Path) -> None:
+    """
+    Clean the medals CSV file, and save it with compact dtypes.
+
+    The file is streamed in chunks (see `transformation.ingest`), so athlete
+    level files much larger than the memory can be converted. Row groups hold
+    a single season (see `transformation.layout`).
+    """
+    stream_csv_to_parquet(
+        csv_path,
+        parquet_path,
+        category_columns=MEDALS_CATEGORY_COLUMNS,
+        string_columns=["Winner"],
+        replacements={"Olympiad": MERGED_OLYMPIADS},
+        column_types={
+            column: pa.from_numpy_dtype(dtype)
+            for column, dtype in MEDALS_INTEGER_TYPES.items()
+        },
+        partition_column=layout.PARTITION_COLUMN,
+        group_column=layout.GROUP_COLUMN,
+    )
+
+
+def convert_cities(csv_path: Path, parquet_path: Path) -> None:
+    """Save the host cities CSV file with compact dtypes."""
+    df_olympic_cities = change_column_dtypes(
+        pd.read_csv(csv_path), "category", CITIES_CATEGORY_COLUMNS
+    ).astype(CITIES_INTEGER_TYPES)
+    write_parquet(df_olympic_cities, parquet_path)
+
+
+def simplify_cities(cities_path: Path, simplified_path: Path) -> None:
+    """Small DataFrame to display as summary table."""
+    df_olympic_cities = pd.read_parquet(cities_path)
+    write_parquet(
+        aggregates.olympic_cities_simplified(df_olympic_cities), simplified_path
+    )
+
+
+def build_medals_by_olympiad(medals_path: Path, output_path: Path) -> None:
+    """Medal count by Olympiad and medal type."""
+    medal_counts = aggregates.count_medals(pd.read_parquet(medals_path))
+    write_parquet(aggregates.medals_by_olympiad(medal_counts), output_path)
+
+
+def create_pivot_total(medals_path: Path, output_path: Path) -> None:
+    """Medals of every committee by Olympiad, for all medals and by medal type."""
+    medal_counts = aggregates.count_medals(pd.read_parquet(medals_path))
+    write_parquet(
+        aggregates.total_medals_by_olympiad_and_committee(medal_counts), output_path
+    )
+
+
+def build_grouped_medals(medals_path: Path, output_path: Path) -> None:
+    """Medal counts by committee, for each Olympiad and for all of them."""
+    medal_counts = aggregates.count_medals(pd.read_parquet(medals_path))
+    write_parquet(aggregates.grouped_medals_olympiads(medal_counts), output_path)
+
+
+def create_lists(
+    medals_path: Path, olympiads_path: Path, committees_path: Path
+) -> None:
+    """Write the lists of Olympiads and of committees of the selectors."""
+    df_olympic_medals = pd.read_parquet(medals_path, columns=["Olympiad", "Committee"])
+    list_olympiads = ["All"] + df_olympic_medals["Olympiad"].unique().tolist()
+    list_committees = sorted(df_olympic_medals["Committee"].unique().tolist())
+    with atomic_path(olympiads_path) as path:
+        path.write_text(yaml.dump(list_olympiads, default_flow_style=False))
+    with atomic_path(committees_path) as path:
+        path.write_text(yaml.dump(list_committees, default_flow_style=False))
+
+
+def write_parquet(df: pd.DataFrame, path: Path) -> None:
+    """Write a DataFrame to a parquet file, atomically."""
+    with atomic_path(path) as temporary_path:
+        df.to_parquet(temporary_path, index=False)
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """Yield a temporary path, moved to `path` if the block succeeds."""
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    try:
+        yield temporary_path
+        temporary_path.replace(path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+MANIFEST = "data/manifest.json"
+MEDALS_CSV = "original_data/olympic_medals.csv"
+MEDALS = "data/olympic_medals.parquet"
+CITIES = "data/olympic_cities.parquet"
+
+STEPS = [
+    Step(
+        "convert_medals",
+        convert_medals,
+        inputs=(MEDALS_CSV,),
+        outputs=(MEDALS,),
+        modules=(ingest, layout),
+    ),
+    Step(
+        "convert_cities",
+        convert_cities,
+        inputs=("original_data/olympic_cities.csv",),
+        outputs=(CITIES,),
+    ),
+    Step(
+        "simplify_cities",
+        simplify_cities,
+        inputs=(CITIES,),
+        outputs=("data/olympic_cities_simplified.parquet",),
+        modules=(aggregates,),
+    ),
+    Step(
+        "medals_by_olympiad",
+        build_medals_by_olympiad,
+        inputs=(MEDALS,),
+        outputs=("data/medals_by_olympiad.parquet",),
+        modules=(aggregates,),
+    ),
+    Step(
+        "create_pivot_total",
+        create_pivot_total,
+        inputs=(MEDALS,),
+        outputs=("data/total_medals_by_olympiad_and_committee.parquet",),
+        modules=(aggregates,),
+    ),
+    Step(
+        "grouped_medals_olympiads",
+        build_grouped_medals,
+        inputs=(MEDALS,),
+        outputs=("data/grouped_medals_olympiads.parquet",),
+        modules=(aggregates,),
+    ),
+    Step(
+        "create_lists",
+        create_lists,
+        inputs=(MEDALS,),
+        outputs=("parameters/list_olympiads.yml", "parameters/list_committees.yml"),
+    ),
+]
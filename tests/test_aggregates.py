@@ -0,0 +1,152 @@
+"""
+Tests for loaders.aggregates (count_medals and the derived datasets).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from loaders.aggregates import (
+    AGGREGATES,
+    count_medals,
+    derive_aggregates,
+    grouped_medals_olympiads,
+    medals_by_olympiad,
+    total_medals_by_olympiad_and_committee,
+)
+
+CATEGORICAL_COLUMNS = ["Olympiad", "Olympic_season", "Committee", "Medal_type"]
+
+
+@pytest.fixture
+def df_medals(df_olympic_medals):
+    """Medals fact table with categorical columns, like the parquet file."""
+    return df_olympic_medals.astype({c: "category" for c in CATEGORICAL_COLUMNS})
+
+
+@pytest.fixture
+def df_cities():
+    return pd.DataFrame(
+        {
+            "Olympiad": ["Rio 2016"],
+            "Olympic_year": [2016],
+            "Olympic_season": ["summer"],
+            "total_medals": [3],
+            "total_medals_gold": [1],
+            "total_medals_silver": [1],
+            "total_medals_bronze": [1],
+            "number_committees": [2],
+            "number_disciplines": [2],
+            "number_events": [2],
+            "Country": ["Brazil"],
+            "Continent": ["South America"],
+            "City": ["Rio"],
+        }
+    )
+
+
+class TestCountMedals:
+    def test_shape(self, df_medals):
+        medal_counts = count_medals(df_medals)
+        assert medal_counts.counts.shape == (3, 4, 3)
+
+    def test_counts_every_medal(self, df_medals):
+        assert count_medals(df_medals).counts.sum() == len(df_medals)
+
+    def test_counts_match_groupby(self, df_medals):
+        medal_counts = count_medals(df_medals)
+        expected = df_medals.groupby(
+            ["Olympiad", "Committee", "Medal_type"], observed=False
+        ).size()
+        np.testing.assert_array_equal(medal_counts.counts.ravel(), expected.to_numpy())
+
+    def test_olympiad_attributes(self, df_medals):
+        medal_counts = count_medals(df_medals)
+        categories = medal_counts.olympiad_dtype.categories
+        code = categories.get_loc("PyeongChang 2018")
+        assert medal_counts.olympiad_years[code] == 2018
+        season = medal_counts.season_dtype.categories[
+            medal_counts.olympiad_seasons[code]
+        ]
+        assert season == "winter"
+
+    def test_olympiad_order_is_order_of_appearance(self, df_medals):
+        medal_counts = count_medals(df_medals)
+        olympiads = medal_counts.olympiad_dtype.categories[medal_counts.olympiad_order]
+        assert list(olympiads) == ["Rio 2016", "Tokyo 2020", "PyeongChang 2018"]
+
+
+class TestMedalsByOlympiad:
+    def test_counts_match_groupby(self, df_medals):
+        df = medals_by_olympiad(count_medals(df_medals))
+        expected = (
+            df_medals.groupby(["Olympiad", "Medal_type"], observed=True)
+            .size()
+            .rename("Medal_count")
+        )
+        actual = df.set_index(["Olympiad", "Medal_type"])["Medal_count"]
+        pd.testing.assert_series_equal(
+            actual.sort_index(), expected.sort_index(), check_categorical=False
+        )
+
+    def test_sorted_by_year(self, df_medals):
+        df = medals_by_olympiad(count_medals(df_medals))
+        assert df["Olympic_year"].is_monotonic_increasing
+
+    def test_medal_type_code(self, df_medals):
+        df = medals_by_olympiad(count_medals(df_medals))
+        codes = dict(zip(df["Medal_type"], df["Medal_type_code"], strict=True))
+        assert codes == {"Bronze": 0, "Silver": 1, "Gold": 2}
+
+
+class TestTotalMedalsByOlympiadAndCommittee:
+    def test_blocks(self, df_medals):
+        df = total_medals_by_olympiad_and_committee(count_medals(df_medals))
+        assert list(df["Medal_type"].unique()) == ["All", "Gold", "Silver", "Bronze"]
+
+    def test_committee_columns_are_sorted(self, df_medals):
+        df = total_medals_by_olympiad_and_committee(count_medals(df_medals))
+        assert list(df.columns[3:-2]) == ["CHN", "GBR", "NOR", "USA"]
+
+    def test_all_medals(self, df_medals):
+        df = total_medals_by_olympiad_and_committee(count_medals(df_medals))
+        row = df[(df["Medal_type"] == "All") & (df["Olympiad"] == "Tokyo 2020")]
+        assert row["USA"].item() == 1.0
+        assert row["CHN"].item() == 1.0
+        assert row["Total_medals"].item() == 2.0
+
+    def test_skips_olympiads_without_medals_of_type(self, df_medals):
+        df = total_medals_by_olympiad_and_committee(count_medals(df_medals))
+        bronze = df[df["Medal_type"] == "Bronze"]
+        assert list(bronze["Olympiad"]) == ["Tokyo 2020"]
+
+
+class TestGroupedMedalsOlympiads:
+    def test_all_block_first(self, df_medals):
+        df = grouped_medals_olympiads(count_medals(df_medals))
+        assert list(df["Olympiad"].unique()) == [
+            "All",
+            "Rio 2016",
+            "Tokyo 2020",
+            "PyeongChang 2018",
+        ]
+
+    def test_all_block_sorted_by_gold_then_silver(self, df_medals):
+        df = grouped_medals_olympiads(count_medals(df_medals))
+        block = df[df["Olympiad"] == "All"]
+        assert list(block["Committee"]) == ["USA", "CHN", "NOR", "GBR"]
+
+    def test_total(self, df_medals):
+        df = grouped_medals_olympiads(count_medals(df_medals))
+        assert (df["Total"] == df["Gold"] + df["Silver"] + df["Bronze"]).all()
+        assert df.loc[df["Olympiad"] == "All", "Total"].sum() == len(df_medals)
+
+
+class TestDeriveAggregates:
+    def test_returns_every_aggregate(self, df_medals, df_cities):
+        aggregates = derive_aggregates(df_medals, df_cities)
+        assert set(aggregates) == {*AGGREGATES, "olympic_cities_simplified"}
+
+    def test_cities_simplified_drops_extra_columns(self, df_medals, df_cities):
+        aggregates = derive_aggregates(df_medals, df_cities)
+        assert "City" not in aggregates["olympic_cities_simplified"].columns
@@ -0,0 +1,172 @@
+"""
+Tests for transformation.append (delta append of new Olympiads).
+"""
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+import yaml
+
+from transformation import append
+from transformation.append import append_medals, verify_against_rebuild
+from transformation.pipeline import run_pipeline
+from transformation.steps import MANIFEST, STEPS
+
+MEDALS_EXTRA_COLUMNS = {
+    "Winner": "Someone",
+    "Olympic_city": "City",
+    "Code": "CODE",
+    "Committee_type": "Country",
+}
+
+
+@pytest.fixture
+def root(tmp_path, df_olympic_medals):
+    """Pipeline root, built from the medals fixture."""
+    (tmp_path / "original_data").mkdir()
+    df_olympic_medals.assign(**MEDALS_EXTRA_COLUMNS).to_csv(
+        tmp_path / "original_data" / "olympic_medals.csv", index=False
+    )
+    pd.DataFrame(
+        {
+            "Olympiad": ["Rio 2016"],
+            "Olympic_city": ["Rio"],
+            "Olympic_year": [2016],
+            "Olympic_season": ["summer"],
+            "total_medals": [2],
+            "total_medals_gold": [1],
+            "total_medals_silver": [1],
+            "total_medals_bronze": [0],
+            "number_committees": [2],
+            "number_disciplines": [2],
+            "number_events": [2],
+            "Country": ["Brazil"],
+            "Continent": ["South America"],
+            "ISO_code_mapping": ["BRA"],
+        }
+    ).to_csv(tmp_path / "original_data" / "olympic_cities.csv", index=False)
+    run_pipeline(STEPS, root=tmp_path, manifest_path=MANIFEST)
+    return tmp_path
+
+
+@pytest.fixture
+def new_medals_csv(tmp_path):
+    path = tmp_path / "new_medals.csv"
+    pd.DataFrame(
+        {
+            "Olympiad": ["Paris 2024", "Paris 2024", "Paris 2024"],
+            "Olympic_year": [2024, 2024, 2024],
+            "Olympic_season": ["summer", "summer", "summer"],
+            "Committee": ["FRA", "USA", "FRA"],
+            "Discipline": ["Judo", "Athletics", "Swimming"],
+            "Event": ["+100kg", "100m", "200m medley"],
+            "Gender": ["Men", "Men", "Men"],
+            "Medal_type": ["Gold", "Gold", "Bronze"],
+            **MEDALS_EXTRA_COLUMNS,
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+class TestAppendMedals:
+    def test_identical_to_full_rebuild(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        assert verify_against_rebuild(root) == []
+
+    def test_returns_new_olympiads(self, root, new_medals_csv):
+        assert append_medals(new_medals_csv, root) == ["Paris 2024"]
+
+    def test_updates_lists(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        olympiads = yaml.safe_load((root / "parameters/list_olympiads.yml").read_text())
+        committees = yaml.safe_load(
+            (root / "parameters/list_committees.yml").read_text()
+        )
+        assert olympiads[-1] == "Paris 2024"
+        assert "FRA" in committees
+
+    def test_adds_committee_columns(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        df = pd.read_parquet(
+            root / "data/total_medals_by_olympiad_and_committee.parquet"
+        )
+        assert df.loc[df["Olympiad"] == "Rio 2016", "FRA"].eq(0.0).all()
+        row = df[(df["Olympiad"] == "Paris 2024") & (df["Medal_type"] == "All")]
+        assert row["FRA"].item() == 2.0
+
+    def test_updates_all_totals(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        df = pd.read_parquet(root / "data/grouped_medals_olympiads.parquet")
+        usa = df[(df["Olympiad"] == "All") & (df["Committee"] == "USA")]
+        assert usa["Gold"].item() == 2
+        assert usa["Total"].item() == 4
+
+    def test_appends_source_rows(self, root, new_medals_csv):
+        source = root / "original_data" / "olympic_medals.csv"
+        rows = len(pd.read_csv(source))
+        append_medals(new_medals_csv, root)
+        assert len(pd.read_csv(source)) == rows + 3
+
+    def test_pipeline_is_up_to_date(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        results = run_pipeline(STEPS, root=root, manifest_path=MANIFEST)
+        assert not any(result.built for result in results)
+
+    def test_rejects_known_olympiads(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        with pytest.raises(ValueError, match="already in the data"):
+            append_medals(new_medals_csv, root)
+
+    def test_retry_after_failure_does_not_append_twice(
+        self, monkeypatch, root, new_medals_csv
+    ):
+        source = root / "original_data" / "olympic_medals.csv"
+        rows = len(pd.read_csv(source))
+
+        def fail(*arguments):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(append, "_append_medals_table", fail)
+        with pytest.raises(OSError):
+            append_medals(new_medals_csv, root)
+        monkeypatch.undo()
+        with pytest.raises(ValueError, match="already in the source file"):
+            append_medals(new_medals_csv, root)
+        assert len(pd.read_csv(source)) == rows + 3
+
+        run_pipeline(STEPS, root=root, manifest_path=MANIFEST)
+        assert verify_against_rebuild(root) == []
+
+    def test_failed_csv_append_leaves_source_unchanged(
+        self, monkeypatch, root, new_medals_csv
+    ):
+        source = root / "original_data" / "olympic_medals.csv"
+        content = source.read_bytes()
+
+        def fail(self, *arguments, **keywords):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(pd.DataFrame, "to_csv", fail)
+        with pytest.raises(OSError):
+            append_medals(new_medals_csv, root)
+        assert source.read_bytes() == content
+
+    def test_new_rows_in_row_groups_of_their_season(self, root, new_medals_csv):
+        append_medals(new_medals_csv, root)
+        medals = pq.ParquetFile(root / "data/olympic_medals.parquet")
+        last = medals.read_row_group(medals.num_row_groups - 1).to_pandas()
+        assert set(last["Olympic_season"]) == {"summer"}
+        assert last["Olympiad"].iloc[-1] == "Paris 2024"
+
+    def test_rejects_other_columns(self, root, tmp_path):
+        path = tmp_path / "bad.csv"
+        pd.DataFrame({"Olympiad": ["Paris 2024"]}).to_csv(path, index=False)
+        with pytest.raises(ValueError, match="differ from the source file"):
+            append_medals(path, root)
+
+
+class TestVerifyAgainstRebuild:
+    def test_detects_differences(self, root):
+        path = root / "parameters/list_committees.yml"
+        path.write_text(yaml.dump(["XXX"]))
+        assert verify_against_rebuild(root) == ["parameters/list_committees.yml"]
@@ -0,0 +1,239 @@
+"""
+Tests for page_utils.async_charts (heavy figures computed in the background),
+with a Taipy app serving a session.
+"""
+
+import inspect
+import threading
+import time
+
+import plotly.graph_objects as go
+import pytest
+import taipy.gui.builder as tgb
+from taipy.gui import Gui
+
+from algorithms import SeasonFigures
+from cache import figure_cache, memoize_figure
+from page_utils import async_charts
+from page_utils.async_charts import (
+    ERROR_FIGURE,
+    PLACEHOLDER_FIGURE,
+    StateChart,
+    refresh_charts,
+)
+
+TIMEOUT = 10
+
+
+class BlockingChart:
+    """Chart object whose figures are computed once their committee is
+    released."""
+
+    def __init__(self):
+        self._released = {}
+        self._lock = threading.Lock()
+
+    def release(self, committee):
+        self._event(committee).set()
+
+    @memoize_figure
+    def plot(self, committee):
+        assert self._event(committee).wait(TIMEOUT)
+        if committee == "Unknown":
+            raise KeyError(committee)
+        return go.Figure(layout=dict(title=dict(text=committee)))
+
+    @memoize_figure
+    def plot_seasons(self, committee):
+        assert self._event(committee).wait(TIMEOUT)
+        return SeasonFigures(
+            *(
+                go.Figure(layout=dict(title=dict(text=f"{committee} | {season}")))
+                for season in ("summer", "winter")
+            )
+        )
+
+    def _event(self, committee):
+        with self._lock:
+            return self._released.setdefault(committee, threading.Event())
+
+
+CHART = StateChart(
+    ("figure",),
+    "chart",
+    "plot",
+    ("committee",),
+    is_heavy=lambda committee: committee != "Light",
+)
+SEASONS_CHART = StateChart(
+    ("summer", "winter"), "chart", "plot_seasons", ("committee",)
+)
+
+
+def create_gui(chart):
+    """App with charts bound to the figures of `CHART` and `SEASONS_CHART`."""
+    data_version = "v1"  # noqa: F841 (bound by the page)
+    committee = "France"  # noqa: F841
+    figure = PLACEHOLDER_FIGURE  # noqa: F841
+    summer = PLACEHOLDER_FIGURE  # noqa: F841
+    winter = PLACEHOLDER_FIGURE  # noqa: F841
+    with tgb.Page() as page:
+        tgb.chart(figure="{figure}")
+        tgb.chart(figure="{summer}")
+        tgb.chart(figure="{winter}")
+    gui = Gui(pages={"committee": page})
+    gui._set_frame(inspect.currentframe())
+    gui.run(run_server=False, single_client=False, stylekit=False)
+    return gui
+
+
+@pytest.fixture
+def chart(monkeypatch):
+    monkeypatch.setattr(async_charts, "STATE_CHARTS", (CHART,))
+    monkeypatch.setattr(async_charts, "ASYNC_CHARTS", True)
+    yield BlockingChart()
+    figure_cache.clear()
+
+
+@pytest.fixture
+def ready(monkeypatch):
+    """Committees whose figure was handed to the session, after its
+    computation in the background."""
+    ready = []
+    on_figure_ready = async_charts._on_figure_ready
+
+    # Taipy passes as many arguments as the callback has parameters
+    def record(state, status, chart, arguments, data_version, figure):
+        on_figure_ready(state, status, chart, arguments, data_version, figure)
+        ready.append(arguments[0])
+
+    monkeypatch.setattr(async_charts, "_on_figure_ready", record)
+    return ready
+
+
+@pytest.fixture
+def session(chart):
+    """The scope of a session of the app, and a function that runs a callback
+    in the session."""
+    gui = create_gui(chart)
+    gui._bindings()._get_or_create_scope("client")
+    gui._server.test_client().get(
+        "/taipy-jsx/committee", query_string={"client_id": "client"}
+    )
+    scope = gui._bindings()._get_all_scopes()["client"]
+
+    def select(**values):
+        gui.invoke_callback("client", _select, [values])
+
+    return scope, select
+
+
+def _select(state, values):
+    with state as s:
+        for name, value in values.items():
+            setattr(s, name, value)
+        refresh_charts(s, set(values))
+
+
+def _title(scope):
+    return scope.figure.layout.title.text
+
+
+def _wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestRefreshCharts:
+    def test_light_figure_is_computed_in_the_callback(self, chart, session):
+        scope, select = session
+        chart.release("Light")
+        select(committee="Light")
+        assert _title(scope) == "Light"
+
+    def test_heavy_figure_is_computed_in_the_background(self, chart, session, ready):
+        scope, select = session
+        select(committee="Norway")
+        assert scope.figure is PLACEHOLDER_FIGURE
+        chart.release("Norway")
+        _wait_until(lambda: ready == ["Norway"])
+        assert _title(scope) == "Norway"
+
+    def test_stale_figure_is_discarded(self, chart, session, ready):
+        scope, select = session
+        select(committee="Norway")
+        select(committee="Italy")
+        chart.release("Norway")
+        _wait_until(lambda: ready == ["Norway"])
+        assert scope.figure is PLACEHOLDER_FIGURE
+        chart.release("Italy")
+        _wait_until(lambda: ready == ["Norway", "Italy"])
+        assert _title(scope) == "Italy"
+
+    def test_figure_of_new_data_is_discarded(self, chart, session, ready):
+        scope, select = session
+        select(committee="Norway")
+        select(data_version="v2")
+        chart.release("Norway")
+        _wait_until(lambda: ready == ["Norway"])
+        assert scope.figure is PLACEHOLDER_FIGURE
+
+    def test_failed_figure_shows_an_error(self, chart, session, ready, caplog):
+        scope, select = session
+        select(committee="Unknown")
+        chart.release("Unknown")
+        _wait_until(lambda: ready == ["Unknown"])
+        assert scope.figure is ERROR_FIGURE
+        assert "Could not compute plot('Unknown',)" in caplog.text
+
+    def test_cached_figure_is_shown_right_away(self, chart, session):
+        scope, select = session
+        chart.release("Norway")
+        chart.plot("Norway")
+        select(committee="Norway")
+        assert _title(scope) == "Norway"
+
+    def test_synchronous_mode(self, monkeypatch, chart, session):
+        monkeypatch.setattr(async_charts, "ASYNC_CHARTS", False)
+        scope, select = session
+        chart.release("Norway")
+        select(committee="Norway")
+        assert _title(scope) == "Norway"
+
+    def test_season_figures_are_computed_together(
+        self, monkeypatch, chart, session, ready
+    ):
+        monkeypatch.setattr(async_charts, "STATE_CHARTS", (SEASONS_CHART,))
+        scope, select = session
+        select(committee="Norway")
+        assert scope.summer is scope.winter is PLACEHOLDER_FIGURE
+        chart.release("Norway")
+        _wait_until(lambda: ready == ["Norway"])
+        assert scope.summer.layout.title.text == "Norway | summer"
+        assert scope.winter.layout.title.text == "Norway | winter"
+
+    def test_unrelated_variables_keep_the_figure(self, chart, session):
+        scope, select = session
+        select(data_version="v2")
+        assert scope.figure is PLACEHOLDER_FIGURE
+
+
+class TestStateCharts:
+    def test_heavy_charts(self):
+        charts = {chart.figures[0]: chart for chart in async_charts.STATE_CHARTS}
+        assert charts["medals_grid_summer"].is_heavy("France")
+        assert charts["sunburst_medals"].is_heavy("All")
+        assert not charts["sunburst_medals"].is_heavy("Paris 2024")
+        committees = ["France", "Italy", "Norway", "Japan", "Kenya"]
+        assert charts["medals_by_country_summer"].is_heavy(committees, "All", "Total")
+        assert not charts["medals_by_country_summer"].is_heavy(
+            committees[:2], "All", "Total"
+        )
+
+    def test_figures_are_unique(self):
+        figures = [
+            name for chart in async_charts.STATE_CHARTS for name in chart.figures
+        ]
+        assert len(figures) == len(set(figures))
@@ -0,0 +1,135 @@
+"""
+Tests for algorithms.bitmap_index (bitsets of the values of the dimensions of
+the medals table).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from algorithms.bitmap_index import Bitmap, BitmapIndex
+from algorithms.create_medal_by_olympic_and_discipline import (
+    MedalsByOlympicAndDiscipline,
+)
+
+DIMENSIONS = ["Olympiad", "Olympic_season", "Committee", "Discipline", "Gender"]
+
+
+@pytest.fixture(params=["object", "category"])
+def df_medals(request, df_olympic_medals):
+    """The medals fixture repeated to span several 64-bit words, with object or
+    categorical columns."""
+    df = pd.concat([df_olympic_medals] * 30, ignore_index=True)
+    if request.param == "category":
+        df = df.astype({column: "category" for column in DIMENSIONS})
+    return df
+
+
+@pytest.fixture
+def index(df_medals):
+    return BitmapIndex.from_frame(df_medals, DIMENSIONS)
+
+
+class TestBitmap:
+    def test_from_mask(self):
+        mask = np.arange(100) % 3 == 0
+        bitmap = Bitmap.from_mask(mask)
+        assert bitmap.count() == mask.sum()
+        np.testing.assert_array_equal(bitmap.mask(), mask)
+        np.testing.assert_array_equal(bitmap.rows(), np.flatnonzero(mask))
+
+    def test_operators(self):
+        a, b = np.arange(70) % 2 == 0, np.arange(70) % 3 == 0
+        bitmap_a, bitmap_b = Bitmap.from_mask(a), Bitmap.from_mask(b)
+        np.testing.assert_array_equal((bitmap_a & bitmap_b).mask(), a & b)
+        np.testing.assert_array_equal((bitmap_a | bitmap_b).mask(), a | b)
+        np.testing.assert_array_equal((~bitmap_a).mask(), ~a)
+
+    def test_invert_ignores_the_bits_after_the_last_row(self):
+        assert (~Bitmap.empty(70)).count() == 70
+        assert Bitmap.full(64).count() == 64
+
+    def test_different_tables(self):
+        with pytest.raises(ValueError, match="different tables"):
+            Bitmap.empty(10) & Bitmap.empty(11)
+
+
+class TestBitmapIndex:
+    @pytest.mark.parametrize("column", DIMENSIONS)
+    def test_bitmap_of_each_value(self, index, df_medals, column):
+        for value in df_medals[column].unique():
+            expected = (df_medals[column] == value).to_numpy()
+            np.testing.assert_array_equal(index.bitmap(column, value).mask(), expected)
+
+    def test_where_conjunction_and_disjunction(self, index, df_medals):
+        filters = {"Olympic_season": "summer", "Committee": ["USA", "GBR"]}
+        expected = (df_medals["Olympic_season"] == "summer") & df_medals[
+            "Committee"
+        ].isin(["USA", "GBR"])
+        selection = index.where(filters)
+        np.testing.assert_array_equal(selection.rows(), np.flatnonzero(expected))
+        assert index.count(filters) == expected.sum()
+
+    def test_combined_bitmaps(self, index, df_medals):
+        selection = index.bitmap("Gender", "Women") | ~index.bitmap(
+            "Olympic_season", "summer"
+        )
+        expected = (df_medals["Gender"] == "Women") | (
+            df_medals["Olympic_season"] != "summer"
+        )
+        np.testing.assert_array_equal(selection.mask(), expected.to_numpy())
+
+    def test_unknown_value(self, index):
+        assert index.count({"Committee": "XYZ"}) == 0
+
+    def test_unknown_column(self, index):
+        with pytest.raises(KeyError, match="Medal_type"):
+            index.where({"Medal_type": "Gold"})
+
+    def test_no_filters(self, index, df_medals):
+        assert index.count() == len(df_medals)
+
+    def test_value_counts(self, index, df_medals):
+        selection = index.where({"Olympic_season": "summer"})
+        counts = index.value_counts("Committee", selection)
+        expected = (
+            df_medals.loc[df_medals["Olympic_season"] == "summer", "Committee"]
+            .value_counts()
+            .reindex(counts.index, fill_value=0)
+        )
+        np.testing.assert_array_equal(counts.to_numpy(), expected.to_numpy())
+
+    def test_take(self, index, df_medals):
+        df = index.take(df_medals, {"Olympic_season": "winter"})
+        pd.testing.assert_frame_equal(
+            df, df_medals[df_medals["Olympic_season"] == "winter"]
+        )
+
+    def test_take_from_another_table(self, index, df_medals):
+        with pytest.raises(ValueError, match="rows"):
+            index.take(df_medals.iloc[:10], {"Olympic_season": "winter"})
+
+    def test_dimensions_are_built_on_first_use(self, df_medals):
+        reads = []
+
+        def read_column(column):
+            reads.append(column)
+            return df_medals[column]
+
+        index = BitmapIndex(DIMENSIONS, len(df_medals), read_column)
+        index.where({"Gender": "Men"})
+        index.where({"Gender": "Women", "Olympiad": "Rio 2016"})
+        assert reads == ["Gender", "Olympiad"]
+
+
+class TestMedalsGridWithIndex:
+    def test_same_grids(self, index, df_medals):
+        reference = MedalsByOlympicAndDiscipline(df_medals)
+        indexed = MedalsByOlympicAndDiscipline(df_medals, medals_index=index)
+        for season in ["summer", "winter"]:
+            np.testing.assert_array_equal(
+                indexed._grids[season].medals, reference._grids[season].medals
+            )
+            assert indexed._grids[season].olympiads.equals(
+                reference._grids[season].olympiads
+            )
@@ -0,0 +1,151 @@
+"""Tests for src/cache/bundle.py and src/cache/serialization.py"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from algorithms import SeasonFigures
+from algorithms.create_medal_by_olympic_and_discipline import (
+    MedalsByOlympicAndDiscipline,
+)
+from algorithms.create_medals_by_olympics import MedalsByOlympics
+from cache.bundle import (
+    DEFAULT_COMMITTEES,
+    _write_atomically,
+    bundle_path,
+    enumerate_chart_calls,
+    load_bundle,
+)
+from cache.memoize import FigureCache, make_cache_key, set_cache_namespace
+from cache.serialization import dump_value, load_value
+from cache.version import CODE_VERSION
+from loaders import ChartAlgorithms
+
+
+class TestSerialization:
+    """Tests for dump_value and load_value."""
+
+    def test_figure_round_trip(self, df_grouped_medals_olympiads):
+        figure = MedalsByOlympics(
+            df_grouped_medals_olympiads
+        ).create_medals_by_olympics("Rio 2016")
+        loaded = load_value(dump_value(figure))
+        assert isinstance(loaded, go.Figure)
+        assert json.loads(loaded.to_json()) == json.loads(figure.to_json())
+
+    def test_season_figures_round_trip(self, df_olympic_medals):
+        figures = MedalsByOlympicAndDiscipline(df_olympic_medals).plot_medals_grids(
+            "USA"
+        )
+        loaded = load_value(dump_value(figures))
+        assert isinstance(loaded, SeasonFigures)
+        assert all(figure.has_payload for figure in loaded)
+        assert loaded.winter.to_json() == figures.winter.to_json()
+
+    def test_other_values_round_trip(self):
+        assert load_value(dump_value({"a": [1, 2]})) == {"a": [1, 2]}
+
+
+class TestEnumerateChartCalls:
+    """Tests for enumerate_chart_calls."""
+
+    def test_covers_every_chart(self):
+        calls = enumerate_chart_calls(["All", "Rio 2016"], ["France", "Italy"])
+        chart_names = {chart_name for chart_name, _, _ in calls}
+        assert chart_names == {name for name, _ in _chart_fields()}
+
+    def test_methods_exist(self):
+        calls = enumerate_chart_calls(["All"], ["France"])
+        for chart_name, method_name, _ in calls:
+            chart_class = ChartAlgorithms.__annotations__[chart_name]
+            assert callable(getattr(chart_class, method_name))
+
+    def test_number_of_calls(self):
+        calls = enumerate_chart_calls(["All", "Rio 2016"], ["France", "Italy"])
+        # 3 seasons + 12 maps, 2 x 2 Olympiads, (1 + 2) x 4 x 2 comparisons (both
+        # seasons), 2 grids (both seasons)
+        assert len(calls) == 15 + 4 + 24 + 2
+
+    def test_default_comparison_is_included(self):
+        calls = enumerate_chart_calls([], ["France"])
+        assert any(
+            arguments.get("committee_list") == DEFAULT_COMMITTEES
+            for _, _, arguments in calls
+        )
+
+
+class TestFigureBundle:
+    """Tests for FigureBundle and load_bundle."""
+
+    def test_get_loads_figures(self, tmp_path, df_grouped_medals_olympiads):
+        chart = MedalsByOlympics(df_grouped_medals_olympiads)
+        set_cache_namespace(chart, "version")
+        figure = chart.create_medals_by_olympics("Rio 2016")
+        key = make_cache_key(chart, "create_medals_by_olympics", "Rio 2016")
+        bundle = _bundle(tmp_path, {key: figure})
+
+        assert json.loads(bundle.get(key).to_json()) == json.loads(figure.to_json())
+        assert bundle.get("missing", "default") == "default"
+        assert key in bundle and "missing" not in bundle
+
+    def test_put_does_not_add_figures(self, tmp_path):
+        bundle = _bundle(tmp_path, {})
+        bundle.put("key", "value")
+        assert len(bundle) == 0
+
+    def test_figures_are_read_when_asked_for(self, tmp_path, monkeypatch):
+        bundle = _bundle(tmp_path, {"a": "first", "b": "second"})
+        loaded = []
+        monkeypatch.setattr(
+            "cache.bundle.load_value", lambda data: loaded.append(data) or data
+        )
+        bundle.get("a")
+        assert loaded == [dump_value("first")]
+
+    def test_reads_from_several_threads(self, tmp_path):
+        bundle = _bundle(tmp_path, {"key": "value"})
+        with ThreadPoolExecutor(4) as executor:
+            values = list(executor.map(lambda _: bundle.get("key"), range(8)))
+        assert values == ["value"] * 8
+
+    def test_load_bundle_of_other_version_returns_none(self, tmp_path):
+        _write_atomically(bundle_path(tmp_path, "v1", "c1"), "v1", "c1", [])
+        assert load_bundle(tmp_path, "v2", "c1") is None
+        assert load_bundle(tmp_path, "v1", "c2") is None
+
+    def test_bundle_path_has_both_versions(self, tmp_path):
+        assert bundle_path(tmp_path, "v1", "c1").name == "figures-v1-c1.sqlite"
+
+    def test_load_bundle_of_other_code_returns_none(self, tmp_path):
+        # A bundle file renamed after the current code version
+        _write_atomically(bundle_path(tmp_path, "v1", "c2"), "v1", "c1", [])
+        assert load_bundle(tmp_path, "v1", "c2") is None
+
+    def test_load_bundle_of_other_format_returns_none(self, tmp_path):
+        bundle_path(tmp_path, "v1").write_bytes(b"not a bundle")
+        assert load_bundle(tmp_path, "v1") is None
+
+    def test_load_bundle(self, tmp_path):
+        bundle = _bundle(tmp_path, {"key": "value"})
+        assert bundle.data_version == "v1"
+        assert bundle.get("key") == "value"
+        assert len(bundle) == 1
+        assert list(tmp_path.iterdir()) == [bundle_path(tmp_path, "v1")]
+
+    def test_bundle_serves_cache_misses(self, tmp_path):
+        cache = FigureCache()
+        cache.add_store(_bundle(tmp_path, {"key": "value"}))
+        assert cache.get_or_compute("key", lambda: "computed") == "value"
+
+
+def _bundle(bundle_dir, values):
+    """Write a bundle of `values` (by cache key) for data version "v1", and
+    open it."""
+    rendered = [(key, dump_value(value)) for key, value in values.items()]
+    _write_atomically(bundle_path(bundle_dir, "v1"), "v1", CODE_VERSION, [rendered])
+    return load_bundle(bundle_dir, "v1")
+
+
+def _chart_fields():
+    return ChartAlgorithms.__annotations__.items()
@@ -4,11 +4,16 @@ Chart-rendering methods (_plot_medals_grid_common, _plot_grid_for_country)
 are excluded.
 """
 
+import json
+
+import numpy as np
 import pandas as pd
 
 from algorithms.create_medal_by_olympic_and_discipline import (
     MedalsByOlympicAndDiscipline,
 )
+from loaders.sources import open_parquet_source
+from transformation.layout import write_medals_parquet
 
 # ---------------------------------------------------------------------------
 # Tests
@@ -16,22 +21,22 @@ from algorithms.create_medal_by_olympic_and_discipline import (
 
 
 class TestFilterOlympicSeason:
-    """Tests for MedalsByOlympicAndDiscipline._filter_olympic_season."""
+    """Tests for MedalsByOlympicAndDiscipline._select_olympic_season."""
 
     def test_summer_filter_returns_only_summer_rows(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        result = obj._filter_olympic_season(df_olympic_medals, "summer")
+        result = obj._select_olympic_season(df_olympic_medals, "summer")
         assert all(result["Olympic_season"] == "summer")
 
     def test_winter_filter_returns_only_winter_rows(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        result = obj._filter_olympic_season(df_olympic_medals, "winter")
+        result = obj._select_olympic_season(df_olympic_medals, "winter")
         assert all(result["Olympic_season"] == "winter")
 
     def test_summer_and_winter_are_exhaustive(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        summer = obj._filter_olympic_season(df_olympic_medals, "summer")
-        winter = obj._filter_olympic_season(df_olympic_medals, "winter")
+        summer = obj._select_olympic_season(df_olympic_medals, "summer")
+        winter = obj._select_olympic_season(df_olympic_medals, "winter")
         assert len(summer) + len(winter) == len(df_olympic_medals)
 
 
@@ -63,26 +68,26 @@ class TestPivotOlympicByDiscipline:
 
     def test_pivot_returns_dataframe(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        df_summer = obj._filter_olympic_season(df_olympic_medals, "summer")
+        df_summer = obj._select_olympic_season(df_olympic_medals, "summer")
         result = obj._pivot_olympic_by_discipline(df_summer)
         assert isinstance(result, pd.DataFrame)
 
     def test_pivot_columns_are_disciplines(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        df_summer = obj._filter_olympic_season(df_olympic_medals, "summer")
+        df_summer = obj._select_olympic_season(df_olympic_medals, "summer")
         result = obj._pivot_olympic_by_discipline(df_summer)
         assert result.columns.name == "Discipline"
 
     def test_pivot_index_contains_olympiad_and_year(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        df_summer = obj._filter_olympic_season(df_olympic_medals, "summer")
+        df_summer = obj._select_olympic_season(df_olympic_medals, "summer")
         result = obj._pivot_olympic_by_discipline(df_summer)
         assert "Olympiad" in result.index.names
         assert "Olympic_year" in result.index.names
 
     def test_pivot_values_are_non_negative_integers(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        df_summer = obj._filter_olympic_season(df_olympic_medals, "summer")
+        df_summer = obj._select_olympic_season(df_olympic_medals, "summer")
         result = obj._pivot_olympic_by_discipline(df_summer)
         assert (result >= 0).all().all()
 
@@ -92,32 +97,95 @@ class TestCreateMedalsGrid:
 
     def test_grid_filters_to_requested_committee(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        result = obj._create_medals_grid(
-            obj.df_summer, obj.summer_disciplines, committee="USA"
-        )
+        result = obj._create_medals_grid("summer", committee="USA")
         # All rows in the pivot correspond to olympiads where USA participated
         # There should be at least one non-zero entry for USA's disciplines
         assert result.sum().sum() > 0
 
     def test_grid_contains_all_disciplines_as_columns(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        result = obj._create_medals_grid(
-            obj.df_summer, obj.summer_disciplines, committee="USA"
-        )
+        result = obj._create_medals_grid("summer", committee="USA")
         assert set(obj.summer_disciplines).issubset(set(result.columns))
 
     def test_grid_fills_missing_disciplines_with_zero(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
         # GBR only has Swimming in the fixture; Athletics should be 0
-        result = obj._create_medals_grid(
-            obj.df_summer, obj.summer_disciplines, committee="GBR"
-        )
+        result = obj._create_medals_grid("summer", committee="GBR")
         assert "Athletics" in result.columns
         assert result["Athletics"].sum() == 0
 
     def test_unknown_committee_returns_all_zeros(self, df_olympic_medals):
         obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
-        result = obj._create_medals_grid(
-            obj.df_summer, obj.summer_disciplines, committee="XYZ"
-        )
+        result = obj._create_medals_grid("summer", committee="XYZ")
         assert result.empty or result.sum().sum() == 0
+
+    def test_grid_matches_pivot_of_committee_rows(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        df_summer = obj._select_olympic_season(df_olympic_medals, "summer")
+        expected = (
+            obj._pivot_olympic_by_discipline(df_summer[df_summer["Committee"] == "USA"])
+            .droplevel("Committee")
+            .reindex(columns=obj.summer_disciplines, fill_value=0)
+        )
+        result = obj._create_medals_grid("summer", committee="USA")
+        assert list(result.index) == list(expected.index)
+        assert (result.to_numpy() == expected.to_numpy()).all()
+
+    def test_grid_rows_are_sorted_by_year(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        result = obj._create_medals_grid("summer", committee="USA")
+        years = list(result.index.get_level_values("Olympic_year"))
+        assert years == sorted(years)
+
+
+class TestSeasonMedalsGrid:
+    """Tests for the medal tensors built on __init__."""
+
+    def test_tensor_shape(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        grid = obj._grids["summer"]
+        # 4 committees x 2 summer olympiads x 3 summer disciplines
+        assert grid.medals.shape == (4, 2, 3)
+
+    def test_tensor_counts_every_medal_once(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        total = sum(grid.medals.sum() for grid in obj._grids.values())
+        assert total == len(df_olympic_medals)
+
+    def test_seasons_from_a_parquet_table(self, tmp_path, df_olympic_medals):
+        df = df_olympic_medals.sort_values("Olympic_season", ignore_index=True)
+        df = df.astype({"Committee": "category", "Discipline": "category"})
+        write_medals_parquet(df, tmp_path / "olympic_medals.parquet")
+        table = open_parquet_source(tmp_path / "olympic_medals.parquet")
+
+        reference = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        obj = MedalsByOlympicAndDiscipline(table.parquet_table())
+        assert obj.medals_index is None
+        for season in ["summer", "winter"]:
+            np.testing.assert_array_equal(
+                obj._grids[season].medals, reference._grids[season].medals
+            )
+            assert list(obj._grids[season].disciplines) == list(
+                reference._grids[season].disciplines
+            )
+
+    def test_medal_frames_are_not_kept(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        assert not any(isinstance(v, pd.DataFrame) for v in vars(obj).values())
+
+
+class TestPlotMedalsGrids:
+    """Tests for MedalsByOlympicAndDiscipline.plot_medals_grids."""
+
+    def test_same_figures_as_each_season(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        figures = obj.plot_medals_grids("USA")
+        summer = obj.plot_medals_grid_summer("USA")
+        winter = obj.plot_medals_grid_winter("USA")
+        assert json.loads(figures.summer.to_json()) == json.loads(summer.to_json())
+        assert json.loads(figures.winter.to_json()) == json.loads(winter.to_json())
+
+    def test_unknown_committee_has_empty_grids(self, df_olympic_medals):
+        obj = MedalsByOlympicAndDiscipline(df_olympic_medals)
+        figures = obj.plot_medals_grids("XYZ")
+        assert all(len(figure.data[0].y) == 0 for figure in figures)
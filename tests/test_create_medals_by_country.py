@@ -8,7 +8,10 @@ assertions therefore check row counts against the original DataFrame rather
 than inspecting the result columns directly.
 """
 
+import json
+
 import pandas as pd
+import pytest
 
 from algorithms.create_medals_by_country import MedalsByCountry
 
@@ -91,7 +94,9 @@ class TestComputePercentage:
         row_sums = result["USA"] + result["GBR"]
         assert (row_sums <= 100 + 1e-6).all()
 
-    def test_percentage_handles_zero_total_medals(self):
+    def test_percentage_handles_zero_total_medals(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
         """When Total_medals is 0, percentage should be 0 (fillna(0))."""
         df = pd.DataFrame(
             {
@@ -101,7 +106,7 @@ class TestComputePercentage:
                 "USA": [0],
             }
         )
-        obj = MedalsByCountry(df)
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
         result = obj._compute_percentage(df.copy(), ["USA"])
         assert result["USA"].iloc[0] == 0.0
 
@@ -126,3 +131,104 @@ class TestComputeMedalsByCommittee:
         pct = obj._compute_medals_by_committee(["USA"], "summer", "All", "Percentage")
         assert (pct["USA"] <= 100).all()
         assert not raw["USA"].equals(pct["USA"])
+
+
+class TestSelection:
+    """Tests for the rows selected by MedalsByCountry._filter_seasons."""
+
+    def test_table_is_not_copied(self, df_total_medals_by_olympiad_and_committee):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        assert obj.df_total_medals is df_total_medals_by_olympiad_and_committee
+
+    def test_committees_exclude_metadata_columns(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        assert list(obj.committees) == ["USA", "GBR"]
+
+    def test_slice_matches_frame_filter(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
+        df = df_total_medals_by_olympiad_and_committee
+        obj = MedalsByCountry(df)
+        result = obj._filter_dataset(["GBR", "USA"], "summer", "Gold")
+        expected = df[
+            (df["Olympic_season"] == "summer") & (df["Medal_type"] == "Gold")
+        ][["Olympic_year", "Olympiad", "Total_medals", "GBR", "USA"]]
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_percentage_matches_row_by_row_computation(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        result = obj._compute_medals_by_committee(
+            ["USA", "GBR"], "winter", "All", "Percentage"
+        )
+        # PyeongChang 2018: USA 10 and GBR 5 medals out of 100
+        assert result["USA"].tolist() == [10.0]
+        assert result["GBR"].tolist() == [5.0]
+
+    def test_unknown_season_returns_empty(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        result = obj._filter_dataset(["USA"], "autumn", "All")
+        assert result.empty
+        assert "USA" in result.columns
+
+    def test_unknown_committee_raises_key_error(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        with pytest.raises(KeyError, match="XYZ"):
+            obj._filter_dataset(["USA", "XYZ"], "summer", "All")
+
+
+class TestSeasonFigures:
+    """Tests for MedalsByCountry.create_medals_by_country_seasons."""
+
+    @pytest.mark.parametrize("percentage", ["Total", "Percentage"])
+    def test_same_figures_as_each_season(
+        self, df_total_medals_by_olympiad_and_committee, percentage
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        figures = obj.create_medals_by_country_seasons(
+            ["USA", "GBR"], "All", percentage
+        )
+        summer = obj.create_medals_by_country_summer(["USA", "GBR"], "All", percentage)
+        winter = obj.create_medals_by_country_winter(["USA", "GBR"], "All", percentage)
+        assert json.loads(figures.summer.to_json()) == json.loads(summer.to_json())
+        assert json.loads(figures.winter.to_json()) == json.loads(winter.to_json())
+
+    def test_committees_are_looked_up_once(
+        self, df_total_medals_by_olympiad_and_committee, monkeypatch
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        lookups = []
+        check_committees = obj._check_committees
+        monkeypatch.setattr(
+            obj,
+            "_check_committees",
+            lambda committees: (
+                lookups.append(committees) or check_committees(committees)
+            ),
+        )
+        obj.create_medals_by_country_seasons(["USA"], "Gold", "Total")
+        assert lookups == [["USA"]]
+
+
+class TestCommitteeOrder:
+    """Figures of the same committees in another order are not shared."""
+
+    def test_traces_follow_the_order_of_the_list(
+        self, df_total_medals_by_olympiad_and_committee
+    ):
+        obj = MedalsByCountry(df_total_medals_by_olympiad_and_committee)
+        first = obj.create_medals_by_country_summer(["USA", "GBR"], "All", "Total")
+        second = obj.create_medals_by_country_summer(["GBR", "USA"], "All", "Total")
+        assert first is not second
+        assert [trace.name for trace in first.data] == ["USA", "GBR"]
+        assert [trace.name for trace in second.data] == ["GBR", "USA"]
+        colors = obj.line_colors[:2]
+        assert [trace.line.color for trace in first.data] == colors
+        assert [trace.line.color for trace in second.data] == colors
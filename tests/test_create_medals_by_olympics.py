@@ -4,6 +4,7 @@ Chart-rendering methods (_plot_by_committee) are excluded.
 """
 
 import pandas as pd
+import pytest
 
 from algorithms.create_medals_by_olympics import MedalsByOlympics
 
@@ -43,18 +44,46 @@ class TestComputeDataByOlympics:
         assert list(df_grouped_medals_olympiads.columns) == original_cols
 
 
-class TestGenerateDataByOlympics:
-    """Tests for the error-handling wrapper _generate_data_by_olympics."""
+class TestPartitionByOlympiad:
+    """Tests for the per-Olympiad blocks built by _partition_by_olympiad."""
 
-    def test_returns_empty_dataframe_on_error(self):
-        bad_df = pd.DataFrame({"no_olympiad_col": [1, 2]})
-        obj = MedalsByOlympics(bad_df)
-        result = obj._generate_data_by_olympics("Rio 2016")
+    def test_one_block_per_olympiad(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        assert len(obj._blocks) == df_grouped_medals_olympiads["Olympiad"].nunique()
+
+    def test_blocks_only_keep_plot_columns(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        result = obj._compute_data_by_olympics("Rio 2016")
+        assert list(result.columns) == ["Committee", "Gold", "Silver", "Bronze"]
+
+    def test_lookup_does_not_copy(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        first = obj._compute_data_by_olympics("Rio 2016")
+        second = obj._compute_data_by_olympics("Rio 2016")
+        assert first is second
+
+    def test_blocks_are_read_only(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        result = obj._compute_data_by_olympics("Rio 2016")
+        with pytest.raises(ValueError, match="read-only"):
+            result.loc[0, "Gold"] = 0
+
+    def test_unknown_olympiad_returns_empty_frame_with_columns(
+        self, df_grouped_medals_olympiads
+    ):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        result = obj._compute_data_by_olympics("Narnia 1900")
         assert isinstance(result, pd.DataFrame)
         assert result.empty
+        assert list(result.columns) == ["Committee", "Gold", "Silver", "Bronze"]
+
+    def test_missing_olympiad_column_raises(self):
+        bad_df = pd.DataFrame({"no_olympiad_col": [1, 2]})
+        with pytest.raises(KeyError):
+            MedalsByOlympics(bad_df)
 
     def test_returns_correct_data_on_success(self, df_grouped_medals_olympiads):
         obj = MedalsByOlympics(df_grouped_medals_olympiads)
-        result = obj._generate_data_by_olympics("Tokyo 2020")
+        result = obj._compute_data_by_olympics("Tokyo 2020")
         assert len(result) == 1
         assert result.iloc[0]["Committee"] == "USA"
@@ -1,6 +1,6 @@
 """Tests for src/algorithms/create_medals_by_season.py
 
-Chart-rendering methods (_plot_bar_medal_season, _add_stockholm_annotation)
+Chart-rendering methods (_plot_bar_medal_season, _make_template)
 are intentionally excluded.
 """
 
@@ -31,6 +31,13 @@ class TestMedalsBySeasonFilterSeason:
         result = obj._filter_season("summer")
         assert list(result.index) == list(range(len(result)))
 
+    def test_filter_season_matches_a_boolean_mask(self, df_medals_season):
+        obj = MedalsBySeason(df_medals_season)
+        expected = df_medals_season[df_medals_season["Olympic_season"] == "winter"]
+        pd.testing.assert_frame_equal(
+            obj._filter_season("winter"), expected.reset_index(drop=True)
+        )
+
     def test_compute_medals_all_returns_full_dataframe(self, df_medals_season):
         obj = MedalsBySeason(df_medals_season)
         result = obj._compute_medals_by_season("All")
@@ -3,6 +3,8 @@
 Chart-rendering methods (_plot_sunburst_medals) are excluded.
 """
 
+import numpy as np
+
 from algorithms.create_sunburst import SunburstByGender
 
 # ---------------------------------------------------------------------------
@@ -10,31 +12,63 @@ from algorithms.create_sunburst import SunburstByGender
 # ---------------------------------------------------------------------------
 
 
-class TestMakeInitialSunburst:
-    """Tests for SunburstByGender._make_initial_sunburst."""
+def _nodes(obj, hierarchy):
+    """Map node ids to (parent, value) for readable assertions."""
+    idx = hierarchy.node_idx
+    return {
+        node_id: (parent, value)
+        for node_id, parent, value in zip(
+            obj.node_ids[idx], obj.node_parents[idx], hierarchy.counts
+        )
+    }
+
+
+class TestMakeHierarchies:
+    """Tests for SunburstByGender._make_hierarchies."""
 
-    def test_output_contains_required_columns(self, df_olympic_medals):
+    def test_hierarchies_exist_for_each_olympiad_and_all(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
-        for col in ("Olympiad", "Gender", "Discipline", "Event"):
-            assert col in obj.df_sunburst.columns
+        expected = set(df_olympic_medals["Olympiad"]) | {"All"}
+        assert set(obj.hierarchies) == expected
 
-    def test_output_has_no_extra_columns(self, df_olympic_medals):
+    def test_node_ids_follow_gender_discipline_event_path(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
-        assert set(obj.df_sunburst.columns) == {
-            "Olympiad",
-            "Gender",
-            "Discipline",
-            "Event",
-        }
+        nodes = _nodes(obj, obj.hierarchies["All"])
+        assert nodes["Men/Athletics/100m"] == ("Men/Athletics", 2)
+        assert nodes["Men/Athletics"] == ("Men", 2)
+        assert nodes["Men"] == ("", 3)
 
-    def test_all_values_are_strings(self, df_olympic_medals):
+    def test_root_values_add_up_to_row_count(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
-        for col in obj.df_sunburst.columns:
-            assert obj.df_sunburst[col].dtype == object  # str dtype is 'object'
+        nodes = _nodes(obj, obj.hierarchies["All"])
+        roots = [value for parent, value in nodes.values() if parent == ""]
+        assert sum(roots) == len(df_olympic_medals)
 
-    def test_row_count_matches_input(self, df_olympic_medals):
+    def test_leaves_come_before_their_parents(self, df_olympic_medals):
+        obj = SunburstByGender(df_olympic_medals)
+        ids = list(obj.node_ids[obj.hierarchies["All"].node_idx])
+        for position, parent in enumerate(
+            obj.node_parents[obj.hierarchies["All"].node_idx]
+        ):
+            if parent:
+                assert ids.index(parent) > position
+
+    def test_node_labels_are_strings(self, df_olympic_medals):
+        obj = SunburstByGender(df_olympic_medals.astype({"Event": "category"}))
+        assert all(isinstance(label, str) for label in obj.node_labels)
+
+    def test_event_names_with_slashes_keep_their_parent(self, df_olympic_medals):
+        df = df_olympic_medals.copy()
+        df.loc[0, "Event"] = "Four/Five"
+        obj = SunburstByGender(df)
+        nodes = _nodes(obj, obj.hierarchies["Rio 2016"])
+        assert nodes["Men/Athletics/Four/Five"] == ("Men/Athletics", 1)
+
+    def test_arrays_are_compact(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
-        assert len(obj.df_sunburst) == len(df_olympic_medals)
+        hierarchy = obj.hierarchies["All"]
+        assert hierarchy.node_idx.dtype == np.int32
+        assert hierarchy.counts.dtype == np.int32
 
     def test_original_dataframe_is_not_mutated(self, df_olympic_medals):
         original_cols = set(df_olympic_medals.columns)
@@ -45,23 +79,33 @@ class TestMakeInitialSunburst:
 class TestComputeSunburstData:
     """Tests for SunburstByGender._compute_sunburst_data."""
 
-    def test_all_returns_full_dataset(self, df_olympic_medals):
+    def test_all_counts_every_medal(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
         result = obj._compute_sunburst_data("All")
-        assert len(result) == len(df_olympic_medals)
+        leaves = obj.node_ids[result.node_idx].astype(str)
+        is_leaf = np.char.count(leaves, "/") == 2
+        assert result.counts[is_leaf].sum() == len(df_olympic_medals)
 
-    def test_specific_olympiad_filters_correctly(self, df_olympic_medals):
+    def test_specific_olympiad_only_contains_its_nodes(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
-        result = obj._compute_sunburst_data("Rio 2016")
-        assert all(result["Olympiad"] == "Rio 2016")
+        nodes = _nodes(obj, obj._compute_sunburst_data("Rio 2016"))
+        assert set(nodes) == {
+            "Men/Athletics/100m",
+            "Women/Swimming/200m freestyle",
+            "Men/Athletics",
+            "Women/Swimming",
+            "Men",
+            "Women",
+        }
 
     def test_unknown_olympiad_returns_empty(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
         result = obj._compute_sunburst_data("Narnia 1900")
-        assert result.empty
+        assert len(result.node_idx) == 0
+        assert len(result.counts) == 0
 
-    def test_winter_olympiad_returns_correct_rows(self, df_olympic_medals):
+    def test_winter_olympiad_returns_correct_counts(self, df_olympic_medals):
         obj = SunburstByGender(df_olympic_medals)
-        result = obj._compute_sunburst_data("PyeongChang 2018")
-        assert len(result) == 2  # two winter rows in fixture
-        assert all(result["Olympiad"] == "PyeongChang 2018")
+        nodes = _nodes(obj, obj._compute_sunburst_data("PyeongChang 2018"))
+        assert nodes["Men"] == ("", 1)
+        assert nodes["Women"] == ("", 1)
@@ -0,0 +1,91 @@
+"""Tests for src/cache/disk.py"""
+
+import multiprocessing
+import threading
+
+from cache.disk import SQLiteFigureStore
+from cache.memoize import FigureCache
+
+
+def _key(version, argument="France"):
+    return (version, "Chart.plot", (("committee", argument),))
+
+
+def _write_from_other_process(path, version):
+    SQLiteFigureStore(path, version).put(_key(version), {"from": "child"})
+
+
+class TestSQLiteFigureStore:
+    """Tests for SQLiteFigureStore."""
+
+    def test_round_trip(self, tmp_path):
+        store = SQLiteFigureStore(tmp_path / "figures.db", "v1")
+        store.put(_key("v1"), {"data": [1, 2]})
+        assert store.get(_key("v1")) == {"data": [1, 2]}
+        assert len(store) == 1
+
+    def test_missing_key_returns_default(self, tmp_path):
+        store = SQLiteFigureStore(tmp_path / "figures.db", "v1")
+        assert store.get(_key("v1"), "default") == "default"
+
+    def test_keys_of_other_namespaces_are_ignored(self, tmp_path):
+        store = SQLiteFigureStore(tmp_path / "figures.db", "v1")
+        store.put(_key("Chart#0"), "value")
+        assert store.get(_key("Chart#0"), "default") == "default"
+        assert len(store) == 0
+
+    def test_put_replaces_value(self, tmp_path):
+        store = SQLiteFigureStore(tmp_path / "figures.db", "v1")
+        store.put(_key("v1"), "old")
+        store.put(_key("v1"), "new")
+        assert store.get(_key("v1")) == "new"
+
+    def test_new_data_version_deletes_old_figures(self, tmp_path):
+        old = SQLiteFigureStore(tmp_path / "figures.db", "v1")
+        old.put(_key("v1"), "value")
+        new = SQLiteFigureStore(tmp_path / "figures.db", "v2")
+        assert len(new) == 0
+        assert old.get(_key("v1"), "default") == "default"
+
+    def test_new_code_version_deletes_old_figures(self, tmp_path):
+        old = SQLiteFigureStore(tmp_path / "figures.db", "v1", code_version="c1")
+        old.put(_key("v1"), "value")
+        new = SQLiteFigureStore(tmp_path / "figures.db", "v1", code_version="c2")
+        assert new.get(_key("v1"), "default") == "default"
+        assert len(new) == 0
+        assert old.get(_key("v1"), "default") == "default"
+
+    def test_figures_are_shared_between_processes(self, tmp_path):
+        path = tmp_path / "figures.db"
+        store = SQLiteFigureStore(path, "v1")
+        process = multiprocessing.get_context("spawn").Process(
+            target=_write_from_other_process, args=(str(path), "v1")
+        )
+        process.start()
+        process.join(timeout=60)
+        assert process.exitcode == 0
+        assert store.get(_key("v1")) == {"from": "child"}
+
+    def test_concurrent_writes(self, tmp_path):
+        store = SQLiteFigureStore(tmp_path / "figures.db", "v1")
+
+        def worker(offset):
+            for i in range(20):
+                store.put(_key("v1", f"{offset}-{i}"), i)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(store) == 80
+
+    def test_serves_figure_cache_misses(self, tmp_path):
+        path = tmp_path / "figures.db"
+        SQLiteFigureStore(path, "v1").put(_key("v1"), "stored")
+
+        cache = FigureCache()
+        cache.add_store(SQLiteFigureStore(path, "v1"))
+        assert cache.get_or_compute(_key("v1"), lambda: "computed") == "stored"
+        assert cache.get_or_compute(_key("v1", "Italy"), lambda: "new") == "new"
+        assert SQLiteFigureStore(path, "v1").get(_key("v1", "Italy")) == "new"
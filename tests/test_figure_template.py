@@ -0,0 +1,70 @@
+"""Tests for src/algorithms/figure_template.py"""
+
+import json
+
+import numpy as np
+import plotly.express as px
+import pytest
+
+from algorithms.create_medals_by_season import MedalsBySeason
+from algorithms.figure_template import FigureTemplate
+
+
+@pytest.fixture
+def template():
+    return FigureTemplate(
+        layout=dict(title_text="Medals", barmode="group"), trace_type="bar"
+    )
+
+
+class TestFigureTemplate:
+    """Unit tests for FigureTemplate."""
+
+    def test_layout_is_validated_with_default_template(self, template):
+        assert template.layout["title"] == {"text": "Medals"}
+        assert "template" in template.layout
+
+    def test_trace_style_is_validated(self, template):
+        style = template.trace_style(marker_color="#FFD700", name="Gold")
+        assert style == {"type": "bar", "marker": {"color": "#FFD700"}, "name": "Gold"}
+
+    def test_invalid_trace_style_raises(self, template):
+        with pytest.raises(ValueError):
+            template.trace_style(not_a_property=1)
+
+    def test_make_figure(self, template):
+        style = template.trace_style(name="Gold")
+        fig = template.make_figure(
+            [template.trace(style, x=np.array(["A", "B"]), y=np.array([1, 2]))],
+            title=dict(text="Other title"),
+        )
+        assert fig.data[0].name == "Gold"
+        assert list(fig.data[0].y) == [1, 2]
+        assert fig.layout.title.text == "Other title"
+        assert template.layout["title"] == {"text": "Medals"}
+
+    def test_figures_do_not_share_styles(self, template):
+        style = template.trace_style(marker_color="#FFD700")
+        trace = template.trace(style, y=np.array([1]))
+        trace["marker"]["color"] = "#000000"
+        assert style["marker"]["color"] == "#FFD700"
+
+
+class TestSameFigureAsExpress:
+    """Figures built from templates match the plotly.express ones."""
+
+    def test_bar_medal_season(self, df_medals_season):
+        obj = MedalsBySeason(df_medals_season)
+        df = obj._compute_medals_by_season("winter")
+        expected = px.bar(
+            df,
+            x="Olympiad",
+            y="Medal_count",
+            color="Medal_type",
+            color_discrete_map=obj.medal_colors.as_dict(),
+            title="Medal Count by Olympiad and Medal Type",
+            labels={"Medal_count": "Medal Count", "Olympiad": "Olympiad"},
+            category_orders={"Olympiad": df["Olympiad"].unique()},
+        )
+        fig = obj._plot_bar_medal_season(df, "winter")
+        assert json.loads(fig.to_json()) == json.loads(expected.to_json())
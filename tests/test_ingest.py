@@ -0,0 +1,154 @@
+"""
+Tests for transformation.ingest (streaming CSV to parquet conversion).
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from transformation.ingest import (
+    CategoryDictionary,
+    iter_csv_chunks,
+    stream_csv_to_parquet,
+)
+from transformation.steps import change_column_dtypes
+
+CATEGORY_COLUMNS = ["Olympiad", "Committee", "Medal_type", "Olympic_season"]
+
+
+@pytest.fixture
+def csv_path(tmp_path, df_olympic_medals):
+    path = tmp_path / "medals.csv"
+    # Quoted fields with commas, quotes and newlines
+    df_olympic_medals.loc[0, "Event"] = 'Relay, "4x100m"\nfinal'
+    df_olympic_medals.to_csv(path, index=False)
+    return path
+
+
+class TestIterCsvChunks:
+    def test_chunks_start_with_header(self, csv_path):
+        header = csv_path.read_bytes().splitlines(keepends=True)[0]
+        chunks = list(iter_csv_chunks(csv_path, chunk_size=50))
+        assert len(chunks) > 1
+        assert all(chunk.startswith(header) for chunk in chunks)
+
+    def test_chunks_cover_every_row(self, csv_path, df_olympic_medals):
+        frames = [
+            pd.read_csv(pa.BufferReader(chunk))
+            for chunk in iter_csv_chunks(csv_path, chunk_size=50)
+        ]
+        df = pd.concat(frames, ignore_index=True)
+        assert len(df) == len(df_olympic_medals)
+        assert df.loc[0, "Event"] == 'Relay, "4x100m"\nfinal'
+
+    def test_single_chunk(self, csv_path):
+        chunks = list(iter_csv_chunks(csv_path, chunk_size=1 << 20))
+        assert chunks == [csv_path.read_bytes()]
+
+
+class TestCategoryDictionary:
+    def test_codes_grow_across_chunks(self):
+        dictionary = CategoryDictionary()
+        first = dictionary.encode(pa.chunked_array([["b", "a", "b"]]))
+        second = dictionary.encode(pa.chunked_array([["c", "a"]]))
+        assert list(first) == [0, 1, 0]
+        assert list(second) == [2, 1]
+
+    def test_nulls(self):
+        codes = CategoryDictionary().encode(pa.chunked_array([["a", None]]))
+        assert list(codes) == [0, -1]
+
+    def test_replacements(self):
+        dictionary = CategoryDictionary({"old": "new"})
+        codes = dictionary.encode(pa.chunked_array([["new", "old"]]))
+        assert list(codes) == [0, 0]
+        assert list(dictionary.codes) == ["new"]
+
+    def test_sorted(self):
+        dictionary = CategoryDictionary()
+        dictionary.encode(pa.chunked_array([["b", "c", "a"]]))
+        values, remap = dictionary.sorted()
+        assert values.to_pylist() == ["a", "b", "c"]
+        assert list(remap) == [1, 2, 0]
+
+
+class TestStreamCsvToParquet:
+    def test_matches_pandas_conversion(self, tmp_path, csv_path):
+        parquet_path = tmp_path / "medals.parquet"
+        rows = stream_csv_to_parquet(
+            csv_path, parquet_path, CATEGORY_COLUMNS, chunk_size=50
+        )
+
+        expected = change_column_dtypes(
+            pd.read_csv(csv_path), "category", CATEGORY_COLUMNS
+        )
+        assert rows == len(expected)
+        pd.testing.assert_frame_equal(pd.read_parquet(parquet_path), expected)
+
+    def test_writes_row_groups(self, tmp_path, csv_path):
+        parquet_path = tmp_path / "medals.parquet"
+        stream_csv_to_parquet(csv_path, parquet_path, CATEGORY_COLUMNS, chunk_size=50)
+        assert pq.ParquetFile(parquet_path).num_row_groups > 1
+
+    def test_string_columns(self, tmp_path, csv_path):
+        parquet_path = tmp_path / "medals.parquet"
+        stream_csv_to_parquet(
+            csv_path, parquet_path, CATEGORY_COLUMNS, string_columns=["Olympic_year"]
+        )
+        df = pd.read_parquet(parquet_path)
+        assert df.loc[0, "Olympic_year"] == "2016"
+
+    def test_replacements(self, tmp_path, csv_path):
+        parquet_path = tmp_path / "medals.parquet"
+        stream_csv_to_parquet(
+            csv_path,
+            parquet_path,
+            CATEGORY_COLUMNS,
+            replacements={"Olympiad": {"Rio 2016": "Tokyo 2020"}},
+            chunk_size=50,
+        )
+        df = pd.read_parquet(parquet_path)
+        assert list(df["Olympiad"].cat.categories) == ["PyeongChang 2018", "Tokyo 2020"]
+        assert (df["Olympiad"] == "Tokyo 2020").sum() == 4
+
+    def test_column_types(self, tmp_path, csv_path):
+        parquet_path = tmp_path / "medals.parquet"
+        stream_csv_to_parquet(
+            csv_path,
+            parquet_path,
+            CATEGORY_COLUMNS,
+            column_types={"Olympic_year": pa.int16()},
+        )
+        assert pd.read_parquet(parquet_path)["Olympic_year"].dtype == "int16"
+
+    def test_partition_column(self, tmp_path, csv_path):
+        parquet_path = tmp_path / "medals.parquet"
+        stream_csv_to_parquet(
+            csv_path,
+            parquet_path,
+            CATEGORY_COLUMNS,
+            chunk_size=50,
+            partition_column="Olympic_season",
+            group_column="Olympiad",
+        )
+        # The seasons of the rows are summer (4 rows), then winter (2 rows)
+        parquet_file = pq.ParquetFile(parquet_path)
+        sizes = [
+            parquet_file.metadata.row_group(i).num_rows
+            for i in range(parquet_file.num_row_groups)
+        ]
+        assert sizes == [4, 2]
+
+    def test_missing_column_raises(self, tmp_path, csv_path):
+        with pytest.raises(ValueError, match="Columns not found"):
+            stream_csv_to_parquet(csv_path, tmp_path / "out.parquet", ["Missing"])
+
+    def test_leaves_no_temporary_file(self, tmp_path, csv_path):
+        stream_csv_to_parquet(
+            csv_path, tmp_path / "out.parquet", CATEGORY_COLUMNS, chunk_size=50
+        )
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "medals.csv",
+            "out.parquet",
+        ]
@@ -0,0 +1,139 @@
+"""
+Tests for loaders.ipc (memory-mapped Arrow IPC copies of the source tables).
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from loaders.aggregates import AGGREGATES
+from loaders.datasets import load_datasets
+from loaders.ipc import (
+    ARROW_DIR,
+    ipc_source_hash,
+    read_ipc,
+    read_parquet_mapped,
+    write_ipc,
+)
+
+
+@pytest.fixture
+def df_medals(df_olympic_medals):
+    """Medals table like the parquet file: every text column but `Winner` is
+    categorical."""
+    df = df_olympic_medals.assign(Winner=[f"Athlete {i}" for i in range(6)])
+    columns = df.columns.drop(["Olympic_year", "Winner"])
+    return df.astype({column: "category" for column in columns})
+
+
+@pytest.fixture
+def parquet_path(tmp_path, df_medals):
+    path = tmp_path / "olympic_medals.parquet"
+    df_medals.to_parquet(path, index=False)
+    return path
+
+
+def _as_objects(df):
+    """Convert the Arrow string columns to object columns, like parquet."""
+    strings = df.columns[df.dtypes == pd.ArrowDtype(pa.string())]
+    return df.astype({column: object for column in strings})
+
+
+def _ipc_path(parquet_path):
+    return parquet_path.parent / ARROW_DIR / "olympic_medals.arrow"
+
+
+class TestReadIpc:
+    def test_round_trip(self, tmp_path, df_medals):
+        write_ipc(df_medals, tmp_path / "medals.arrow")
+        df = read_ipc(tmp_path / "medals.arrow")
+        assert df["Winner"].dtype == pd.ArrowDtype(pa.string())
+        pd.testing.assert_frame_equal(_as_objects(df), df_medals)
+
+    def test_columns_are_read_only(self, tmp_path, df_medals):
+        write_ipc(df_medals, tmp_path / "medals.arrow")
+        df = read_ipc(tmp_path / "medals.arrow")
+        years = df["Olympic_year"].to_numpy()
+        assert not years.flags.writeable
+        with pytest.raises(ValueError, match="read-only"):
+            years[0] = 0
+
+    def test_narrow_category_codes(self, tmp_path, df_medals):
+        write_ipc(df_medals, tmp_path / "medals.arrow")
+        df = read_ipc(tmp_path / "medals.arrow")
+        assert df["Committee"].cat.codes.dtype == np.int8
+
+    def test_source_hash(self, tmp_path, df_medals):
+        path = tmp_path / "medals.arrow"
+        assert ipc_source_hash(path) is None
+        write_ipc(df_medals, path, "abc")
+        assert ipc_source_hash(path) == "abc"
+
+
+class TestReadParquetMapped:
+    def test_writes_the_ipc_file(self, parquet_path, df_medals):
+        df = read_parquet_mapped(parquet_path)
+        assert _ipc_path(parquet_path).exists()
+        pd.testing.assert_frame_equal(_as_objects(df), df_medals)
+
+    def test_reuses_the_ipc_file(self, parquet_path):
+        read_parquet_mapped(parquet_path)
+        mtime = _ipc_path(parquet_path).stat().st_mtime_ns
+        read_parquet_mapped(parquet_path)
+        assert _ipc_path(parquet_path).stat().st_mtime_ns == mtime
+
+    def test_rewrites_a_stale_ipc_file(self, parquet_path, df_medals):
+        read_parquet_mapped(parquet_path)
+        df_medals.iloc[:2].to_parquet(parquet_path, index=False)
+        assert len(read_parquet_mapped(parquet_path)) == 2
+
+    def test_previous_frame_survives_a_rewrite(self, parquet_path, df_medals):
+        df = read_parquet_mapped(parquet_path)
+        df_medals.iloc[:2].to_parquet(parquet_path, index=False)
+        read_parquet_mapped(parquet_path)
+        assert df["Winner"].tolist() == [f"Athlete {i}" for i in range(6)]
+
+    def test_no_temporary_files_left(self, parquet_path):
+        read_parquet_mapped(parquet_path)
+        files = [path.name for path in _ipc_path(parquet_path).parent.iterdir()]
+        assert files == ["olympic_medals.arrow"]
+
+
+class TestLoadDatasetsFormats:
+    @pytest.fixture
+    def data_dir(self, tmp_path, parquet_path):
+        pd.DataFrame(
+            {
+                "Olympiad": ["Rio 2016"],
+                "Olympic_year": [2016],
+                "Olympic_season": ["summer"],
+                "total_medals": [3],
+                "total_medals_gold": [1],
+                "total_medals_silver": [1],
+                "total_medals_bronze": [1],
+                "number_committees": [2],
+                "number_disciplines": [2],
+                "number_events": [2],
+                "Country": ["Brazil"],
+                "Continent": ["South America"],
+            }
+        ).astype(
+            {
+                "Olympiad": "category",
+                "Olympic_season": "category",
+                "Country": "category",
+            }
+        ).to_parquet(tmp_path / "olympic_cities.parquet", index=False)
+        return tmp_path
+
+    def test_same_datasets(self, data_dir):
+        parquet = load_datasets(data_dir, "parquet")
+        arrow = load_datasets(data_dir, "arrow")
+        for name in [*AGGREGATES, "olympic_medals", "olympic_cities"]:
+            df = _as_objects(getattr(arrow, name))
+            pd.testing.assert_frame_equal(df, getattr(parquet, name))
+
+    def test_invalid_format(self, data_dir):
+        with pytest.raises(ValueError, match="Invalid data format"):
+            load_datasets(data_dir, "csv")
@@ -0,0 +1,87 @@
+"""
+Tests for transformation.layout (row groups of the medals parquet file).
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from transformation.layout import iter_row_groups, write_medals_parquet
+
+
+@pytest.fixture
+def table():
+    """Olympiads of 3, 2, 4 and 1 rows, the last one back in summer."""
+    olympiads = ["A"] * 3 + ["B"] * 2 + ["C"] * 4 + ["D"]
+    seasons = ["summer"] * 5 + ["winter"] * 4 + ["summer"]
+    return pa.table(
+        {
+            "Olympiad": pa.array(olympiads).dictionary_encode(),
+            "Olympic_season": pa.array(seasons).dictionary_encode(),
+            "row": list(range(10)),
+        }
+    )
+
+
+def _row_groups(tables, **kwargs):
+    return [group["row"].to_pylist() for group in iter_row_groups(tables, **kwargs)]
+
+
+class TestIterRowGroups:
+    def test_season_changes_end_row_groups(self, table):
+        groups = _row_groups([table], row_group_rows=100)
+        assert groups == [[0, 1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+    def test_olympiads_are_not_split(self, table):
+        groups = _row_groups([table], row_group_rows=2)
+        assert groups == [[0, 1, 2], [3, 4], [5, 6, 7, 8], [9]]
+
+    def test_olympiads_fill_row_groups(self, table):
+        groups = _row_groups([table], row_group_rows=4)
+        assert groups == [[0, 1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+    @pytest.mark.parametrize("cuts", [[1], [3, 5], [2, 4, 7, 9], list(range(1, 10))])
+    def test_independent_of_the_tables(self, table, cuts):
+        bounds = [0, *cuts, table.num_rows]
+        tables = [table.slice(a, b - a) for a, b in zip(bounds, bounds[1:])]
+        for row_group_rows in [2, 4, 100]:
+            assert _row_groups(tables, row_group_rows=row_group_rows) == _row_groups(
+                [table], row_group_rows=row_group_rows
+            )
+
+    def test_long_runs_are_split(self, table):
+        groups = _row_groups([table], row_group_rows=2, max_row_group_rows=3)
+        assert groups == [[0, 1, 2], [3, 4], [5, 6, 7], [8], [9]]
+
+    @pytest.mark.parametrize("cuts", [[1], [2, 4, 7, 9], list(range(1, 10))])
+    def test_long_runs_independent_of_the_tables(self, table, cuts):
+        bounds = [0, *cuts, table.num_rows]
+        tables = [table.slice(a, b - a) for a, b in zip(bounds, bounds[1:])]
+        for max_row_group_rows in [1, 2, 3]:
+            kwargs = dict(row_group_rows=2, max_row_group_rows=max_row_group_rows)
+            assert _row_groups(tables, **kwargs) == _row_groups([table], **kwargs)
+            assert all(
+                len(group) <= max_row_group_rows
+                for group in _row_groups(tables, **kwargs)
+            )
+
+    def test_without_group_column(self, table):
+        groups = _row_groups([table], group_column=None, row_group_rows=2)
+        assert groups == [[0, 1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+
+class TestWriteMedalsParquet:
+    def test_round_trip(self, tmp_path, df_olympic_medals):
+        df = df_olympic_medals.astype({"Olympiad": "category"})
+        path = tmp_path / "medals.parquet"
+        write_medals_parquet(df, path)
+        pd.testing.assert_frame_equal(pd.read_parquet(path), df)
+
+    def test_statistics(self, tmp_path, df_olympic_medals):
+        path = tmp_path / "medals.parquet"
+        write_medals_parquet(df_olympic_medals, path)
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_row_groups == 2
+        seasons = metadata.row_group(1).column(2).statistics
+        assert (seasons.min, seasons.max) == ("winter", "winter")
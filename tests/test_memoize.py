@@ -0,0 +1,288 @@
+"""Tests for src/cache/memoize.py"""
+
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from algorithms.create_medals_by_olympics import MedalsByOlympics
+from cache import as_payload_figure
+from cache.memoize import (
+    FigureCache,
+    estimate_size,
+    figure_cache,
+    make_cache_key,
+    memoize_figure,
+    set_cache_namespace,
+)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Chart:
+    """Minimal chart class counting how many times figures are computed."""
+
+    def __init__(self):
+        self.calls = []
+
+    @memoize_figure
+    def plot(self, committees, season="summer"):
+        self.calls.append((committees, season))
+        return {"committees": committees, "season": season}
+
+
+class _DictStore:
+    """In-memory store, standing for a store shared between processes."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def put(self, key, value):
+        self.values[key] = value
+
+
+@pytest.fixture(autouse=True)
+def empty_figure_cache():
+    figure_cache.clear()
+    yield
+    figure_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+class TestFigureCache:
+    """Unit tests for FigureCache."""
+
+    def test_get_returns_default_on_miss(self):
+        cache = FigureCache()
+        assert cache.get("missing", "default") == "default"
+        assert cache.stats().misses == 1
+
+    def test_get_returns_stored_value(self):
+        cache = FigureCache()
+        cache.put("key", "value")
+        assert cache.get("key") == "value"
+        assert cache.stats().hits == 1
+
+    def test_evicts_least_recently_used_when_over_budget(self):
+        value = np.zeros(100, dtype=np.uint8)
+        cache = FigureCache(max_bytes=2 * estimate_size(value))
+        cache.put("a", value)
+        cache.put("b", value)
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.put("c", value)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats().evictions == 1
+
+    def test_size_tracks_stored_values(self):
+        cache = FigureCache()
+        value = np.zeros(1000, dtype=np.uint8)
+        cache.put("a", value)
+        cache.put("a", value)
+        assert cache.stats().size_bytes == estimate_size(value)
+        assert cache.stats().entries == 1
+
+    def test_value_larger_than_cache_is_not_stored(self):
+        cache = FigureCache(max_bytes=10)
+        cache.put("big", np.zeros(1000, dtype=np.uint8))
+        assert len(cache) == 0
+
+    def test_clear_resets_entries_and_counters(self):
+        cache = FigureCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats().hits == 0
+
+    def test_concurrent_access_keeps_size_consistent(self):
+        value = np.zeros(100, dtype=np.uint8)
+        cache = FigureCache(max_bytes=10 * estimate_size(value))
+
+        def worker(offset):
+            for i in range(200):
+                cache.put((offset, i % 20), value)
+                cache.get((offset, (i + 1) % 20))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert stats.entries == 10
+        assert stats.size_bytes == 10 * estimate_size(value)
+        assert stats.hits + stats.misses == 8 * 200
+
+
+class TestFigureCacheStores:
+    """Tests for the stores looked up on memory misses."""
+
+    def test_computed_values_are_saved_to_stores(self):
+        cache, store = FigureCache(), _DictStore()
+        cache.add_store(store)
+        assert cache.get_or_compute("key", lambda: "value") == "value"
+        assert store.values == {"key": "value"}
+
+    def test_store_values_are_not_computed_again(self):
+        cache, store = FigureCache(), _DictStore()
+        store.values["key"] = "stored"
+        cache.add_store(store)
+        assert cache.get_or_compute("key", lambda: "computed") == "stored"
+        assert "key" in cache
+        assert cache.stats().store_hits == 1
+
+    def test_removed_store_is_not_used(self):
+        cache, store = FigureCache(), _DictStore()
+        store.values["key"] = "stored"
+        cache.add_store(store)
+        cache.remove_store(store)
+        assert cache.get_or_compute("key", lambda: "computed") == "computed"
+
+    def test_set_stores_replaces_stores(self):
+        cache, old_store, new_store = FigureCache(), _DictStore(), _DictStore()
+        old_store.values["key"] = "old"
+        cache.add_store(old_store)
+        cache.set_stores([new_store])
+        assert cache.get_or_compute("key", lambda: "computed") == "computed"
+        assert new_store.values == {"key": "computed"}
+
+
+class TestDiscardNamespace:
+    """Tests for FigureCache.discard_namespace (data reloads)."""
+
+    def test_discards_entries_of_namespace(self):
+        cache = FigureCache()
+        cache.put(("v1", "method", ()), 1)
+        cache.put(("v1", "other", ()), 2)
+        cache.put(("v2", "method", ()), 3)
+        assert cache.discard_namespace("v1") == 2
+        assert len(cache) == 1
+        assert ("v2", "method", ()) in cache
+
+    def test_updates_size(self):
+        cache = FigureCache()
+        cache.put(("v1", "method", ()), 1)
+        cache.discard_namespace("v1")
+        assert cache.stats().size_bytes == 0
+
+    def test_ignores_other_keys(self):
+        cache = FigureCache()
+        cache.put("v1", 1)
+        assert cache.discard_namespace("v1") == 0
+        assert "v1" in cache
+
+
+class TestMemoizeFigure:
+    """Tests for the memoize_figure decorator."""
+
+    def test_second_call_is_served_from_cache(self):
+        chart = _Chart()
+        first = chart.plot(["France"])
+        second = chart.plot(["France"])
+        assert first is second
+        assert len(chart.calls) == 1
+
+    def test_list_arguments_keep_their_order(self):
+        chart = _Chart()
+        first = chart.plot(["Italy", "France"])
+        second = chart.plot(["France", "Italy"])
+        assert len(chart.calls) == 2
+        assert first["committees"] == ["Italy", "France"]
+        assert second["committees"] == ["France", "Italy"]
+
+    def test_set_arguments_are_order_normalized(self):
+        chart = _Chart()
+        chart.plot({"Italy", "France"})
+        chart.plot(frozenset(["France", "Italy"]))
+        assert len(chart.calls) == 1
+
+    def test_method_gets_the_arguments_as_given(self):
+        chart = _Chart()
+        result = chart.plot(["Italy", "France"], "winter")
+        assert chart.calls == [(["Italy", "France"], "winter")]
+        assert result["committees"] == ["Italy", "France"]
+
+    def test_positional_and_keyword_calls_share_entry(self):
+        chart = _Chart()
+        chart.plot(["France"], "winter")
+        chart.plot(committees=["France"], season="winter")
+        assert len(chart.calls) == 1
+
+    def test_defaults_are_part_of_the_key(self):
+        chart = _Chart()
+        chart.plot(["France"])
+        chart.plot(["France"], season="summer")
+        chart.plot(["France"], season="winter")
+        assert len(chart.calls) == 2
+
+    def test_instances_do_not_share_entries_by_default(self):
+        first, second = _Chart(), _Chart()
+        first.plot(["France"])
+        second.plot(["France"])
+        assert len(first.calls) == len(second.calls) == 1
+
+    def test_instances_in_same_namespace_share_entries(self):
+        first, second = _Chart(), _Chart()
+        set_cache_namespace(first, "data-v1")
+        set_cache_namespace(second, "data-v1")
+        first.plot(["France"])
+        second.plot(["France"])
+        assert len(second.calls) == 0
+
+    def test_unhashable_arguments_are_computed_without_caching(self):
+        chart = _Chart()
+        chart.plot(["France"], season={"not": "hashable"})
+        chart.plot(["France"], season={"not": "hashable"})
+        assert len(chart.calls) == 2
+
+    def test_make_cache_key_matches_decorated_call(self):
+        chart = _Chart()
+        chart.plot(["Italy", "France"])
+        assert make_cache_key(chart, "plot", ["Italy", "France"]) in figure_cache
+        assert make_cache_key(chart, "plot", ["France", "Italy"]) not in figure_cache
+
+    def test_counters_are_exposed(self):
+        chart = _Chart()
+        chart.plot(["France"])
+        chart.plot(["France"])
+        stats = figure_cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+
+    def test_algorithm_figures_are_cached(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        first = obj.create_medals_by_olympics("Rio 2016")
+        assert obj.create_medals_by_olympics("Rio 2016") is first
+        assert obj.create_medals_by_olympics("Tokyo 2020") is not first
+
+
+class TestEstimateSize:
+    """Tests for estimate_size."""
+
+    def test_numeric_array_size_is_nbytes(self):
+        assert estimate_size(np.zeros(10, dtype=np.int64)) == 80
+
+    def test_figure_size_includes_the_payload(self):
+        figure = go.Figure(go.Scatter(x=list(range(1000)), y=list(range(1000))))
+        without_payload = estimate_size(figure)
+        figure = as_payload_figure(figure)
+        assert estimate_size(figure) >= without_payload + len(figure.to_json())
+        assert figure.has_payload
+
+    def test_figure_size_grows_with_data(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        small = obj.create_medals_by_olympics("Tokyo 2020")
+        large = obj.create_medals_by_olympics("Rio 2016")
+        assert estimate_size(large) > estimate_size(small)
@@ -0,0 +1,77 @@
+"""Tests for src/cache/payload.py"""
+
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from algorithms.create_medals_by_olympics import MedalsByOlympics
+from cache.memoize import figure_cache
+from cache.payload import PayloadFigure, as_payload_figure, encode_payload
+from cache.serialization import dump_value, load_value
+
+
+@pytest.fixture(autouse=True)
+def empty_figure_cache():
+    figure_cache.clear()
+    yield
+    figure_cache.clear()
+
+
+@pytest.fixture
+def figure():
+    return go.Figure(go.Bar(x=["Gold", "Silver"], y=np.array([3, 1])))
+
+
+class TestPayloadFigure:
+    """Tests for PayloadFigure."""
+
+    def test_payload_matches_plotly_json(self, figure):
+        expected = json.loads(figure.to_json())
+        payload_figure = as_payload_figure(figure)
+        assert json.loads(payload_figure.to_json()) == expected
+
+    def test_payload_is_encoded_once(self, figure):
+        payload_figure = as_payload_figure(figure)
+        assert not payload_figure.has_payload
+        first = payload_figure.to_json()
+        assert payload_figure.has_payload
+        assert payload_figure.to_json() is first
+
+    def test_to_json_with_options_is_not_memoized(self, figure):
+        payload_figure = as_payload_figure(figure)
+        assert payload_figure.to_json(pretty=True) != payload_figure.to_json()
+
+    def test_numeric_arrays_use_typed_arrays(self, figure):
+        payload = json.loads(encode_payload(figure))
+        assert "bdata" in payload["data"][0]["y"]
+
+    def test_as_payload_figure_keeps_other_values(self):
+        value = {"not": "a figure"}
+        assert as_payload_figure(value) is value
+
+    def test_as_payload_figure_converts_the_figures_of_a_tuple(self, figure):
+        figures = as_payload_figure((figure, go.Figure()))
+        assert all(isinstance(item, PayloadFigure) for item in figures)
+
+    def test_given_payload_is_used(self, figure):
+        payload_figure = PayloadFigure(figure, payload="{}")
+        assert payload_figure.to_json() == "{}"
+
+
+class TestCachedPayloads:
+    """Tests for the payloads of cached and serialized figures."""
+
+    def test_chart_methods_return_payload_figures(self, df_grouped_medals_olympiads):
+        obj = MedalsByOlympics(df_grouped_medals_olympiads)
+        figure = obj.create_medals_by_olympics("Rio 2016")
+        assert isinstance(figure, PayloadFigure)
+        figure.to_json()
+        assert obj.create_medals_by_olympics("Rio 2016").has_payload
+
+    def test_serialized_figures_keep_their_payload(self, figure):
+        payload = as_payload_figure(figure).to_json()
+        loaded = load_value(dump_value(figure))
+        assert loaded.has_payload
+        assert loaded.to_json() == payload
@@ -0,0 +1,171 @@
+"""
+Tests for transformation.pipeline (Step, order_steps and run_pipeline).
+"""
+
+import threading
+
+import pytest
+
+from transformation.pipeline import Step, order_steps, run_pipeline
+
+CALLS = []
+
+
+def upper(source, target):
+    CALLS.append("upper")
+    target.write_text(source.read_text().upper())
+
+
+def count(source, target):
+    CALLS.append("count")
+    target.write_text(str(len(source.read_text())))
+
+
+def concat(first, second, target):
+    CALLS.append("concat")
+    target.write_text(first.read_text() + second.read_text())
+
+
+STEPS = [
+    Step("upper", upper, inputs=("in/a.txt",), outputs=("out/upper.txt",)),
+    Step("count", count, inputs=("out/upper.txt",), outputs=("out/count.txt",)),
+    Step(
+        "concat",
+        concat,
+        inputs=("out/upper.txt", "in/b.txt"),
+        outputs=("out/concat.txt",),
+    ),
+]
+
+
+@pytest.fixture
+def root(tmp_path):
+    CALLS.clear()
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.txt").write_text("abc")
+    (tmp_path / "in" / "b.txt").write_text("def")
+    return tmp_path
+
+
+def _run(root, **kwargs):
+    return run_pipeline(STEPS, root=root, manifest_path="manifest.json", **kwargs)
+
+
+class TestOrderSteps:
+    def test_dependencies(self):
+        assert order_steps(STEPS) == {
+            "upper": set(),
+            "count": {"upper"},
+            "concat": {"upper"},
+        }
+
+    def test_rejects_duplicate_outputs(self):
+        steps = [
+            Step("first", upper, inputs=(), outputs=("x",)),
+            Step("second", upper, inputs=(), outputs=("x",)),
+        ]
+        with pytest.raises(ValueError, match="written by"):
+            order_steps(steps)
+
+    def test_rejects_duplicate_names(self):
+        steps = [
+            Step("step", upper, inputs=(), outputs=("x",)),
+            Step("step", upper, inputs=(), outputs=("y",)),
+        ]
+        with pytest.raises(ValueError, match="unique"):
+            order_steps(steps)
+
+    def test_rejects_cycles(self):
+        steps = [
+            Step("first", upper, inputs=("y",), outputs=("x",)),
+            Step("second", upper, inputs=("x",), outputs=("y",)),
+        ]
+        with pytest.raises(ValueError, match="cyclic"):
+            order_steps(steps)
+
+
+class TestRunPipeline:
+    def test_builds_every_step(self, root):
+        results = _run(root)
+        assert all(result.built for result in results)
+        assert (root / "out" / "concat.txt").read_text() == "ABCdef"
+        assert (root / "out" / "count.txt").read_text() == "3"
+        assert (root / "manifest.json").exists()
+
+    def test_runs_steps_after_their_dependencies(self, root):
+        _run(root)
+        assert CALLS[0] == "upper"
+        assert sorted(CALLS[1:]) == ["concat", "count"]
+
+    def test_skips_up_to_date_steps(self, root):
+        _run(root)
+        CALLS.clear()
+        results = _run(root)
+        assert not any(result.built for result in results)
+        assert CALLS == []
+
+    def test_rebuilds_steps_whose_input_changed(self, root):
+        _run(root)
+        CALLS.clear()
+        (root / "in" / "b.txt").write_text("xyz")
+        _run(root)
+        assert CALLS == ["concat"]
+        assert (root / "out" / "concat.txt").read_text() == "ABCxyz"
+
+    def test_skips_dependents_of_identical_outputs(self, root):
+        _run(root)
+        CALLS.clear()
+        # Same output of "upper", so "count" and "concat" are up to date
+        (root / "in" / "a.txt").write_text("ABC")
+        _run(root)
+        assert CALLS == ["upper"]
+
+    def test_rebuilds_missing_or_modified_outputs(self, root):
+        _run(root)
+        CALLS.clear()
+        (root / "out" / "count.txt").unlink()
+        (root / "out" / "concat.txt").write_text("modified")
+        _run(root)
+        assert sorted(CALLS) == ["concat", "count"]
+
+    def test_force(self, root):
+        _run(root)
+        CALLS.clear()
+        _run(root, force=True)
+        assert sorted(CALLS) == ["concat", "count", "upper"]
+
+    def test_without_manifest_runs_every_step(self, root):
+        run_pipeline(STEPS, root=root)
+        run_pipeline(STEPS, root=root)
+        assert len(CALLS) == 6
+        assert not (root / "manifest.json").exists()
+
+    def test_reports_results(self, root):
+        reported = []
+        results = _run(root, on_result=reported.append)
+        assert reported == results
+        assert all(result.seconds >= 0 for result in results)
+
+    def test_runs_independent_steps_in_parallel(self, tmp_path):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other(target):
+            # Fails with BrokenBarrierError unless both steps run at once
+            barrier.wait()
+            target.write_text("done")
+
+        steps = [
+            Step("first", wait_for_other, inputs=(), outputs=("first.txt",)),
+            Step("second", wait_for_other, inputs=(), outputs=("second.txt",)),
+        ]
+        run_pipeline(steps, root=tmp_path, workers=2)
+        assert (tmp_path / "first.txt").exists()
+        assert (tmp_path / "second.txt").exists()
+
+    def test_step_error_propagates(self, root):
+        def fail(source, target):
+            raise RuntimeError("boom")
+
+        steps = [Step("fail", fail, inputs=("in/a.txt",), outputs=("x",))]
+        with pytest.raises(RuntimeError, match="boom"):
+            run_pipeline(steps, root=root, manifest_path="manifest.json")
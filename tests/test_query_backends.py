@@ -0,0 +1,314 @@
+"""
+Tests for algorithms.query_backends: every backend returns the frames of the
+pandas backend (the reference), from frames and from parquet tables.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from algorithms.create_medal_by_olympic_and_discipline import (
+    MedalsByOlympicAndDiscipline,
+)
+from algorithms.create_medals_by_country import MedalsByCountry
+from algorithms.create_olympic_map import MedalMap
+from algorithms.query_backends import PandasBackend, get_query_backend
+from loaders.sources import open_parquet_source
+from transformation.layout import write_medals_parquet
+
+
+@pytest.fixture(params=["duckdb", "polars"])
+def backend(request):
+    """The optional backends, when their package is installed."""
+    pytest.importorskip(request.param)
+    return get_query_backend(request.param)
+
+
+def _as_categories(df):
+    """Same table with categorical text columns, like the parquet files."""
+    columns = df.select_dtypes("object").columns
+    return df.astype({column: "category" for column in columns})
+
+
+@pytest.fixture(params=["pandas", "duckdb", "polars"])
+def any_backend(request):
+    """Every backend whose package is installed."""
+    if request.param != "pandas":
+        pytest.importorskip(request.param)
+    return get_query_backend(request.param)
+
+
+def _write_medals(df, path):
+    """Write medals like the pipeline: categorical, a row group by season."""
+    df = _as_categories(df.sort_values("Olympic_season", ignore_index=True))
+    write_medals_parquet(df, path)
+    return pd.read_parquet(path)
+
+
+@pytest.fixture
+def medals_file(tmp_path, df_olympic_medals):
+    """The medals parquet file, and the frame read from it."""
+    path = tmp_path / "olympic_medals.parquet"
+    return path, _write_medals(df_olympic_medals, path)
+
+
+@pytest.fixture
+def medals_table(medals_file):
+    return open_parquet_source(medals_file[0]).parquet_table("v1")
+
+
+@pytest.fixture(params=["object", "category"])
+def as_dtype(request):
+    """Runs the test with object and with categorical text columns."""
+    return _as_categories if request.param == "category" else lambda df: df
+
+
+class TestOptionalBackends:
+    @pytest.mark.parametrize("season", [None, "summer", "winter", "spring"])
+    @pytest.mark.parametrize("column", ["total_medals", "total_medals_gold"])
+    def test_sum_by(self, backend, df_olympic_cities, as_dtype, season, column):
+        df = as_dtype(df_olympic_cities)
+        filters = season and {"Olympic_season": season}
+        args = (df, ["Country", "ISO_code_mapping"], column, "Number of Medals")
+        pd.testing.assert_frame_equal(
+            backend.sum_by(*args, filters),
+            PandasBackend().sum_by(*args, filters),
+        )
+
+    def test_sum_by_int32(self, backend, df_olympic_cities):
+        df = df_olympic_cities.astype({"total_medals": "int32"})
+        result = backend.sum_by(df, ["Country"], "total_medals", "medals")
+        assert result["medals"].dtype == "int32"
+
+    def test_sum_by_skips_missing_groups(self, backend, df_olympic_cities):
+        df = df_olympic_cities.assign(ISO_code_mapping=["USA", None, "NOR", "NOR"])
+        args = (df, ["Country", "ISO_code_mapping"], "total_medals", "medals")
+        pd.testing.assert_frame_equal(
+            backend.sum_by(*args), PandasBackend().sum_by(*args)
+        )
+
+    @pytest.mark.parametrize("season", [None, "summer", "winter", "spring"])
+    def test_pivot_size(self, backend, df_olympic_medals, as_dtype, season):
+        df = as_dtype(df_olympic_medals)
+        filters = season and {"Olympic_season": season}
+        args = (df, ["Committee", "Olympiad", "Olympic_year"], "Discipline")
+        pd.testing.assert_frame_equal(
+            backend.pivot_size(*args, filters),
+            PandasBackend().pivot_size(*args, filters),
+        )
+
+    def test_medal_map(self, backend, df_olympic_cities, as_dtype):
+        df = as_dtype(df_olympic_cities)
+        reference = MedalMap(df)
+        backend_map = MedalMap(df, backend)
+        for season in ["All", "summer", "winter"]:
+            for medal_type in ["All", "Gold"]:
+                pd.testing.assert_frame_equal(
+                    backend_map._compute_medal_counts(season, medal_type),
+                    reference._compute_medal_counts(season, medal_type),
+                )
+
+    def test_medals_grid(self, backend, df_olympic_medals, as_dtype):
+        df = as_dtype(df_olympic_medals)
+        reference = MedalsByOlympicAndDiscipline(df)
+        backend_grid = MedalsByOlympicAndDiscipline(df, backend)
+        for season in ["summer", "winter"]:
+            for committee in ["USA", "GBR", "NOR"]:
+                pd.testing.assert_frame_equal(
+                    backend_grid._create_medals_grid(season, committee),
+                    reference._create_medals_grid(season, committee),
+                )
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            None,
+            {"Olympic_season": "summer"},
+            {"Olympic_season": "summer", "Medal_type": "Gold"},
+            {"Olympic_season": "spring"},
+        ],
+    )
+    @pytest.mark.parametrize("columns", [None, ["Olympiad", "GBR", "USA"]])
+    def test_filter(
+        self,
+        backend,
+        df_total_medals_by_olympiad_and_committee,
+        as_dtype,
+        filters,
+        columns,
+    ):
+        df = as_dtype(df_total_medals_by_olympiad_and_committee)
+        pd.testing.assert_frame_equal(
+            backend.filter(df, filters, columns),
+            PandasBackend().filter(df, filters, columns),
+        )
+
+    def test_filter_skips_missing_values(
+        self, backend, df_total_medals_by_olympiad_and_committee
+    ):
+        df = df_total_medals_by_olympiad_and_committee.copy()
+        df.loc[0, "Medal_type"] = None
+        filters = {"Medal_type": "All"}
+        pd.testing.assert_frame_equal(
+            backend.filter(df, filters), PandasBackend().filter(df, filters)
+        )
+
+    @pytest.mark.parametrize("percentage", ["Total medals", "Percentage"])
+    def test_medals_by_country(
+        self, backend, df_total_medals_by_olympiad_and_committee, as_dtype, percentage
+    ):
+        df = as_dtype(df_total_medals_by_olympiad_and_committee)
+        reference = MedalsByCountry(df)
+        backend_chart = MedalsByCountry(df, backend)
+        for medal_type in ["All", "Gold"]:
+            for season in ["summer", "winter"]:
+                pd.testing.assert_frame_equal(
+                    backend_chart._compute_medals_by_committee(
+                        ["USA", "GBR"], season, medal_type, percentage
+                    ),
+                    reference._compute_medals_by_committee(
+                        ["USA", "GBR"], season, medal_type, percentage
+                    ),
+                )
+            assert backend_chart.create_medals_by_country_seasons(
+                ["GBR"], medal_type, percentage
+            ) == reference.create_medals_by_country_seasons(
+                ["GBR"], medal_type, percentage
+            )
+
+    def test_queries_from_threads(self, backend, df_olympic_cities):
+        args = (df_olympic_cities, ["Country"], "total_medals", "medals")
+        expected = PandasBackend().sum_by(*args)
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda _: backend.sum_by(*args), range(16)))
+        for result in results:
+            pd.testing.assert_frame_equal(result, expected)
+
+
+GRID_INDEX = ["Committee", "Olympiad", "Olympic_year"]
+
+
+class TestParquetTables:
+    @pytest.mark.parametrize("season", [None, "summer", "winter", "spring"])
+    def test_pivot_size(self, any_backend, medals_table, medals_file, season):
+        filters = season and {"Olympic_season": season}
+        pd.testing.assert_frame_equal(
+            any_backend.pivot_size(medals_table, GRID_INDEX, "Discipline", filters),
+            PandasBackend().pivot_size(
+                medals_file[1], GRID_INDEX, "Discipline", filters
+            ),
+        )
+
+    @pytest.mark.parametrize("season", [None, "summer", "winter"])
+    def test_filter(self, any_backend, medals_table, medals_file, season):
+        filters = season and {"Olympic_season": season}
+        columns = ["Committee", "Olympiad"]
+        pd.testing.assert_frame_equal(
+            any_backend.filter(medals_table, filters, columns),
+            PandasBackend()
+            .filter(medals_file[1], filters, columns)
+            .reset_index(drop=True),
+        )
+
+    @pytest.mark.parametrize("season", [None, "summer", "winter"])
+    def test_sum_by(self, any_backend, medals_table, medals_file, season):
+        filters = season and {"Olympic_season": season}
+        args = (["Committee"], "Olympic_year", "years", filters)
+        pd.testing.assert_frame_equal(
+            any_backend.sum_by(medals_table, *args),
+            PandasBackend().sum_by(medals_file[1], *args),
+        )
+
+    @pytest.mark.parametrize("season", [None, "summer", "winter", "spring"])
+    def test_unique(self, any_backend, medals_table, medals_file, season):
+        filters = season and {"Olympic_season": season}
+        pd.testing.assert_index_equal(
+            any_backend.unique(medals_table, "Discipline", filters),
+            PandasBackend().unique(medals_file[1], "Discipline", filters),
+        )
+
+    def test_unique_from_frames(self, backend, df_olympic_medals, as_dtype):
+        df = as_dtype(df_olympic_medals)
+        filters = {"Olympic_season": "summer"}
+        pd.testing.assert_index_equal(
+            backend.unique(df, "Discipline", filters),
+            PandasBackend().unique(df, "Discipline", filters),
+        )
+
+    def test_medals_grid(self, any_backend, medals_table, medals_file):
+        reference = MedalsByOlympicAndDiscipline(medals_file[1])
+        grid = MedalsByOlympicAndDiscipline(medals_table, any_backend)
+        for committee in ["USA", "GBR", "NOR", "XYZ"]:
+            assert grid.plot_medals_grids(committee) == reference.plot_medals_grids(
+                committee
+            )
+
+    def test_duckdb_queries_the_file(self, medals_table, medals_file):
+        pytest.importorskip("duckdb")
+
+        def scan(columns, filters):
+            raise AssertionError("The rows were read with pandas")
+
+        table = replace(medals_table, scan=scan)
+        filters = {"Olympic_season": "winter"}
+        pd.testing.assert_frame_equal(
+            get_query_backend("duckdb").pivot_size(
+                table, GRID_INDEX, "Discipline", filters
+            ),
+            PandasBackend().pivot_size(
+                medals_file[1], GRID_INDEX, "Discipline", filters
+            ),
+        )
+
+    def test_replaced_file_is_not_queried(
+        self, any_backend, medals_table, medals_file, df_olympic_medals
+    ):
+        path, df = medals_file
+        new_path = path.with_name("new.parquet")
+        _write_medals(df_olympic_medals.iloc[:2], new_path)
+        new_path.replace(path)
+        assert not medals_table.is_current()
+        pd.testing.assert_frame_equal(
+            any_backend.pivot_size(medals_table, GRID_INDEX, "Discipline"),
+            PandasBackend().pivot_size(df, GRID_INDEX, "Discipline"),
+        )
+        pd.testing.assert_index_equal(
+            any_backend.unique(medals_table, "Discipline"),
+            PandasBackend().unique(df, "Discipline"),
+        )
+
+    def test_table_of_the_data_version(self, medals_table, medals_file):
+        assert medals_table.path == str(medals_file[0])
+        assert medals_table.data_version == "v1"
+        assert medals_table.is_current()
+
+
+class TestPolarsBackend:
+    def test_frames_are_converted_once(self, df_olympic_cities):
+        pytest.importorskip("polars")
+        backend = get_query_backend("polars")
+        backend.sum_by(df_olympic_cities, ["Country"], "total_medals", "medals")
+        backend.sum_by(df_olympic_cities, ["Country"], "total_medals_gold", "gold")
+        assert len(backend._frames) == 1
+
+    def test_conversions_are_dropped_with_the_frames(self, df_olympic_cities):
+        pytest.importorskip("polars")
+        backend = get_query_backend("polars")
+        df = df_olympic_cities.copy()
+        backend.sum_by(df, ["Country"], "total_medals", "medals")
+        del df
+        assert backend._frames == {}
+
+
+class TestGetQueryBackend:
+    def test_pandas(self):
+        assert isinstance(get_query_backend("pandas"), PandasBackend)
+
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError, match="Invalid query backend"):
+            get_query_backend("spark")
+
+    def test_default_backend(self):
+        assert MedalMap(pd.DataFrame()).query_backend.name == "pandas"
@@ -0,0 +1,104 @@
+"""
+Tests for serve.py (the production server) and its gunicorn settings.
+"""
+
+import runpy
+import signal
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import serve
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+
+class TestParseArgs:
+    def test_defaults(self, monkeypatch):
+        for name in ["WEB_WORKERS", "WEB_THREADS", "PORT", "GRACEFUL_TIMEOUT"]:
+            monkeypatch.delenv(name, raising=False)
+        args = serve.parse_args([])
+        assert (args.workers, args.threads, args.port) == (1, 32, 5000)
+        assert args.graceful_timeout == 30
+
+    def test_environment_variables(self, monkeypatch):
+        monkeypatch.setenv("WEB_WORKERS", "4")
+        monkeypatch.setenv("WEB_THREADS", "8")
+        args = serve.parse_args([])
+        assert (args.workers, args.threads) == (4, 8)
+        assert serve.parse_args(["--workers", "2"]).workers == 2
+
+    def test_invalid_workers(self):
+        with pytest.raises(SystemExit):
+            serve.parse_args(["--workers", "0"])
+
+
+class TestServers:
+    def test_ports(self):
+        assert serve.server_ports(5000, 3) == [5000, 5001, 5002]
+
+    def test_gunicorn_command(self):
+        command = serve.gunicorn_command("127.0.0.1", 5001, 16, 10)
+        assert command[:3] == [sys.executable, "-m", "gunicorn"]
+        assert command[command.index("--bind") + 1] == "127.0.0.1:5001"
+        assert command[command.index("--threads") + 1] == "16"
+        assert command[command.index("--graceful-timeout") + 1] == "10"
+
+    def _fake_servers(self, monkeypatch, scripts):
+        """Replace the gunicorn servers by Python scripts (by port), and return
+        the signal handlers installed by `serve` (instead of installing them)."""
+
+        def command(host, port, threads, graceful_timeout):
+            return [sys.executable, "-c", scripts[port]]
+
+        handlers = {}
+        monkeypatch.setattr(serve, "gunicorn_command", command)
+        monkeypatch.setattr(
+            serve.signal,
+            "signal",
+            lambda signum, handler: handlers.update({signum: handler}),
+        )
+        return handlers
+
+    def test_a_stopped_server_stops_the_others(self, monkeypatch):
+        self._fake_servers(
+            monkeypatch,
+            {5000: "import time; time.sleep(60)", 5001: "raise SystemExit(3)"},
+        )
+        args = serve.parse_args(["--workers", "2", "--port", "5000"])
+        assert serve.serve(args) == 3
+
+    def test_signal_stops_the_servers(self, monkeypatch):
+        handlers = self._fake_servers(
+            monkeypatch, {5000: "import time; time.sleep(60)"}
+        )
+        timer = threading.Timer(
+            1, lambda: handlers[signal.SIGTERM](signal.SIGTERM, None)
+        )
+        timer.start()
+        try:
+            assert serve.serve(serve.parse_args(["--port", "5000"])) == 0
+        finally:
+            timer.cancel()
+
+
+class TestGunicornSettings:
+    def test_single_threaded_worker(self):
+        settings = runpy.run_path(str(SRC_DIR / "gunicorn.conf.py"))
+        assert settings["workers"] == 1
+        assert settings["worker_class"] == "gthread"
+        assert settings["wsgi_app"] == "main:app"
+        assert not settings["preload_app"]
+
+    def test_worker_exit_stops_the_data_watcher(self, monkeypatch):
+        stopped = []
+        data_watcher = SimpleNamespace(stop=lambda: stopped.append(True))
+        monkeypatch.setitem(
+            sys.modules, "main", SimpleNamespace(data_watcher=data_watcher)
+        )
+        settings = runpy.run_path(str(SRC_DIR / "gunicorn.conf.py"))
+        settings["worker_exit"](None, None)
+        assert stopped == [True]
@@ -0,0 +1,121 @@
+"""
+Tests for the state variables shared by the sessions (loaders.SHARED_VARIABLES),
+with a Taipy app serving several sessions.
+"""
+
+import gc
+import inspect
+import tracemalloc
+import weakref
+
+import pandas as pd
+import pytest
+import taipy.gui.builder as tgb
+from taipy.gui import Gui
+
+from loaders import SHARED_VARIABLES
+
+N_SESSIONS = 20
+
+
+def _create_gui(df_olympic_medals, shared=True):
+    """App with a page bound to a data variable and to a selector, like the
+    pages of the app."""
+    data_version = "v1"  # noqa: F841 (bound by the page)
+    committee_detail = "USA"  # noqa: F841
+    with tgb.Page() as page:
+        tgb.text("{data_version} {committee_detail}")
+        tgb.table("{df_olympic_medals}")
+    if shared:
+        Gui.add_shared_variables(*SHARED_VARIABLES)
+    gui = Gui(pages={"medals": page})
+    gui._set_frame(inspect.currentframe())
+    gui.run(run_server=False, single_client=False, stylekit=False)
+    return gui
+
+
+@pytest.fixture
+def open_app():
+    """Opens an app, and sessions of the app."""
+
+    def open_app(df_olympic_medals, shared=True):
+        gui = _create_gui(df_olympic_medals, shared)
+        client = gui._server.test_client()
+
+        def open_session(client_id):
+            gui._bindings()._get_or_create_scope(client_id)
+            client.get("/taipy-jsx/medals", query_string={"client_id": client_id})
+            return gui._bindings()._get_all_scopes()[client_id]
+
+        return gui, open_session
+
+    yield open_app
+    Gui._clear_shared_variable()
+
+
+def _set_data(state, df_olympic_medals, data_version):
+    with state as s:
+        s.df_olympic_medals = df_olympic_medals
+        s.data_version = data_version
+
+
+def _memory_per_session(open_session):
+    """Memory (bytes) kept by each new session."""
+    open_session("first")
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(N_SESSIONS):
+            open_session(f"session-{i}")
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / N_SESSIONS
+
+
+class TestSharedVariables:
+    def test_sessions_bind_the_same_frame(self, open_app, df_olympic_medals):
+        gui, open_session = open_app(df_olympic_medals)
+        first, second = open_session("first"), open_session("second")
+        assert first.df_olympic_medals is second.df_olympic_medals
+        assert first.committee_detail == "USA"
+
+    @pytest.mark.parametrize("shared", [True, False])
+    def test_memory_per_session_is_flat(self, open_app, df_olympic_medals, shared):
+        small_df = pd.concat([df_olympic_medals] * 10, ignore_index=True)
+        large_df = pd.concat([df_olympic_medals] * 10_000, ignore_index=True)
+        small = _memory_per_session(open_app(small_df, shared)[1])
+        Gui._clear_shared_variable()
+        large = _memory_per_session(open_app(large_df, shared)[1])
+        # A session holds references to the data, not copies: the memory of a
+        # session doesn't grow with the data, and is far below its size
+        assert large < small * 1.5 + 1024
+        assert large < large_df.memory_usage(deep=True).sum() / 100
+
+    def test_new_data_replaces_the_data_of_every_session(
+        self, open_app, df_olympic_medals
+    ):
+        gui, open_session = open_app(df_olympic_medals)
+        sessions = [open_session(f"session-{i}") for i in range(3)]
+        df_v2 = df_olympic_medals.copy()
+        gui.invoke_callback("session-0", _set_data, [df_v2, "v2"])
+        assert all(session.df_olympic_medals is df_v2 for session in sessions)
+        assert {session.data_version for session in sessions} == {"v2"}
+
+        # The next data, set from another session, frees the previous data
+        previous = weakref.ref(df_v2)
+        del df_v2
+        gui.invoke_callback("session-1", _set_data, [df_olympic_medals.copy(), "v3"])
+        gc.collect()
+        assert previous() is None
+
+    def test_sessions_keep_their_data_without_sharing(
+        self, open_app, df_olympic_medals
+    ):
+        gui, open_session = open_app(df_olympic_medals, shared=False)
+        first, second = open_session("first"), open_session("second")
+        gui.invoke_callback("first", _set_data, [df_olympic_medals.copy(), "v2"])
+        assert first.data_version == "v2"
+        assert second.data_version == "v1"
@@ -0,0 +1,241 @@
+"""
+Tests for loaders.sources (source tables read column by column) and the column
+projection of loaders.datasets.
+"""
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from loaders.charts import build_chart_algorithms
+from loaders.datasets import LOADED_COLUMNS, load_datasets
+from loaders.sources import SOURCE_FORMATS, SourceTable, matching_row_groups
+from transformation.layout import write_medals_parquet
+
+
+@pytest.fixture
+def df_medals(df_olympic_medals):
+    """Medals table like the parquet file, with the columns not used by the
+    charts."""
+    df = df_olympic_medals.assign(
+        Winner=[f"Athlete {i}" for i in range(6)], Code=[f"C{i}" for i in range(6)]
+    )
+    columns = df.columns.drop(["Olympic_year", "Winner"])
+    return df.astype({column: "category" for column in columns})
+
+
+@pytest.fixture
+def parquet_path(tmp_path, df_medals):
+    path = tmp_path / "olympic_medals.parquet"
+    df_medals.to_parquet(path, index=False)
+    return path
+
+
+@pytest.fixture
+def layout_path(tmp_path, df_medals):
+    """Medals file with a row group by season (the rows of each season are
+    consecutive)."""
+    path = tmp_path / "layout.parquet"
+    df = df_medals.sort_values("Olympic_season", kind="stable", ignore_index=True)
+    write_medals_parquet(df, path)
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path, parquet_path):
+    pd.DataFrame(
+        {
+            "Olympiad": ["Rio 2016"],
+            "Olympic_year": [2016],
+            "Olympic_season": ["summer"],
+            "total_medals": [3],
+            "total_medals_gold": [1],
+            "total_medals_silver": [1],
+            "total_medals_bronze": [1],
+            "number_committees": [2],
+            "number_disciplines": [2],
+            "number_events": [2],
+            "Country": ["Brazil"],
+            "Continent": ["South America"],
+        }
+    ).to_parquet(tmp_path / "olympic_cities.parquet", index=False)
+    return tmp_path
+
+
+def _counting_source(df):
+    """Source table over `df`, that records the columns read."""
+    reads = []
+
+    def read_columns(columns, filters):
+        reads.append(columns)
+        if filters:
+            mask = True
+            for column, value in filters.items():
+                mask = mask & (df[column] == value)
+            return df.loc[mask, columns].reset_index(drop=True)
+        return df[columns]
+
+    return SourceTable(list(df.columns), read_columns), reads
+
+
+class TestSourceTable:
+    def test_reads_only_the_columns_asked(self, df_medals):
+        source, reads = _counting_source(df_medals)
+        df = source.read(["Olympiad", "Committee"])
+        assert list(df.columns) == ["Olympiad", "Committee"]
+        assert reads == [["Olympiad", "Committee"]]
+
+    def test_reads_each_column_once(self, df_medals):
+        source, reads = _counting_source(df_medals)
+        source.read(["Olympiad", "Committee"])
+        source.read(["Committee", "Winner"])
+        source.read(["Olympiad", "Winner"])
+        assert reads == [["Olympiad", "Committee"], ["Winner"]]
+        assert source.loaded_columns == ["Olympiad", "Committee", "Winner"]
+
+    def test_file_order(self, df_medals):
+        source, _ = _counting_source(df_medals)
+        df = source.read(["Winner", "Olympiad"])
+        assert list(df.columns) == ["Olympiad", "Winner"]
+
+    def test_all_columns(self, df_medals):
+        source, _ = _counting_source(df_medals)
+        pd.testing.assert_frame_equal(source.read(), df_medals)
+
+    def test_unknown_column(self, df_medals):
+        source, _ = _counting_source(df_medals)
+        with pytest.raises(KeyError, match="Country"):
+            source.read(["Olympiad", "Country"])
+
+    def test_scan_filters_rows(self, df_medals):
+        source, reads = _counting_source(df_medals)
+        df = source.scan(["Winner"], filters={"Olympiad": "Rio 2016"})
+        assert df["Winner"].tolist() == ["Athlete 0", "Athlete 1"]
+        assert reads == [["Winner"]]
+
+    def test_scanned_columns_are_not_kept(self, df_medals):
+        source, reads = _counting_source(df_medals)
+        source.scan(["Olympiad"])
+        source.scan(["Olympiad"])
+        assert source.loaded_columns == []
+        assert len(reads) == 2
+
+    def test_scan_unknown_filter_column(self, df_medals):
+        source, _ = _counting_source(df_medals)
+        with pytest.raises(KeyError, match="Country"):
+            source.scan(["Olympiad"], filters={"Country": "Brazil"})
+
+    def test_no_parquet_table_without_a_file(self, df_medals):
+        source, _ = _counting_source(df_medals)
+        with pytest.raises(ValueError, match="no parquet file"):
+            source.parquet_table()
+
+
+@pytest.mark.parametrize("data_format", list(SOURCE_FORMATS))
+class TestOpenSource:
+    def test_projection(self, parquet_path, df_medals, data_format):
+        source = SOURCE_FORMATS[data_format](parquet_path)
+        df = source.read(["Committee", "Olympic_year"])
+        pd.testing.assert_frame_equal(df, df_medals[["Olympic_year", "Committee"]])
+
+    def test_reads_the_opened_version(self, parquet_path, df_medals, data_format):
+        source = SOURCE_FORMATS[data_format](parquet_path)
+        source.read(["Olympiad"])
+        # The pipeline writes a new file, then renames it over the old one
+        new_path = parquet_path.with_suffix(".new")
+        df_medals.iloc[:2].to_parquet(new_path, index=False)
+        new_path.replace(parquet_path)
+        assert len(source.read(["Olympiad", "Code"])) == 6
+
+    def test_scan_filters(self, layout_path, df_medals, data_format):
+        source = SOURCE_FORMATS[data_format](layout_path)
+        df = source.scan(["Olympiad", "Gender"], filters={"Olympic_season": "winter"})
+        expected = df_medals.loc[
+            df_medals["Olympic_season"] == "winter", ["Olympiad", "Gender"]
+        ]
+        pd.testing.assert_frame_equal(df, expected.reset_index(drop=True))
+
+    def test_scan_without_rows(self, layout_path, df_medals, data_format):
+        source = SOURCE_FORMATS[data_format](layout_path)
+        df = source.scan(["Olympiad"], filters={"Olympiad": "Paris 2024"})
+        assert df.empty
+        assert list(df["Olympiad"].cat.categories) == list(
+            df_medals["Olympiad"].cat.categories
+        )
+
+    def test_empty(self, layout_path, df_medals, data_format):
+        source = SOURCE_FORMATS[data_format](layout_path)
+        df = source.empty(["Committee", "Olympiad"])
+        pd.testing.assert_frame_equal(df, df_medals[["Olympiad", "Committee"]].iloc[:0])
+
+    def test_parquet_table(self, parquet_path, df_medals, data_format):
+        table = SOURCE_FORMATS[data_format](parquet_path).parquet_table("v1")
+        assert (table.path, table.data_version) == (str(parquet_path), "v1")
+        assert table.is_current()
+        new_path = parquet_path.with_suffix(".new")
+        df_medals.iloc[:2].to_parquet(new_path, index=False)
+        new_path.replace(parquet_path)
+        assert not table.is_current()
+        assert len(table.scan(["Olympiad"], None)) == 6
+
+
+class TestMatchingRowGroups:
+    def test_season(self, layout_path):
+        metadata = pq.ParquetFile(layout_path).metadata
+        assert metadata.num_row_groups == 2
+        assert matching_row_groups(metadata, {"Olympic_season": "winter"}) == [1]
+
+    def test_several_predicates(self, layout_path):
+        metadata = pq.ParquetFile(layout_path).metadata
+        filters = {"Olympic_season": "summer", "Olympic_year": 2018}
+        assert matching_row_groups(metadata, filters) == [0]
+        filters = {"Olympic_season": "summer", "Olympic_year": 1900}
+        assert matching_row_groups(metadata, filters) == []
+
+    def test_season_scan_reads_its_row_groups(self, layout_path, monkeypatch):
+        source = SOURCE_FORMATS["parquet"](layout_path)
+        read_row_groups = pq.ParquetFile.read_row_groups
+        row_groups = []
+
+        def recording(parquet_file, indices, *args, **kwargs):
+            row_groups.append(list(indices))
+            return read_row_groups(parquet_file, indices, *args, **kwargs)
+
+        monkeypatch.setattr(pq.ParquetFile, "read_row_groups", recording)
+        source.scan(["Discipline"], filters={"Olympic_season": "winter"})
+        assert row_groups == [[1]]
+
+
+class TestColumnProjection:
+    def test_loaded_columns(self):
+        columns = LOADED_COLUMNS["olympic_medals"]
+        assert "Winner" not in columns
+        assert "Discipline" not in columns
+        assert {"Olympiad", "Olympic_season", "Committee", "Medal_type"} <= set(columns)
+
+    def test_unused_columns_are_not_loaded(self, data_dir):
+        datasets = load_datasets(data_dir, "parquet")
+        assert "Winner" not in datasets.olympic_medals.columns
+        assert "Code" not in datasets.olympic_medals.columns
+
+    def test_read_columns(self, data_dir, df_medals):
+        datasets = load_datasets(data_dir, "parquet")
+        df = datasets.read_columns("olympic_medals", ["Olympiad", "Winner"])
+        pd.testing.assert_frame_equal(df, df_medals[["Olympiad", "Winner"]])
+
+    def test_charts_do_not_keep_their_columns(self, data_dir, df_medals):
+        datasets = load_datasets(data_dir, "parquet")
+        charts = build_chart_algorithms(datasets)
+        assert charts.medals_by_olympic_and_discipline.winter_disciplines.tolist() == [
+            "Biathlon",
+            "Skiing",
+        ]
+        loaded = datasets.sources["olympic_medals"].loaded_columns
+        assert set(loaded) == set(LOADED_COLUMNS["olympic_medals"])
+
+    def test_medals_index(self, data_dir, df_medals):
+        datasets = load_datasets(data_dir, "parquet")
+        winter = datasets.medals_index.where({"Olympic_season": "winter"})
+        expected = df_medals["Olympic_season"] == "winter"
+        assert winter.count() == expected.sum()
+        assert "Code" not in datasets.sources["olympic_medals"].loaded_columns
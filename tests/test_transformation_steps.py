@@ -0,0 +1,106 @@
+"""
+Tests for transformation.steps (the build steps of the datasets).
+"""
+
+import pandas as pd
+import pytest
+import yaml
+
+from transformation.pipeline import order_steps
+from transformation.steps import (
+    STEPS,
+    change_column_dtypes,
+    convert_medals,
+    create_lists,
+)
+
+
+@pytest.fixture
+def medals_csv(tmp_path, df_olympic_medals):
+    df = df_olympic_medals.assign(
+        Winner="Someone",
+        Olympic_city="City",
+        Code="CODE",
+        Committee_type="Country",
+    )
+    df.loc[0, "Olympiad"] = "Stockholm 1956"
+    df.loc[1, "Olympiad"] = "Melbourne 1956"
+    path = tmp_path / "olympic_medals.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+class TestChangeColumnDtypes:
+    def test_converts_columns(self, df_olympic_medals):
+        df = change_column_dtypes(df_olympic_medals, "category", ["Committee"])
+        assert df["Committee"].dtype == "category"
+        assert df_olympic_medals["Committee"].dtype != "category"
+
+    def test_missing_column_raises(self, df_olympic_medals):
+        with pytest.raises(ValueError, match="Columns not found"):
+            change_column_dtypes(df_olympic_medals, "category", ["Missing"])
+
+
+class TestConvertMedals:
+    def test_merges_1956_olympiads(self, tmp_path, medals_csv):
+        parquet_path = tmp_path / "olympic_medals.parquet"
+        convert_medals(medals_csv, parquet_path)
+        df = pd.read_parquet(parquet_path)
+        assert "Stockholm 1956" not in df["Olympiad"].cat.categories
+        assert (df["Olympiad"] == "Melbourne 1956 (*)").sum() == 2
+
+    def test_categorical_dtypes(self, tmp_path, medals_csv):
+        parquet_path = tmp_path / "olympic_medals.parquet"
+        convert_medals(medals_csv, parquet_path)
+        df = pd.read_parquet(parquet_path)
+        assert df["Committee"].dtype == "category"
+        assert df["Medal_type"].dtype == "category"
+        assert df["Olympic_year"].dtype == "int16"
+
+    def test_leaves_no_temporary_file(self, tmp_path, medals_csv):
+        convert_medals(medals_csv, tmp_path / "olympic_medals.parquet")
+        assert not list(tmp_path.glob(".*.tmp"))
+
+
+class TestCreateLists:
+    def test_writes_lists(self, tmp_path, df_olympic_medals):
+        medals_path = tmp_path / "medals.parquet"
+        df_olympic_medals.astype({"Olympiad": "category"}).to_parquet(medals_path)
+        olympiads_path = tmp_path / "list_olympiads.yml"
+        committees_path = tmp_path / "list_committees.yml"
+
+        create_lists(medals_path, olympiads_path, committees_path)
+
+        assert yaml.safe_load(olympiads_path.read_text()) == [
+            "All",
+            "Rio 2016",
+            "Tokyo 2020",
+            "PyeongChang 2018",
+        ]
+        assert yaml.safe_load(committees_path.read_text()) == [
+            "CHN",
+            "GBR",
+            "NOR",
+            "USA",
+        ]
+
+
+class TestSteps:
+    def test_steps_form_a_valid_pipeline(self):
+        dependencies = order_steps(STEPS)
+        assert dependencies["convert_medals"] == set()
+        assert dependencies["create_pivot_total"] == {"convert_medals"}
+        assert dependencies["simplify_cities"] == {"convert_cities"}
+
+    def test_every_dataset_is_built(self):
+        outputs = {output for step in STEPS for output in step.outputs}
+        assert {
+            "data/olympic_medals.parquet",
+            "data/olympic_cities.parquet",
+            "data/olympic_cities_simplified.parquet",
+            "data/medals_by_olympiad.parquet",
+            "data/total_medals_by_olympiad_and_committee.parquet",
+            "data/grouped_medals_olympiads.parquet",
+            "parameters/list_olympiads.yml",
+            "parameters/list_committees.yml",
+        } <= outputs
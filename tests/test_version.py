@@ -0,0 +1,36 @@
+"""Tests for src/cache/version.py"""
+
+from cache.version import CODE_VERSION, compute_code_version
+
+
+def _write_packages(src_dir, chart_code):
+    for package in ("algorithms", "cache", "context", "loaders"):
+        (src_dir / package).mkdir()
+        (src_dir / package / "__init__.py").write_text("")
+    (src_dir / "algorithms" / "chart.py").write_text(chart_code)
+
+
+class TestCodeVersion:
+    def test_code_version_of_the_app(self):
+        assert CODE_VERSION == compute_code_version()
+        assert len(CODE_VERSION) == 16
+
+    def test_changes_with_the_chart_code(self, tmp_path):
+        _write_packages(tmp_path, "TITLE = 'Medals'")
+        before = compute_code_version(tmp_path)
+        (tmp_path / "algorithms" / "chart.py").write_text("TITLE = 'All medals'")
+        assert compute_code_version(tmp_path) != before
+
+    def test_changes_with_the_chart_inputs(self, tmp_path):
+        _write_packages(tmp_path, "TITLE = 'Medals'")
+        (tmp_path / "loaders" / "aggregates.py").write_text("MEDAL_TYPES = ['Gold']")
+        before = compute_code_version(tmp_path)
+        (tmp_path / "loaders" / "aggregates.py").write_text("MEDAL_TYPES = ['All']")
+        assert compute_code_version(tmp_path) != before
+
+    def test_ignores_other_files(self, tmp_path):
+        _write_packages(tmp_path, "TITLE = 'Medals'")
+        before = compute_code_version(tmp_path)
+        (tmp_path / "algorithms" / "notes.md").write_text("notes")
+        (tmp_path / "main.py").write_text("print()")
+        assert compute_code_version(tmp_path) == before
@@ -0,0 +1,186 @@
+"""
+Tests for page_utils.view_state (view state of the pages in their URL), with
+Taipy apps serving a session.
+"""
+
+import inspect
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import taipy.gui.builder as tgb
+from taipy.gui import Gui
+
+from page_utils.view_state import (
+    decode_view,
+    encode_view,
+    restore_view,
+    state_variable_name,
+)
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+PAGE = "medals_awarded_to_committees"
+LOVS = {
+    "list_committees": ["France", "Hong Kong, China", "Norway", "United States"],
+    "list_medal_types": ["All", "Gold", "Silver", "Bronze"],
+    "list_display_percent": ["Total", "Percentage"],
+}
+VIEW = {
+    "committees": ["Hong Kong, China", "Norway"],
+    "medal_type": "Gold",
+    "display_percent": "Percentage",
+    "committee_detail": "Norway",
+}
+
+# Another process of the app: renders the page from its URL, for a session it
+# didn't open, and prints the view of the session
+OTHER_PROCESS = """
+import json, sys
+from test_view_state import create_gui
+gui = create_gui()
+client_id, params = sys.argv[1], json.loads(sys.argv[2])
+gui._server.test_client().get(
+    "/taipy-jsx/medals_awarded_to_committees",
+    query_string={**params, "client_id": client_id},
+)
+scope = gui._bindings()._get_all_scopes()[client_id]
+print(json.dumps({name: getattr(scope, name) for name in sys.argv[3:]}))
+"""
+
+
+def create_gui():
+    """App with the selectors of the committees page (default values), set
+    from the URL of the page, like `main.py`."""
+    committees = ["France", "United States"]  # noqa: F841 (bound by the page)
+    medal_type = "All"  # noqa: F841
+    display_percent = "Total"  # noqa: F841
+    committee_detail = "France"  # noqa: F841
+    list_committees = LOVS["list_committees"]  # noqa: F841
+    list_medal_types = LOVS["list_medal_types"]  # noqa: F841
+    list_display_percent = LOVS["list_display_percent"]  # noqa: F841
+    with tgb.Page() as page:
+        tgb.selector(value="{committees}", lov="{list_committees}", multiple=True)
+        tgb.selector(value="{medal_type}", lov="{list_medal_types}")
+        tgb.toggle(value="{display_percent}", lov="{list_display_percent}")
+        tgb.selector(value="{committee_detail}", lov="{list_committees}")
+
+    def on_navigate(state, page_name, params):
+        restore_view(state, page_name, params)
+        return page_name
+
+    gui = Gui(pages={PAGE: page})
+    gui._set_frame(inspect.currentframe())
+    gui.run(run_server=False, single_client=False, stylekit=False)
+    return gui
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        params = encode_view(PAGE, VIEW)
+        assert params["committees"] == "Hong Kong, China|Norway"
+        assert decode_view(PAGE, params, LOVS) == VIEW
+
+    def test_invalid_values_are_ignored(self):
+        params = {
+            "committees": "Norway|Atlantis",
+            "medal_type": "Platinum",
+            "display_percent": "Percentage",
+        }
+        assert decode_view(PAGE, params, LOVS) == {
+            "committees": ["Norway"],
+            "display_percent": "Percentage",
+        }
+
+    def test_no_committees(self):
+        assert decode_view(PAGE, {"committees": ""}, LOVS) == {"committees": []}
+
+    def test_page_without_view(self):
+        assert decode_view("unknown", {"medal_type": "Gold"}, LOVS) == {}
+
+    def test_state_variable_name(self):
+        assert state_variable_name("tpec_TpExPr_committee_detail_TPMDL_1") == (
+            "committee_detail"
+        )
+        assert state_variable_name("committee_detail") == "committee_detail"
+
+
+@pytest.fixture
+def gui():
+    gui = create_gui()
+    yield gui
+    Gui._clear_shared_variable()
+
+
+def _open_session(gui, client_id, params=None):
+    gui._bindings()._get_or_create_scope(client_id)
+    gui._server.test_client().get(
+        f"/taipy-jsx/{PAGE}", query_string={**(params or {}), "client_id": client_id}
+    )
+    return gui._bindings()._get_all_scopes()[client_id]
+
+
+def _change(gui, ws_client, client_id, name, value):
+    """Change a selector from the browser."""
+    # Name of the variable in the page
+    scope = gui._bindings()._get_all_scopes()[client_id]
+    bound_name = next(
+        key for key in vars(scope) if key.startswith(f"tpec_TpExPr_{name}_TPMDL_")
+    )
+    ws_client.emit(
+        "message",
+        {
+            "client_id": client_id,
+            "type": "U",
+            "name": bound_name,
+            "payload": {"value": value},
+        },
+    )
+
+
+def _navigations(ws_client):
+    """Pages the browser was sent to."""
+    return [
+        message["args"]
+        for message in ws_client.get_received()
+        if message["args"].get("type") == "NA"
+    ]
+
+
+class TestViewInTheUrl:
+    def test_url_restores_the_view(self, gui):
+        scope = _open_session(gui, "client", encode_view(PAGE, VIEW))
+        assert {name: getattr(scope, name) for name in VIEW} == VIEW
+
+    def test_page_without_parameters_keeps_the_view(self, gui):
+        scope = _open_session(gui, "client")
+        assert scope.committee_detail == "France"
+
+    def test_selector_change_does_not_navigate(self, gui):
+        ws_client = gui._server._ws.test_client(gui._server.get_flask())
+        scope = _open_session(gui, "client")
+        ws_client.get_received()
+        _change(gui, ws_client, "client", "medal_type", "Silver")
+        assert scope.medal_type == "Silver"
+        assert _navigations(ws_client) == []
+
+    def test_failover_to_another_process(self, gui):
+        # The session opens a link to a view in this process...
+        params = encode_view(PAGE, VIEW)
+        _open_session(gui, "client", params)
+
+        # ...and the page is reloaded on another process
+        result = subprocess.run(
+            [sys.executable, "-c", OTHER_PROCESS, "client", json.dumps(params)]
+            + list(VIEW),
+            cwd=Path(__file__).parent,
+            env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=120,
+        )
+        view = json.loads(result.stdout.strip().splitlines()[-1])
+        assert view == VIEW
@@ -0,0 +1,229 @@
+"""
+Tests for loaders.watcher (hot reload of the data) and loaders.snapshot.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field, fields, replace
+
+import pytest
+
+from loaders import SHARED_VARIABLES, ChartAlgorithms
+from loaders import watcher as watcher_module
+from loaders.datasets import DATA_FILES, compute_data_version
+from loaders.snapshot import DataSnapshot, load_lists
+from loaders.watcher import PARAMETER_FILES, DataWatcher
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    data_version: str
+    list_olympiads: list = field(default_factory=lambda: ["All"])
+    list_committees: list = field(default_factory=lambda: ["All"])
+
+    def lists(self):
+        return {
+            "list_olympiads": self.list_olympiads,
+            "list_committees": self.list_committees,
+        }
+
+    def with_lists(self, lists):
+        return replace(self, **lists)
+
+
+@pytest.fixture
+def directories(tmp_path):
+    data_dir, parameters_dir = tmp_path / "data", tmp_path / "parameters"
+    data_dir.mkdir()
+    parameters_dir.mkdir()
+    for name in DATA_FILES.values():
+        (data_dir / name).write_bytes(b"initial " + name.encode())
+    for name in PARAMETER_FILES:
+        (parameters_dir / name).write_text("- All\n")
+    return data_dir, parameters_dir
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Snapshots loaded by the watcher, without reading real datasets."""
+    loaded = []
+
+    def load_snapshot(data_dir, parameters_dir):
+        snapshot = _Snapshot(compute_data_version(data_dir))
+        loaded.append(snapshot)
+        return snapshot
+
+    monkeypatch.setattr(watcher_module, "load_snapshot", load_snapshot)
+    return loaded
+
+
+def _make_watcher(directories, reloads):
+    data_dir, parameters_dir = directories
+    snapshot = _Snapshot(compute_data_version(data_dir))
+    return DataWatcher(
+        snapshot,
+        lambda new, previous: reloads.append((new, previous)),
+        data_dir,
+        parameters_dir,
+        interval=0.01,
+    )
+
+
+def _rewrite(path, content):
+    path.write_bytes(content)
+    # Make sure the modification time changes, even on coarse file systems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestDataWatcher:
+    def test_no_change(self, directories, loads):
+        reloads = []
+        watcher = _make_watcher(directories, reloads)
+        assert not watcher.check()
+        assert not watcher.check()
+        assert reloads == []
+
+    def test_reloads_once_files_are_stable(self, directories, loads):
+        data_dir, _ = directories
+        reloads = []
+        watcher = _make_watcher(directories, reloads)
+        previous = watcher.snapshot
+
+        _rewrite(data_dir / "olympic_medals.parquet", b"new data")
+        assert not watcher.check()  # Changed: wait for the next check
+        assert watcher.check()
+
+        new, old = reloads[0]
+        assert old is previous
+        assert new.data_version == compute_data_version(data_dir)
+        assert watcher.snapshot is new
+
+    def test_waits_while_files_change(self, directories, loads):
+        data_dir, _ = directories
+        watcher = _make_watcher(directories, [])
+        _rewrite(data_dir / "olympic_medals.parquet", b"partial")
+        assert not watcher.check()
+        _rewrite(data_dir / "olympic_medals.parquet", b"partial, then complete")
+        assert not watcher.check()
+        assert loads == []
+        assert watcher.check()
+
+    def test_same_contents_are_not_reloaded(self, directories, loads):
+        data_dir, _ = directories
+        reloads = []
+        watcher = _make_watcher(directories, reloads)
+        path = data_dir / "olympic_medals.parquet"
+        _rewrite(path, path.read_bytes())
+        watcher.check()
+        assert not watcher.check()
+        assert loads == []
+        assert reloads == []
+
+    def test_reloads_changed_lists(self, directories, loads):
+        _, parameters_dir = directories
+        reloads = []
+        watcher = _make_watcher(directories, reloads)
+        previous = watcher.snapshot
+
+        _rewrite(parameters_dir / "list_committees.yml", b"- France\n- Italy\n")
+        watcher.check()
+        assert watcher.check()
+
+        new, old = reloads[0]
+        assert old is previous
+        assert new.list_committees == ["France", "Italy"]
+        assert new.data_version == previous.data_version
+        # The data is unchanged: it is not loaded again
+        assert loads == []
+
+    def test_same_lists_are_not_reloaded(self, directories, loads):
+        _, parameters_dir = directories
+        reloads = []
+        watcher = _make_watcher(directories, reloads)
+        _rewrite(parameters_dir / "list_olympiads.yml", b"- All\n")
+        watcher.check()
+        assert not watcher.check()
+        assert reloads == []
+
+    def test_load_error_keeps_current_snapshot(self, directories, monkeypatch, caplog):
+        data_dir, _ = directories
+
+        def fail(data_dir, parameters_dir):
+            raise ValueError("half-written file")
+
+        monkeypatch.setattr(watcher_module, "load_snapshot", fail)
+        reloads = []
+        watcher = _make_watcher(directories, reloads)
+        previous = watcher.snapshot
+        _rewrite(data_dir / "olympic_medals.parquet", b"broken")
+        watcher.check()
+        assert not watcher.check()
+        assert watcher.snapshot is previous
+        assert reloads == []
+        assert "Could not load the new data" in caplog.text
+
+    def test_missing_file_is_a_change(self, directories, loads):
+        data_dir, _ = directories
+        watcher = _make_watcher(directories, [])
+        (data_dir / "olympic_cities.parquet").unlink()
+        watcher.check()
+        # The data can't be loaded without the file: the error is logged
+        assert not watcher.check()
+
+    def test_background_thread(self, directories, loads):
+        data_dir, _ = directories
+        reloaded = threading.Event()
+        watcher = _make_watcher(directories, [])
+        watcher.on_reload = lambda new, previous: reloaded.set()
+        watcher.start()
+        try:
+            _rewrite(data_dir / "olympic_medals.parquet", b"new data")
+            assert reloaded.wait(timeout=5)
+        finally:
+            watcher.stop()
+
+
+class TestDataSnapshot:
+    def test_with_lists(self, directories):
+        _, parameters_dir = directories
+        (parameters_dir / "list_committees.yml").write_text("- FRA\n")
+        snapshot = DataSnapshot("v1", "datasets", "charts", ["All"], ["USA"])
+        new = snapshot.with_lists(load_lists(parameters_dir))
+        assert new.lists() == {"list_olympiads": ["All"], "list_committees": ["FRA"]}
+        assert (new.datasets, new.charts) == ("datasets", "charts")
+
+    def test_state_variables(self, df_olympic_medals):
+        class _Datasets:
+            olympic_medals = df_olympic_medals
+            grouped_medals_olympiads = "grouped"
+            olympic_cities_simplified = "cities"
+
+        class _Charts:
+            def items(self):
+                return [("medal_map", "map")]
+
+        snapshot = DataSnapshot(
+            data_version="v1",
+            datasets=_Datasets(),
+            charts=_Charts(),
+            list_olympiads=["All", "Tokyo 2020"],
+            list_committees=["USA"],
+        )
+        variables = snapshot.state_variables()
+        assert variables["data_version"] == "v1"
+        assert variables["latest_olympiad"] == "Tokyo 2020"
+        assert variables["medal_map"] == "map"
+        assert variables["df_grouped_medals_olympics"] == "grouped"
+
+    def test_state_variables_are_shared(self, df_olympic_medals):
+        class _Datasets:
+            olympic_medals = df_olympic_medals
+            grouped_medals_olympiads = olympic_cities_simplified = None
+
+        class _Charts:
+            def items(self):
+                return [(field.name, None) for field in fields(ChartAlgorithms)]
+
+        snapshot = DataSnapshot("v1", _Datasets(), _Charts(), [], [])
+        assert set(snapshot.state_variables()) == set(SHARED_VARIABLES)